@@ -0,0 +1,119 @@
+"""Benchmark: interpreted rule matching (`match_event` per event x rule) vs the
+compiled rule set from `compile_rules`, with and without the candidate-rule
+prefilter (hash indexes on `equals` values, Aho-Corasick over `contains`
+literals), walking events once per rule or each event once.
+
+The synthetic pack mixes `contains`, `equals`, `startswith`, `endswith` and
+`regex` predicates over Message/Id/ProviderName, flat and in `any`/`all`
+blocks; a few keywords are planted in the events so some rules match.
+
+Usage: python benchmarks/bench_rules.py [--events 10000] [--rules 500] [--repeat 3]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pcsuite.security import rules as secrules  # noqa: E402
+
+PROVIDERS = ["Microsoft-Windows-Security-Auditing", "Microsoft-Windows-PowerShell", "Service Control Manager", "Sysmon"]
+WORDS = ["logon", "session", "token", "service", "registry", "process", "network", "share", "policy", "audit"]
+
+
+def build_rules(n: int, seed: int = 1) -> list[dict]:
+    rng = random.Random(seed)
+    rules = []
+    for i in range(n):
+        kw = f"tool{i:04d}"
+        kind = i % 5
+        if kind == 0:
+            det = {"contains": {"Message": [kw, f"{kw}.exe", f"-{kw}"]}}
+        elif kind == 1:
+            det = {"equals": {"Id": [str(4600 + i % 200)]}, "contains": {"Message": [kw]}}
+        elif kind == 2:
+            det = {"any": [{"contains": {"Message": [kw]}}, {"regex": {"Message": [rf"{kw}\s+-[a-z]+"]}}]}
+        elif kind == 3:
+            det = {"all": [{"startswith": {"ProviderName": [rng.choice(PROVIDERS)]}}, {"contains": {"Message": [kw]}}]}
+        else:
+            det = {"endswith": {"Message": [f"{kw} done", f"{kw} exited"]}}
+        rules.append({"title": f"Rule {i:04d}", "severity": "medium", "detection": det})
+    return rules
+
+
+def build_events(n: int, rules: int, seed: int = 2) -> list[dict]:
+    rng = random.Random(seed)
+    events = []
+    for i in range(n):
+        msg = " ".join(rng.choice(WORDS) for _ in range(12))
+        if i % 50 == 0:
+            msg += f" tool{rng.randrange(rules):04d} -x done"
+        events.append({"Id": 4600 + rng.randrange(200), "ProviderName": rng.choice(PROVIDERS), "Message": msg})
+    return events
+
+
+def interpreted(events: list[dict], rules: list[dict]) -> list[tuple]:
+    out = []
+    for r in rules:
+        hits = [e for e in events if secrules.match_event(e, r)]
+        if hits:
+            out.append((r["title"], len(hits), hits[0]))
+    return out
+
+
+def compiled(events: list[dict], ruleset, prefilter: bool, order: str) -> list[tuple]:
+    matches = secrules.evaluate_events(events, ruleset, prefilter=prefilter, order=order)
+    return [(m["rule"], m["count"], m["sample"]) for m in matches]
+
+
+def timed(fn, repeat: int) -> tuple[float, list]:
+    best = float("inf")
+    res: list = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        res = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, res
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=10_000)
+    ap.add_argument("--rules", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    rules = build_rules(args.rules)
+    events = build_events(args.events, args.rules)
+
+    t0 = time.perf_counter()
+    ruleset = secrules.compile_rules(rules)
+    t_compile = time.perf_counter() - t0
+    t_old, r_old = timed(lambda: interpreted(events, rules), 1)
+    t_new, r_new = timed(lambda: compiled(events, ruleset, False, "rule"), args.repeat)
+    assert r_old == r_new, "compiled rules disagree with match_event"
+    t0 = time.perf_counter()
+    pf = ruleset.prefilter
+    t_build = time.perf_counter() - t0
+    t_pf, r_pf = timed(lambda: compiled(events, ruleset, True, "rule"), args.repeat)
+    assert r_pf == r_new, "prefiltered evaluation disagrees"
+    t_ev, r_ev = timed(lambda: compiled(events, ruleset, True, "event"), args.repeat)
+    assert r_ev == r_new, "event-major evaluation disagrees"
+    n = len(events)
+    print(f"events={n:,} rules={len(rules):,} matched_rules={len(r_new)}")
+    st = pf.stats()
+    print(
+        f"compile     : {t_compile:8.3f}s  (prefilter: {t_build:.3f}s, {st['equals_buckets']:,} equals buckets, "
+        f"{st['literals']:,} literals, {st['fallback_rules']} fallback rules, {st['avg_candidates']} rules/event)"
+    )
+    print(f"interpreted : {t_old:8.3f}s  ({n / t_old:,.0f} events/s)")
+    print(f"compiled    : {t_new:8.3f}s  ({n / t_new:,.0f} events/s, {t_old / t_new:.1f}x)")
+    print(f"prefiltered : {t_pf:8.3f}s  ({n / t_pf:,.0f} events/s, {t_new / t_pf:.1f}x vs compiled)")
+    print(f"event-major : {t_ev:8.3f}s  ({n / t_ev:,.0f} events/s, {t_pf / t_ev:.1f}x vs prefiltered)")
+
+
+if __name__ == "__main__":
+    main()
@@ -49,6 +49,8 @@ class Agent:
         self._stop = threading.Event()
         self._last = {"security": 0, "powershell": 0}
         self._rules = secrules.load_rules(self.rules_path)
+        if self._rules.errors:
+            _write_lines([f"skipped rule {e.get('path') or e.get('rule')}: {e.get('error')}" for e in self._rules.errors])
         self.http_sink = http_sink or {}
         self.hb_interval = float(heartbeat_interval or 0)
         self._last_hb = 0.0
@@ -1,8 +1,11 @@
 import enum
+from pathlib import Path
 import typer
 from rich.console import Console
 from rich.table import Table
 from pcsuite.core import fs
+from pcsuite.core import audit
+from pcsuite.core import journal
 
 class Scope(str, enum.Enum):
     auto = "auto"
@@ -17,18 +20,31 @@ console = Console()
 def preview(
     category: str = typer.Option("temp,browser,dumps,do,recycle", help="Comma list"),
     scope: Scope = typer.Option(Scope.auto, help="Scope: auto|user|all"),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1, help="Scan signature roots in parallel with N threads (helps when roots sit on different or slow drives)"),
+    use_index: bool = typer.Option(False, "--index", help="Reuse unchanged directory listings from the persistent scan index (sizes of files rewritten in place may be stale)"),
 ):
 	cats = [c.strip() for c in category.split(",") if c.strip()]
-	targets = fs.enumerate_targets(cats, scope=scope.value)
-	table = Table(title="Preview: Files to Clean")
-	table.add_column("Path"); table.add_column("Size")
-	total = 0
-	for t in targets:
-		table.add_row(t.path, f"{t.size:,}")
-		total += t.size
+	stats: dict = {}
+	totals = fs.TargetTotals()
+	console.rule("Preview: Files to Clean")
+
+	def _stream():
+		# Print rows as the scan finds them; nothing is buffered
+		for t in totals.track(fs.iter_targets(cats, scope=scope.value, stats=stats, workers=jobs, use_index=use_index)):
+			console.print(f"{t.size:>14,}  {t.path}", markup=False, highlight=False)
+			yield t
+
+	report_path = fs.write_audit_report(_stream(), action="preview")
+	table = Table(title="Preview: Totals by Category")
+	table.add_column("Category"); table.add_column("Files"); table.add_column("Bytes")
+	for cat, agg in totals.by_category.items():
+		table.add_row(cat, f"{agg['count']:,}", f"{agg['bytes']:,}")
 	console.print(table)
-	console.print(f"[bold]Total bytes[/]: {total:,}")
-	report_path = fs.write_audit_report(targets, action="preview")
+	console.print(f"[bold]Total bytes[/]: {totals.bytes:,}")
+	if "checks" in stats:
+		console.print(f"[dim]Scope filter: {stats['checks']:,} checks, {stats['resolves_saved']:,} resolve calls saved[/]")
+	if "index_hits" in stats:
+		console.print(f"[dim]Scan index: {stats['index_hits']:,} directories reused, {stats['index_misses']:,} listed[/]")
 	console.print(f"[green]Audit report written:[/] {report_path}")
 
 @app.command()
@@ -46,19 +62,39 @@ def run(
         False,
         help="If delete/recycle fails (locked), schedule delete on reboot",
     ),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1, help="Scan signature roots in parallel with N threads (helps when roots sit on different or slow drives)"),
+    use_index: bool = typer.Option(False, "--index", help="Use the persistent scan index for the confirmation estimate; the cleanup itself always rescans"),
+    io_jobs: int = typer.Option(1, "--io-jobs", min=1, help="Move/recycle/delete files with N threads"),
+    resume: bool = typer.Option(False, "--resume", help="Continue the latest interrupted quarantine run"),
+    no_journal: bool = typer.Option(False, "--no-journal", help="Do not keep a crash-safe journal of quarantine moves"),
+    dedupe: bool = typer.Option(False, "--dedupe", help="Store identical quarantined files once (hardlinks into a shared blob store)"),
+    no_retention: bool = typer.Option(False, "--no-retention", help="Do not apply the quarantine retention policy after the run"),
 ):
 	cats = [c.strip() for c in category.split(",") if c.strip()]
 	dmode = (delete_mode or "quarantine").lower().strip()
 	if dmode not in {"quarantine", "recycle", "delete"}:
 		console.print(f"[red]Invalid delete mode:[/] {delete_mode}")
 		raise typer.Exit(code=2)
+	journal_path = None
+	if resume:
+		journal_path = fs.find_unfinished_journal()
+		if not journal_path:
+			console.print("[yellow]No interrupted cleanup run to resume[/]")
+			return
+		# Same run, same selection as the interrupted one
+		meta = journal.replay(journal_path).meta
+		cats = meta.get("categories") or cats
+		scope = Scope(meta.get("scope", scope.value))
+		dmode = "quarantine"
+		console.print(f"[cyan]Resuming run from[/] {journal_path}")
 
 	if not dry_run and not yes:
-		preview = fs.enumerate_targets(cats, scope=scope.value)
-		total = sum(t.size for t in preview)
+		totals = fs.TargetTotals()
+		for _ in totals.track(fs.iter_targets(cats, scope=scope.value, workers=jobs, use_index=use_index)):
+			pass
 		proceed = typer.confirm(
 			(
-				f"About to process {len(preview)} files (~{total:,} bytes) using mode='{dmode}'.\n"
+				f"About to process {totals.count} files (~{totals.bytes:,} bytes) using mode='{dmode}'.\n"
 				+ ("Files will be moved to quarantine." if dmode == "quarantine" else (
 					"Files will be sent to Recycle Bin (no rollback)." if dmode == "recycle" else "Files will be permanently deleted (no rollback)."
 				))
@@ -75,6 +111,12 @@ def run(
 		scope=scope.value,
 		delete_mode=dmode,
 		on_reboot_fallback=on_reboot_fallback,
+		workers=jobs,
+		io_workers=io_jobs,
+		use_journal=not no_journal,
+		resume=journal_path,
+		dedupe=dedupe,
+		retention={} if no_retention else None,
 	)
 	msg = (
 		f"Moved: {res['moved']}, Failed: {res['failed']}\n"
@@ -84,32 +126,154 @@ def run(
 		msg += "[yellow]Dry-run: no changes made[/]"
 	else:
 		if res.get("mode") == "quarantine":
-			msg += f"[yellow]Rollback file:[/] {res['rollback_file']}"
+			msg += f"[yellow]Rollback file:[/] {res['rollback_file']}\n"
+			msg += f"Renamed bytes: {res.get('renamed_bytes', 0):,}, Copied bytes: {res.get('copied_bytes', 0):,}"
+			if res.get("deduped"):
+				msg += f"\nDeduplicated: {res['deduped']} files, {res['dedup_saved_bytes']:,} bytes saved (ratio {res['dedup_ratio']}x)"
 		else:
 			msg += "[yellow]No rollback file for this mode[/]"
+		kept = res.get("retention") or {}
+		if kept.get("evicted_runs"):
+			msg += f"\n[yellow]Retention policy purged {len(kept['evicted_runs'])} old run(s)[/], freed bytes: {kept['freed_bytes']:,}"
+		elif kept.get("error"):
+			msg += f"\n[red]Retention policy failed:[/] {kept['error']}"
 	console.print(msg)
 
+@app.command()
+def index(
+	clear: bool = typer.Option(False, help="Delete the scan index; the next scan lists every directory"),
+):
+	"""Show or invalidate the persistent scan index under reports/."""
+	if clear:
+		removed = fs.invalidate_scan_index()
+		console.print("[green]Scan index cleared[/]" if removed else "[yellow]No scan index to clear[/]")
+		return
+	info = fs.scan_index_info()
+	if not info["exists"]:
+		console.print(f"[yellow]No scan index yet[/] ({info['path']})")
+		return
+	console.print(f"Scan index: {info['path']}\nDirectories: {info['directories']:,}\nSize: {info['bytes']:,} bytes")
+
 @app.command()
 def rollback(
-	file: str = typer.Option("", help="Path to reports/rollback_*.json; if empty, use latest"),
+	file: str = typer.Option("", help="Path to reports/rollback_*.jsonl (or legacy .json); if empty, use latest"),
 	dry_run: bool = typer.Option(False, help="Simulate restore; no files moved"),
 	yes: bool = typer.Option(False, help="Skip confirmation prompt"),
+	io_jobs: int = typer.Option(1, "--io-jobs", min=1, help="Restore files with N threads"),
 ):
 	if not dry_run and not yes:
 		proceed = typer.confirm("Restore files from quarantine back to original locations?", default=False)
 		if not proceed:
 			console.print("[yellow]Aborted by user[/]")
 			return
-	res = fs.execute_rollback(file or None, dry_run=dry_run)
+	res = fs.execute_rollback(file or None, dry_run=dry_run, io_workers=io_jobs)
+	if dry_run and res["restore_report"]:
+		# Every planned action, in mapping order
+		console.rule("Rollback plan")
+		for step in audit.read_records(res["restore_report"]):
+			extra = f"  (existing file -> {step['side']})" if step.get("side") else ""
+			console.print(f"{step['action']:<9} {step['bytes']:>14,}  {step['src']}{extra}", markup=False, highlight=False)
+		table = Table(title="Rollback plan by action")
+		table.add_column("Action"); table.add_column("Files")
+		for action, count in sorted(res["actions"].items()):
+			table.add_row(action, f"{count:,}")
+		console.print(table)
 	msg = (
 		f"Restored: {res['restored']}, Failed: {res['failed']}\n"
 		f"[green]Restore report:[/] {res['restore_report']}"
 	)
+	if res.get("bytes") is not None:
+		msg += f"\n{'Estimated' if dry_run else 'Restored'} bytes: {res['bytes']:,}"
+	if dry_run:
+		msg += "\n[yellow]Dry-run: no changes made[/]"
+	console.print(msg)
+
+
+@app.command("runs")
+def runs(
+	verify: bool = typer.Option(False, "--verify", help="Re-walk every run and repair its manifest"),
+):
+	"""List quarantine runs with their file counts and sizes."""
+	catalog = fs.quarantine_catalog(verify=verify)
+	table = Table(title="Quarantine runs")
+	table.add_column("Run"); table.add_column("Created"); table.add_column("Files"); table.add_column("Bytes")
+	for r in catalog:
+		table.add_row(Path(r["run"]).name + (" *" if r.get("repaired") else ""), r.get("created", ""), f"{r['files']:,}", f"{r['bytes']:,}")
+	console.print(table)
+	console.print(f"[bold]Total bytes[/]: {sum(r['bytes'] for r in catalog):,}")
+	if verify and any(r.get("repaired") for r in catalog):
+		console.print("[yellow]* manifest was missing or out of date and has been repaired[/]")
+
+
+@app.command()
+def retain(
+	max_bytes: int = typer.Option(None, "--max-bytes", min=0, help="Keep at most N bytes of quarantine"),
+	max_runs: int = typer.Option(None, "--max-runs", min=0, help="Keep at most N quarantine runs"),
+	min_free_percent: float = typer.Option(None, "--min-free-percent", min=0, max=100, help="Purge until the quarantine volume has N% free"),
+	dry_run: bool = typer.Option(False, help="Show which runs would be purged; no changes"),
+	yes: bool = typer.Option(False, help="Skip confirmation when not dry-run"),
+):
+	"""Apply the quarantine retention policy (retention.yml, overridden by options)."""
+	policy = fs.load_retention_policy()
+	for key, value in (("max_total_bytes", max_bytes), ("max_runs", max_runs), ("min_free_percent", min_free_percent)):
+		if value is not None:
+			policy[key] = value
+	if not policy:
+		console.print("[yellow]No retention limits configured[/]")
+		return
+	if not dry_run and not yes:
+		plan = fs.apply_retention(policy, dry_run=True)
+		if not plan["evicted_runs"]:
+			console.print("Retention policy already satisfied")
+			return
+		proceed = typer.confirm(
+			f"Permanently delete {len(plan['evicted_runs'])} oldest quarantine run(s)? This cannot be undone.",
+			default=False,
+		)
+		if not proceed:
+			console.print("[yellow]Aborted by user[/]")
+			return
+	res = fs.apply_retention(policy, dry_run=dry_run)
+	msg = (
+		f"Policy: {', '.join(f'{k}={v}' for k, v in res['policy'].items())}\n"
+		f"Runs {'to purge' if dry_run else 'purged'}: {len(res['evicted_runs'])}\n"
+		f"Freed bytes: {res['freed_bytes']:,}"
+	)
+	if res["retention_report"]:
+		msg += f"\n[green]Retention report:[/] {res['retention_report']}"
 	if dry_run:
 		msg += "\n[yellow]Dry-run: no changes made[/]"
 	console.print(msg)
 
 
+@app.command()
+def compact(
+	older_than: int = typer.Option(..., "--older-than", min=1, help="Compact runs older than N days"),
+	dry_run: bool = typer.Option(False, help="Show which runs would be compacted; no changes"),
+	yes: bool = typer.Option(False, help="Skip confirmation when not dry-run"),
+):
+	"""Compress old quarantine runs into archives (rollback still works)."""
+	if not dry_run and not yes:
+		proceed = typer.confirm(f"Compress quarantine runs older than {older_than} days?", default=False)
+		if not proceed:
+			console.print("[yellow]Aborted by user[/]")
+			return
+	res = fs.compact_quarantine(older_than, dry_run=dry_run)
+	msg = f"Target runs: {len(res['target_runs'])}\n"
+	if dry_run:
+		msg += f"Bytes to compress: {res['bytes']:,}\n[yellow]Dry-run: no changes made[/]"
+	else:
+		msg += (
+			f"Compacted runs: {res['compacted_runs']}\n"
+			f"Archived bytes: {res['bytes']:,} -> {res['archive_bytes']:,}\n"
+			f"Reclaimed bytes: {res['reclaimed_bytes']:,}\n"
+			f"[green]Compact report:[/] {res['compact_report']}"
+		)
+		for e in res["errors"]:
+			msg += f"\n[red]Failed:[/] {e['run']}: {e['error']}"
+	console.print(msg)
+
+
 @app.command()
 def purge(
     run: str = typer.Option("", help="Quarantine run to purge (timestamp name or path). Use 'latest' to purge latest."),
@@ -117,6 +281,7 @@ def purge(
     all: bool = typer.Option(False, help="Purge all quarantine runs"),
     dry_run: bool = typer.Option(False, help="Show what would be deleted; no changes"),
     yes: bool = typer.Option(False, help="Skip confirmation when not dry-run"),
+    verify: bool = typer.Option(False, "--verify", help="Re-walk runs and repair their manifests before sizing"),
 ):
     """Permanently delete quarantined files to actually free disk space.
 
@@ -167,13 +332,18 @@ def purge(
             return
 
     res = fs.purge_quarantine(
-        run=(run or None), all_runs=all, older_than_days=(older_than or None), dry_run=dry_run
+        run=(run or None), all_runs=all, older_than_days=(older_than or None), dry_run=dry_run, verify=verify
     )
     msg = (
         f"Target runs: {len(res['target_runs'])}\n"
         f"Freed bytes: {res['freed_bytes']:,}\n"
         f"[green]Purge report:[/] {res['purge_report']}"
     )
+    if res.get("dedup_saved_bytes") or res.get("gc_blobs"):
+        msg += (
+            f"\nDedupe: {res['dedup_saved_bytes']:,} bytes saved (ratio {res['dedup_ratio']}x), "
+            f"{res['gc_blobs']} unreferenced blobs removed ({res['gc_bytes']:,} bytes)"
+        )
     if dry_run:
         msg += "\n[yellow]Dry-run: no changes made[/]"
     console.print(msg)
@@ -89,8 +89,11 @@ def allowlist(
 def detect(
     rules: str = typer.Option(..., help="Path to rule file (.yml) or directory"),
     limit: int = typer.Option(200, help="Max events to evaluate"),
+    stats: bool = typer.Option(False, "--stats", help="Show rule index statistics"),
 ):
     res = edr.detect(rules_path=rules, limit=limit)
+    for e in res.get("rule_errors", []):
+        console.print(f"[yellow]Skipped rule[/] {e.get('path') or e.get('rule')}: {e.get('error')}")
     table = Table(title="EDR Rule Matches")
     table.add_column("Rule"); table.add_column("Matches"); table.add_column("Sample Field")
     for m in res.get("matches", []):
@@ -98,6 +101,18 @@ def detect(
         field = (samp.get("Message") or str(list(samp.keys())[:1])) if isinstance(samp, dict) else ""
         table.add_row(m.get("rule",""), str(m.get("count",0)), str(field)[:60])
     console.print(table)
+    if stats:
+        ix = res.get("index", {})
+        st = Table(title="Rule Index")
+        st.add_column("Metric"); st.add_column("Value")
+        st.add_row("Events / rules", f"{res.get('events', 0)} / {res.get('rules', 0)}")
+        st.add_row("Indexed rules", str(ix.get("indexed_rules", 0)))
+        st.add_row("Fallback rules", str(ix.get("fallback_rules", 0)))
+        per_field = lambda d: f" ({', '.join(f'{k}={v}' for k, v in d.items())})" if d else ""
+        st.add_row("Equals buckets", f"{ix.get('equals_buckets', 0)}{per_field(ix.get('equals_fields', {}))}")
+        st.add_row("Contains literals", f"{ix.get('literals', 0)}{per_field(ix.get('literal_fields', {}))}")
+        st.add_row("Avg candidates / event", str(ix.get("avg_candidates", 0)))
+        console.print(st)
 
 
 @app.command("quarantine-file")
@@ -135,6 +150,8 @@ def watch(
         raise typer.Exit(1)
 
     ruleset = _rules.load_rules(rules)
+    for e in ruleset.errors:
+        console.print(f"[yellow]Skipped rule[/] {e.get('path') or e.get('rule')}: {e.get('error')}")
     console.print(f"Loaded {len(ruleset)} rule(s) from {rules}")
     last_ids = {"security": 0, "powershell": 0}
     active = {s.strip().lower() for s in (sources or "").split(",")}
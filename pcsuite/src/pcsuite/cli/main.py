@@ -1,37 +1,72 @@
+"""`pcsuite` command line entry point.
+
+Sub-apps are registered by module name and imported only when one of their
+commands runs (or their own `--help` is shown), so `pcsuite clean preview`
+does not pay for psutil, winreg or the EDR stack. The top-level `--help`
+lists them from the descriptions below without importing anything.
+"""
+import importlib
+
 import typer
-from rich.console import Console
-from pcsuite.cli import (
-    clean,
-    startup,
-    services,
-    tasks,
-    optimize,
-    security,
-    schedule,
-    process,
-    drivers,
-    registry,
-    system,
-    ui,
-    edr,
-)
-
-app = typer.Typer(add_completion=False)
-console = Console()
-
-app.add_typer(clean.app, name="clean")
-app.add_typer(startup.app, name="startup")
-app.add_typer(services.app, name="services")
-app.add_typer(tasks.app, name="tasks")
-app.add_typer(optimize.app, name="optimize")
-app.add_typer(security.app, name="security")
-app.add_typer(schedule.app, name="schedule")
-app.add_typer(process.app, name="process")
-app.add_typer(drivers.app, name="drivers")
-app.add_typer(registry.app, name="registry")
-app.add_typer(system.app, name="system")
-app.add_typer(ui.app, name="ui")
-app.add_typer(edr.app, name="edr")
+from typer.core import TyperGroup
+
+# Command name -> (module defining `app`, description for `pcsuite --help`)
+SUBAPPS: dict[str, tuple[str, str]] = {
+    "clean": ("pcsuite.cli.clean", "Junk file cleanup with quarantine, rollback and purge"),
+    "startup": ("pcsuite.cli.startup", "Startup entries (read-only list for HKCU/HKLM and Startup folders)"),
+    "services": ("pcsuite.cli.services", "Windows services helper (list only; safe by default)"),
+    "tasks": ("pcsuite.cli.tasks", "Scheduled tasks via schtasks (read-only)"),
+    "optimize": ("pcsuite.cli.optimize", "Optimization profiles (list/apply with dry-run)"),
+    "security": ("pcsuite.cli.security", "Security checks and tools"),
+    "schedule": ("pcsuite.cli.schedule", "Simple wrappers for scheduling (schtasks)"),
+    "process": ("pcsuite.cli.process", "Process tools: list and kill (supports --dry-run)"),
+    "drivers": ("pcsuite.cli.drivers", "Driver tools: list installed and trigger Windows Update scan/install"),
+    "registry": ("pcsuite.cli.registry", "Registry cleaner: preview, run, rollback (HKCU MRUs)"),
+    "system": ("pcsuite.cli.system", "System information: OS, CPU, RAM, BIOS, uptime"),
+    "ui": ("pcsuite.cli.ui", "Launch UI frontends"),
+    "edr": ("pcsuite.cli.edr", "EDR prototype: status, isolation, triage, scans"),
+}
+
+
+class LazyGroup(TyperGroup):
+    """Root command group that imports a sub-app on first use."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._listing = False
+
+    def list_commands(self, ctx) -> list[str]:
+        return list(SUBAPPS)
+
+    def get_command(self, ctx, cmd_name: str):
+        if cmd_name not in SUBAPPS:
+            return None
+        if self._listing:
+            # Name and description are all the command list needs
+            return TyperGroup(name=cmd_name, help=SUBAPPS[cmd_name][1])
+        cmd = self.commands.get(cmd_name)
+        if cmd is None:
+            module = importlib.import_module(SUBAPPS[cmd_name][0])
+            cmd = typer.main.get_group(module.app)
+            cmd.name = cmd_name
+            self.commands[cmd_name] = cmd
+        return cmd
+
+    def format_help(self, ctx, formatter) -> None:
+        self._listing = True
+        try:
+            super().format_help(ctx, formatter)
+        finally:
+            self._listing = False
+
+
+app = typer.Typer(add_completion=False, cls=LazyGroup)
+
+
+@app.callback()
+def main() -> None:
+    """PCSuite: Windows maintenance, cleanup and security tools."""
+
 
 if __name__ == "__main__":
 	app()
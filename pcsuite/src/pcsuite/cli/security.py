@@ -1,4 +1,5 @@
 import json
+import time
 import typer
 from rich.console import Console
 from rich.table import Table
@@ -23,7 +24,7 @@ def check():
         table.add_row("Defender (WinDefend)", "not found")
 
     # Firewall
-    code, out, err = shell.cmdline("netsh advfirewall show allprofiles")
+    code, out, err = shell.cached("cmd", "netsh advfirewall show allprofiles")
     if code == 0 and ("State" in out):
         # Try to extract 'ON'/'OFF'
         states = []
@@ -37,12 +38,41 @@ def check():
     console.print(table)
 
 
+# Read-only posture queries shared by `audit` and `harden`
+Q_FIREWALL = shell.Command("cmd", "netsh advfirewall show allprofiles", cache=True)
+Q_RDP = ("pwsh", "(Get-ItemProperty 'HKLM:\\System\\CurrentControlSet\\Control\\Terminal Server' -Name fDenyTSConnections -ErrorAction SilentlyContinue).fDenyTSConnections")
+Q_UAC = ("pwsh", "(Get-ItemProperty 'HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Policies\\System' -Name EnableLUA -ErrorAction SilentlyContinue).EnableLUA")
+Q_SMARTSCREEN = ("pwsh", "(Get-ItemProperty 'HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer' -Name SmartScreenEnabled -ErrorAction SilentlyContinue).SmartScreenEnabled")
+Q_BITLOCKER = ("cmd", "manage-bde -status")
+
+
+def _firewall_states(out: str) -> list[str]:
+    return [line.split()[-1] for line in out.splitlines() if line.strip().startswith("State")]
+
+
+def _print_timings(labels: list[str], results: list, wall: float) -> None:
+    t = Table(title="Timings")
+    t.add_column("Check"); t.add_column("Exit"); t.add_column("ms", justify="right")
+    for label, r in zip(labels, results):
+        t.add_row(label, str(r.code), f"{r.seconds * 1000:.0f}")
+    t.add_row("total (wall)", "", f"{wall * 1000:.0f}")
+    console.print(t)
+
+
 @app.command()
-def audit():
+def audit(timings: bool = typer.Option(False, "--timings", help="Show how long each check took")):
     """Audit common security posture settings (read-only)."""
     table = Table(title="Security Audit")
     table.add_column("Check"); table.add_column("Value")
 
+    # The queries are independent: run them together
+    labels = ["Firewall", "Remote Desktop", "UAC", "SmartScreen", "BitLocker"]
+    started = time.perf_counter()
+    fw_res, rdp_res, uac_res, ss_res, bde_res = results = shell.run_many(
+        [Q_FIREWALL, Q_RDP, Q_UAC, Q_SMARTSCREEN, Q_BITLOCKER]
+    )
+    wall = time.perf_counter() - started
+
     # Defender service
     try:
         svc = psutil.win_service_get("WinDefend").as_dict()
@@ -51,18 +81,14 @@ def audit():
         table.add_row("Defender (WinDefend)", "not found")
 
     # Firewall profile states
-    code, out, err = shell.cmdline("netsh advfirewall show allprofiles")
+    code, out, err = fw_res
     if code == 0 and ("State" in out):
-        states = []
-        for line in out.splitlines():
-            if line.strip().startswith("State"):
-                states.append(line.split()[-1])
-        table.add_row("Firewall (All Profiles)", ", ".join(states) or "unknown")
+        table.add_row("Firewall (All Profiles)", ", ".join(_firewall_states(out)) or "unknown")
     else:
         table.add_row("Firewall", f"error: {err}" if err else "unknown")
 
     # RDP (fDenyTSConnections = 0 means allowed)
-    code, out, err = shell.pwsh("(Get-ItemProperty 'HKLM:\\System\\CurrentControlSet\\Control\\Terminal Server' -Name fDenyTSConnections -ErrorAction SilentlyContinue).fDenyTSConnections")
+    code, out, err = rdp_res
     if code == 0 and out.strip():
         val = out.strip()
         enabled = (val == "0")
@@ -71,14 +97,14 @@ def audit():
         table.add_row("Remote Desktop", "unknown")
 
     # UAC
-    code, out, err = shell.pwsh("(Get-ItemProperty 'HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Policies\\System' -Name EnableLUA -ErrorAction SilentlyContinue).EnableLUA")
+    code, out, err = uac_res
     if code == 0 and out.strip():
         table.add_row("UAC (EnableLUA)", "On" if out.strip() == "1" else "Off")
     else:
         table.add_row("UAC (EnableLUA)", "unknown")
 
     # SmartScreen (best-effort)
-    code, out, err = shell.pwsh("(Get-ItemProperty 'HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer' -Name SmartScreenEnabled -ErrorAction SilentlyContinue).SmartScreenEnabled")
+    code, out, err = ss_res
     if code == 0 and out.strip():
         table.add_row("SmartScreen", out.strip())
     else:
@@ -92,7 +118,7 @@ def audit():
         table.add_row("Windows Update (wuauserv)", "not found")
 
     # BitLocker status (manage-bde)
-    code, out, err = shell.cmdline("manage-bde -status")
+    code, out, err = bde_res
     if code == 0:
         # naive detection of Protection Status lines
         prot = []
@@ -104,6 +130,8 @@ def audit():
         table.add_row("BitLocker", "unknown")
 
     console.print(table)
+    if timings:
+        _print_timings(labels, results, wall)
 
 
 @app.command("ports")
@@ -188,8 +216,12 @@ def file_reputation(path: str):
     console.print(table)
 
 
-def _pwsh_json(cmd: str):
-    code, out, err = shell.pwsh(f"{cmd} | ConvertTo-Json -Depth 4")
+def _json_query(cmd: str) -> tuple[str, str]:
+    return ("pwsh", f"{cmd} | ConvertTo-Json -Depth 4")
+
+
+def _parse_json(result):
+    code, out, err = result
     if code != 0 or not out.strip():
         return None
     try:
@@ -198,6 +230,12 @@ def _pwsh_json(cmd: str):
         return None
 
 
+def _first(obj) -> dict:
+    if isinstance(obj, list):
+        obj = obj[0] if obj else {}
+    return obj if isinstance(obj, dict) else {}
+
+
 @app.command()
 def harden(
     profile: str = typer.Option("baseline", help="Hardening profile: baseline|minimal"),
@@ -206,6 +244,7 @@ def harden(
     restart_explorer: bool = typer.Option(
         False, help="Offer to restart Explorer after apply (to apply user UI tweaks)"
     ),
+    timings: bool = typer.Option(False, "--timings", help="Show how long each detection query took"),
 ):
     """Baseline hardening checklist with optional apply.
 
@@ -213,60 +252,40 @@ def harden(
     Use --apply (and optionally --yes) to make changes.
     """
 
-    def firewall_state():
-        code, out, err = shell.cmdline("netsh advfirewall show allprofiles")
+    def firewall_state(result):
+        code, out, err = result
         if code == 0:
-            states = []
-            for line in out.splitlines():
-                if line.strip().startswith("State"):
-                    states.append(line.split()[-1])
+            states = _firewall_states(out)
             return ",".join(states) if states else "unknown"
         return "unknown"
 
-    def rdp_enabled():
-        code, out, err = shell.pwsh("(Get-ItemProperty 'HKLM:\\System\\CurrentControlSet\\Control\\Terminal Server' -Name fDenyTSConnections -ErrorAction SilentlyContinue).fDenyTSConnections")
+    def reg_flag(result, on: str):
+        code, out, err = result
         if code == 0 and out.strip():
-            return out.strip() == "0"
+            return out.strip() == on
         return None
 
-    def uac_enabled():
-        code, out, err = shell.pwsh("(Get-ItemProperty 'HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Policies\\System' -Name EnableLUA -ErrorAction SilentlyContinue).EnableLUA")
-        if code == 0 and out.strip():
-            return out.strip() == "1"
-        return None
-
-    def smartscreen_mode():
-        code, out, err = shell.pwsh("(Get-ItemProperty 'HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer' -Name SmartScreenEnabled -ErrorAction SilentlyContinue).SmartScreenEnabled")
-        if code == 0 and out.strip():
-            return out.strip()
-        return "unknown"
-
-    def defender_prefs():
-        prefs = _pwsh_json("Get-MpPreference | Select-Object DisableRealtimeMonitoring, PUAProtection, EnableNetworkProtection, MAPSReporting, SubmitSamplesConsent")
-        if isinstance(prefs, list):
-            prefs = prefs[0] if prefs else {}
-        return prefs or {}
-
-    def smb1_state():
-        info = _pwsh_json("Get-WindowsOptionalFeature -Online -FeatureName SMB1Protocol | Select-Object State")
-        if isinstance(info, list):
-            info = info[0] if info else {}
-        return (info or {}).get("State", "unknown")
+    def reg_value(result):
+        code, out, err = result
+        return out.strip() if code == 0 and out.strip() else "unknown"
 
     actions: list[dict] = []
     profile = (profile or "baseline").lower()
     if profile == "minimal":
         # Non-admin, user-scope tweaks (HKCU)
         def _q_hkcu(path: str, name: str):
-            code, out, err = shell.pwsh(
-                f"(Get-ItemProperty '{path}' -Name {name} -ErrorAction SilentlyContinue).{name}"
-            )
-            return out.strip() if code == 0 and out.strip() else "unknown"
-
-        cur_hideext = _q_hkcu("HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\Advanced", "HideFileExt")
-        cur_hidden = _q_hkcu("HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\Advanced", "Hidden")
-        cur_autoplay = _q_hkcu("HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\AutoplayHandlers", "DisableAutoplay")
-        cur_autorun = _q_hkcu("HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Policies\\Explorer", "NoDriveTypeAutoRun")
+            return ("pwsh", f"(Get-ItemProperty '{path}' -Name {name} -ErrorAction SilentlyContinue).{name}")
+
+        labels = ["HideFileExt", "Hidden", "DisableAutoplay", "NoDriveTypeAutoRun"]
+        started = time.perf_counter()
+        results = shell.run_many([
+            _q_hkcu("HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\Advanced", "HideFileExt"),
+            _q_hkcu("HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\Advanced", "Hidden"),
+            _q_hkcu("HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\AutoplayHandlers", "DisableAutoplay"),
+            _q_hkcu("HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Policies\\Explorer", "NoDriveTypeAutoRun"),
+        ])
+        wall = time.perf_counter() - started
+        cur_hideext, cur_hidden, cur_autoplay, cur_autorun = (reg_value(r) for r in results)
 
         actions = [
             {
@@ -303,13 +322,24 @@ def harden(
             },
         ]
     else:
-        # Detect current (baseline)
-        cur_fw = firewall_state()
-        cur_rdp = rdp_enabled()
-        cur_uac = uac_enabled()
-        cur_ss = smartscreen_mode()
-        cur_def = defender_prefs()
-        cur_smb1 = smb1_state()
+        # Detect current (baseline); the queries are independent, run them together
+        labels = ["Firewall", "Remote Desktop", "UAC", "SmartScreen", "Defender preferences", "SMBv1"]
+        started = time.perf_counter()
+        results = shell.run_many([
+            Q_FIREWALL,
+            Q_RDP,
+            Q_UAC,
+            Q_SMARTSCREEN,
+            _json_query("Get-MpPreference | Select-Object DisableRealtimeMonitoring, PUAProtection, EnableNetworkProtection, MAPSReporting, SubmitSamplesConsent"),
+            _json_query("Get-WindowsOptionalFeature -Online -FeatureName SMB1Protocol | Select-Object State"),
+        ])
+        wall = time.perf_counter() - started
+        cur_fw = firewall_state(results[0])
+        cur_rdp = reg_flag(results[1], "0")
+        cur_uac = reg_flag(results[2], "1")
+        cur_ss = reg_value(results[3])
+        cur_def = _first(_parse_json(results[4]))
+        cur_smb1 = _first(_parse_json(results[5])).get("State", "unknown")
 
         actions = [
             {
@@ -385,6 +415,8 @@ def harden(
     for a in actions:
         table.add_row(a["id"], a["desc"], str(a["current"]), str(a["target"]), "yes" if a["admin"] else "no")
     console.print(table)
+    if timings:
+        _print_timings(labels, results, wall)
 
     if not apply:
         console.print("[yellow]What-if mode[/]: no changes will be made. Use --apply to enforce.")
@@ -396,13 +428,13 @@ def harden(
             return
 
     # Apply changes
-    results = Table(title="Apply Results")
-    results.add_column("ID"); results.add_column("Status"); results.add_column("Detail")
+    table = Table(title="Apply Results")
+    table.add_column("ID"); table.add_column("Status"); table.add_column("Detail")
     is_admin = elevation.is_admin()
     any_ok = False
     for a in actions:
         if a["admin"] and not is_admin:
-            results.add_row(a["id"], "skipped", "requires admin")
+            table.add_row(a["id"], "skipped", "requires admin")
             continue
         # Use cmd.exe for reg/netsh or PowerShell passthrough
         cmd = a["apply"]
@@ -411,11 +443,13 @@ def harden(
         else:
             code, out, err = shell.cmdline(cmd)
         if code == 0:
-            results.add_row(a["id"], "ok", out.strip()[:200] if out else "")
+            table.add_row(a["id"], "ok", out.strip()[:200] if out else "")
             any_ok = True
         else:
-            results.add_row(a["id"], "error", (err or out or "").strip()[:200])
-    console.print(results)
+            table.add_row(a["id"], "error", (err or out or "").strip()[:200])
+    # Applied settings change what the cached posture queries report
+    shell.invalidate()
+    console.print(table)
     if profile == "minimal" and any_ok:
         console.print(
             "[yellow]Note[/]: Some Explorer settings may require restarting Explorer or signing out/in to take effect."
@@ -1,6 +1,7 @@
 import json
 import platform
 import datetime
+import time
 import psutil
 import typer
 from rich.console import Console
@@ -13,7 +14,11 @@ console = Console()
 
 
 def _pwsh_json(cmd: str) -> dict | list | None:
-    code, out, err = shell.pwsh(f"{cmd} | ConvertTo-Json -Depth 4")
+    return _parse_json(shell.pwsh(f"{cmd} | ConvertTo-Json -Depth 4"))
+
+
+def _parse_json(result) -> dict | list | None:
+    code, out, err = result
     if code != 0 or not out.strip():
         return None
     try:
@@ -120,13 +125,24 @@ def _bytes_to_gib(n: int | float | None) -> str:
         return "?"
 
 
+# `system drives` queries, run together: (label, PowerShell pipeline)
+DRIVE_QUERIES = [
+    ("Volumes", "Get-CimInstance Win32_LogicalDisk | Select-Object DeviceID,VolumeName,FileSystem,Size,FreeSpace,DriveType"),
+    ("Physical disks", "Get-PhysicalDisk | Select-Object FriendlyName,SerialNumber,MediaType,HealthStatus,OperationalStatus,Size"),
+    ("Disk drives", "Get-CimInstance Win32_DiskDrive | Select-Object Index,Model,SerialNumber,Status,Size,InterfaceType,PNPDeviceID,DeviceID"),
+    ("SMART", "Get-WmiObject -Namespace root\\wmi -Class MSStorageDriver_FailurePredictStatus | Select-Object InstanceName,PredictFailure"),
+]
+
+
 @app.command()
-def drives():
+def drives(timings: bool = typer.Option(False, "--timings", help="Show how long each query took")):
     """Show logical volumes and physical disks with health/SMART (best-effort)."""
+    started = time.perf_counter()
+    results = shell.run_many([("pwsh", f"{cmd} | ConvertTo-Json -Depth 4") for _, cmd in DRIVE_QUERIES])
+    wall = time.perf_counter() - started
+    vols, pds, wdd, smart = (_parse_json(r) for r in results)
+
     # Logical volumes via Win32_LogicalDisk for label/fs/size/free
-    vols = _pwsh_json(
-        "Get-CimInstance Win32_LogicalDisk | Select-Object DeviceID,VolumeName,FileSystem,Size,FreeSpace,DriveType"
-    )
     if isinstance(vols, dict):
         vols = [vols]
     vt = Table(title="Volumes")
@@ -154,19 +170,13 @@ def drives():
     console.print(vt)
 
     # Physical disks via Get-PhysicalDisk (health) and Win32_DiskDrive (model/serial)
-    pds = _pwsh_json(
-        "Get-PhysicalDisk | Select-Object FriendlyName,SerialNumber,MediaType,HealthStatus,OperationalStatus,Size"
-    ) or []
+    pds = pds or []
     if isinstance(pds, dict):
         pds = [pds]
-    wdd = _pwsh_json(
-        "Get-CimInstance Win32_DiskDrive | Select-Object Index,Model,SerialNumber,Status,Size,InterfaceType,PNPDeviceID,DeviceID"
-    ) or []
+    wdd = wdd or []
     if isinstance(wdd, dict):
         wdd = [wdd]
-    smart = _pwsh_json(
-        "Get-WmiObject -Namespace root\\wmi -Class MSStorageDriver_FailurePredictStatus | Select-Object InstanceName,PredictFailure"
-    ) or []
+    smart = smart or []
     if isinstance(smart, dict):
         smart = [smart]
 
@@ -218,3 +228,11 @@ def drives():
             dt.add_row(str(model), str(serial) or "", "", _bytes_to_gib(size), str(status) or "", guess_smart(model, serial))
 
     console.print(dt)
+
+    if timings:
+        tt = Table(title="Timings")
+        tt.add_column("Query"); tt.add_column("Exit"); tt.add_column("ms", justify="right")
+        for (label, _), r in zip(DRIVE_QUERIES, results):
+            tt.add_row(label, str(r.code), f"{r.seconds * 1000:.0f}")
+        tt.add_row("total (wall)", "", f"{wall * 1000:.0f}")
+        console.print(tt)
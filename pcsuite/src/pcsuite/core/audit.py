@@ -1 +1,95 @@
-# JSON reports per run (stub)
+"""Per-run reports written as JSON Lines.
+
+Records are appended one per line as files are processed and flushed every
+`flush_every` records or `flush_seconds`, so memory stays flat for huge runs
+and a crash still leaves every record up to the last flush on disk.
+`read_records` reads both these `.jsonl` files and the older single-list
+`.json` reports.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import time
+from typing import Iterator
+
+
+# One shared encoder: json.dumps with custom separators builds a new one per call
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class JsonlWriter:
+    """Append-only JSONL report; use as a context manager or call `close()`."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        flush_every: int = 1000,
+        flush_seconds: float = 2.0,
+        append: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.count = 0
+        self._flush_every = max(1, flush_every)
+        self._flush_seconds = flush_seconds
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._f = open(self.path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, record: dict) -> None:
+        self._f.write(_encode(record) + "\n")
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self._flush_every or time.monotonic() - self._last_flush >= self._flush_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        self._f.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_records(path: str | os.PathLike) -> Iterator[dict]:
+    """Yield the records of a `.jsonl` report or a legacy `.json` list report.
+
+    A torn last line (the run crashed mid-write) is skipped.
+    """
+    p = Path(path)
+    if p.suffix.lower() == ".jsonl":
+        with open(p, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict):
+                    yield rec
+        return
+    with open(p, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for rec in data if isinstance(data, list) else []:
+        if isinstance(rec, dict):
+            yield rec
+
+
+def latest_report(reports_dir: str | os.PathLike, prefix: str) -> str:
+    """Return the newest `<prefix>_<ts>.json[l]` report in `reports_dir`, or ""."""
+    d = Path(reports_dir)
+    files = list(d.glob(f"{prefix}_*.json")) + list(d.glob(f"{prefix}_*.jsonl"))
+    # Timestamps sort lexically; order by stem so .json and .jsonl interleave correctly
+    files.sort(key=lambda p: (p.stem, p.suffix))
+    return str(files[-1]) if files else ""
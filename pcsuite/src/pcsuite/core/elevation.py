@@ -1,8 +1,7 @@
-import ctypes
-
-
 def is_admin() -> bool:
     try:
+        import ctypes
+
         return bool(ctypes.windll.shell32.IsUserAnAdmin())
     except Exception:
         return False
@@ -0,0 +1,73 @@
+"""Bounded thread pool that runs per-file work and yields results in input order."""
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _batches(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_batches(
+    fn: Callable[[list[T]], list[R]],
+    items: Iterable[T],
+    workers: int = 1,
+    batch: int = 64,
+    window: int | None = None,
+) -> Iterator[R]:
+    """Call `fn` on consecutive batches of `items` and yield its results in order.
+
+    `fn` takes a list of items and returns one result per item. Batches run on
+    a pool of `workers` threads with at most `window` batches (default: 2 per
+    worker) in flight, so `items` can be a lazy stream and memory stays
+    bounded. `fn` should handle its own errors; an exception escaping `fn` is
+    re-raised here when its batch comes up.
+    """
+    chunks = _batches(items, max(1, batch))
+    if workers <= 1:
+        for chunk in chunks:
+            yield from fn(chunk)
+        return
+    limit = max(workers, window or workers * 2)
+    pending: deque = deque()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pcsuite-io")
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(fn, chunk))
+            if len(pending) >= limit:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def map_ordered(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    workers: int = 1,
+    batch: int = 64,
+    window: int | None = None,
+) -> Iterator[R]:
+    """Yield `fn(item)` for each item, in input order.
+
+    With `workers <= 1` this is a plain loop. Otherwise items are handed to the
+    pool `batch` at a time (one future per batch keeps scheduling overhead off
+    the per-file path); see `map_batches`.
+    """
+    if workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+    yield from map_batches(lambda chunk: [fn(x) for x in chunk], items, workers=workers, batch=batch, window=window)
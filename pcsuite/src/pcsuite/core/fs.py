@@ -1,31 +1,65 @@
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable, Iterator
 import os
-import yaml
 import glob
 import datetime
 import json
 import shutil
 import stat
-import ctypes
-from ctypes import wintypes
+import time
+from . import audit
 from . import elevation
+from . import executor
+from . import journal
+from . import quarantine
+from . import scan
+from . import scan_index
+from . import sigdb
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 SIGNATURES_PATH = DATA_DIR / "signatures.yml"
 EXCLUSIONS_PATH = DATA_DIR / "exclusions.yml"
+RETENTION_PATH = DATA_DIR / "retention.yml"
 REPORTS_DIR = Path.cwd() / "reports"
 QUARANTINE_DIR = REPORTS_DIR / "quarantine"
+SCAN_INDEX_NAME = "scan_index.sqlite3"
 
 @dataclass
 class Target:
     path: str
     size: int
+    category: str | None = None
+
+
+class TargetTotals:
+    """Running count/bytes per category for a stream of targets."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.bytes = 0
+        self.by_category: dict[str, dict[str, int]] = {}
+
+    def add(self, target: Target) -> None:
+        self.count += 1
+        self.bytes += target.size
+        agg = self.by_category.setdefault(target.category or "", {"count": 0, "bytes": 0})
+        agg["count"] += 1
+        agg["bytes"] += target.size
+
+    def track(self, targets: Iterable[Target]) -> Iterator[Target]:
+        """Pass targets through while counting them."""
+        for t in targets:
+            self.add(t)
+            yield t
 
 def _load_yaml(path):
     if not path.exists():
         return {}
+    # Lazy import: scans read signatures through the sigdb cache instead
+    import yaml
+
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f) or {}
 
@@ -35,7 +69,7 @@ def _expand_env_glob(pattern):
     return glob.glob(expanded, recursive=True)
 
 def _is_excluded(path, exclusions):
-    # Simple exclusion check (can be improved)
+    # Reference implementation of the exclusion check; see scan.ExclusionMatcher
     for ex in exclusions:
         if Path(path).match(ex):
             return True
@@ -71,6 +105,7 @@ def _user_roots() -> list[Path]:
 
 
 def _is_under_any(path: str, roots: list[Path]) -> bool:
+    # Reference implementation of the scope check; see scan.ScopeFilter
     p = _norm(path)
     for root in roots:
         try:
@@ -80,13 +115,33 @@ def _is_under_any(path: str, roots: list[Path]) -> bool:
             continue
     return False
 
-def enumerate_targets(categories, scope: str = "auto"):
-    sigs = _load_yaml(SIGNATURES_PATH)
-    excls = _load_yaml(EXCLUSIONS_PATH)
-    exclusions = excls.get("paths", []) if isinstance(excls, dict) else []
-    targets = []
-    if not sigs or "categories" not in sigs:
-        return []
+def signature_db() -> sigdb.SignatureDB:
+    """Signatures and exclusions, parsed once per process and per file change."""
+    return sigdb.load(SIGNATURES_PATH, EXCLUSIONS_PATH, cache_dir=REPORTS_DIR)
+
+
+def iter_targets(
+    categories,
+    scope: str = "auto",
+    stats: dict | None = None,
+    workers: int = 1,
+    use_index: bool = False,
+) -> Iterator[Target]:
+    """Yield files matched by the given signature categories as they are found.
+
+    Files reachable through overlapping roots are reported once. With
+    `workers > 1` signature roots are scanned concurrently; the output is the
+    same as the sequential scan. With `use_index` directory listings are
+    cached in `reports/scan_index.sqlite3` and re-read only for directories
+    whose mtime changed; sizes of files rewritten in place can then be stale
+    (see `scan_index`), so it is meant for previews and estimates only. If
+    `stats` is given it is updated with scope-filter and index counters once
+    the stream is exhausted.
+    """
+    db = signature_db()
+    excluded = db.matcher
+    if not db.categories:
+        return
     # Resolve scope
     sc = (scope or "auto").lower()
     if sc not in {"auto", "user", "all"}:
@@ -94,58 +149,154 @@ def enumerate_targets(categories, scope: str = "auto"):
     if sc == "auto":
         sc = "all" if elevation.is_admin() else "user"
     user_only = sc == "user"
-    allowed_roots = _user_roots() if user_only else []
-    for cat in categories:
-        cat = cat.strip()
-        catdef = sigs["categories"].get(cat)
-        if not catdef:
-            continue
-        globs = catdef.get("globs", [])
-        for pattern in globs:
-            for fpath in _expand_env_glob(pattern):
-                if not os.path.isfile(fpath):
-                    continue
-                if _is_excluded(fpath, exclusions):
-                    continue
-                if user_only and not _is_under_any(fpath, allowed_roots):
-                    # Skip files outside of user-writable roots in non-admin mode
-                    continue
-                try:
-                    size = os.path.getsize(fpath)
-                except Exception:
-                    size = 0
-                targets.append(Target(path=fpath, size=size))
-    return targets
+    in_scope = scan.ScopeFilter(_user_roots()) if user_only else None
+    # Expand every category's globs up front so shared roots are walked once
+    patterns, pattern_cats = db.patterns(categories)
+    index = scan_index.ScanIndex(REPORTS_DIR / SCAN_INDEX_NAME) if use_index else None
+    try:
+        for idx, fpath, size in scan.iter_files(patterns, workers=workers, dedupe=True, index=index):
+            if excluded and excluded.matches(fpath):
+                continue
+            if in_scope is not None and not in_scope.contains(fpath):
+                # Skip files outside of user-writable roots in non-admin mode
+                continue
+            yield Target(path=fpath, size=size, category=pattern_cats[idx])
+    finally:
+        if index is not None:
+            index.close()
+    if stats is not None:
+        if in_scope is not None:
+            stats.update(in_scope.stats())
+        if index is not None:
+            stats.update(index.stats())
+
+
+def enumerate_targets(
+    categories,
+    scope: str = "auto",
+    stats: dict | None = None,
+    workers: int = 1,
+    use_index: bool = False,
+):
+    """Return the list of files matched by the given signature categories."""
+    return list(
+        iter_targets(categories, scope=scope, stats=stats, workers=workers, use_index=use_index)
+    )
+
+
+def scan_index_info() -> dict:
+    return scan_index.index_info(REPORTS_DIR / SCAN_INDEX_NAME)
+
+
+def invalidate_scan_index() -> bool:
+    """Drop the persistent scan index so the next scan lists every directory."""
+    return scan_index.clear_index(REPORTS_DIR / SCAN_INDEX_NAME)
 
 def write_audit_report(targets, action="preview"):
+    """Write targets to a JSONL report, one line per target; `targets` may be a lazy stream."""
     REPORTS_DIR.mkdir(exist_ok=True)
     ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
-    report_path = REPORTS_DIR / f"{action}_{ts}.json"
-    with open(report_path, "w", encoding="utf-8") as f:
-        json.dump([t.__dict__ for t in targets], f, indent=2)
+    report_path = REPORTS_DIR / f"{action}_{ts}.jsonl"
+    with audit.JsonlWriter(report_path) as w:
+        for t in targets:
+            w.write(t.__dict__)
     return str(report_path)
 
 
 def list_quarantine_runs() -> list[str]:
     """Return sorted list of quarantine run directories as strings."""
     QUARANTINE_DIR.mkdir(exist_ok=True)
-    runs = [p for p in QUARANTINE_DIR.iterdir() if p.is_dir()]
+    runs = [p for p in QUARANTINE_DIR.iterdir() if quarantine.is_run_dir(p)]
     runs.sort()
     return [str(p) for p in runs]
 
 
-def _dir_size(path: Path) -> int:
-    total = 0
-    try:
-        for p in path.rglob("*"):
-            try:
-                if p.is_file():
-                    total += p.stat().st_size
-            except Exception:
-                continue
-    except Exception:
-        return 0
-    return total
+def quarantine_catalog(verify: bool = False) -> list[dict]:
+    """List quarantine runs with file count, bytes and creation time.
+
+    Sizes come from each run's manifest; `verify` re-walks every run and
+    repairs manifests that are missing or wrong.
+    """
+    out = []
+    for r in list_quarantine_runs():
+        info = quarantine.run_info(r, verify=verify)
+        out.append({"run": r, **info})
+    return out
+
+
+def _runs_older_than(runs: list[Path], days: int, now: datetime.datetime | None = None) -> list[Path]:
+    cutoff = (now or datetime.datetime.now()) - datetime.timedelta(days=days)
+    out = []
+    for r in runs:
+        try:
+            # parse timestamp folder name if follows YYYYMMDD-HHMMSS, else fallback to mtime
+            dt = datetime.datetime.strptime(r.name, "%Y%m%d-%H%M%S")
+        except Exception:
+            dt = datetime.datetime.fromtimestamp(r.stat().st_mtime)
+        if dt < cutoff:
+            out.append(r)
+    return out
+
+
+def _disk_bytes(info: dict) -> int:
+    # What a run occupies on disk, from its manifest
+    if "archive_bytes" in info:
+        # Compacted: the archive is all that is left
+        return info["archive_bytes"]
+    # Deduplicated: at most this much is freed once the run's blobs are collected
+    return info["bytes"] - info.get("dedup_saved_bytes", 0)
+
+
+def _home_volume_bytes(run: Path, info: dict) -> int:
+    # What evicting a run frees on the volume holding QUARANTINE_DIR; the parts
+    # of a run on other volumes do not help that volume's free space
+    if "archive_bytes" in info or len(quarantine.run_dirs(run)) == 1:
+        return _disk_bytes(info)
+    return min(info.get("home_bytes", 0), _disk_bytes(info))
+
+
+def _delete_runs(candidates: list[Path], dry_run: bool = False, verify: bool = False, infos: dict | None = None) -> dict:
+    # Shared by purge and retention; `infos` are manifests the caller already read
+    deleted_runs = 0
+    freed_bytes = 0
+    logical_bytes = 0
+    saved_bytes = 0
+    errors: list[dict] = []
+    stores: set[Path] = set()
+    for r in candidates:
+        # Per-volume directories first, so the home run (and its volumes.json) goes last
+        dirs = quarantine.run_dirs(r)[::-1]
+        info = (infos or {}).get(r) or quarantine.run_info(r, verify=verify)
+        size = _disk_bytes(info)
+        logical_bytes += info["bytes"]
+        saved_bytes += info.get("dedup_saved_bytes", 0)
+        if info.get("dedupe") and "archive_bytes" not in info:
+            stores.update(quarantine.store_dirs(r))
+            # Blob content is only freed by the garbage collection below
+            if not dry_run:
+                size = 0
+        if dry_run:
+            freed_bytes += size
+            continue
+        try:
+            for d in dirs:
+                shutil.rmtree(d, ignore_errors=False)
+            deleted_runs += 1
+            freed_bytes += size
+        except Exception as ex:
+            errors.append({"run": str(r), "error": str(ex)})
+    gc = {"gc_blobs": 0, "gc_bytes": 0}
+    if stores and not dry_run:
+        gc = quarantine.collect_garbage(sorted(stores))
+        freed_bytes += gc["gc_bytes"]
+    return {
+        "deleted_runs": deleted_runs,
+        "freed_bytes": freed_bytes,
+        "errors": errors,
+        "dedup_saved_bytes": saved_bytes,
+        "dedup_ratio": round(logical_bytes / (logical_bytes - saved_bytes), 3) if logical_bytes > saved_bytes else 1.0,
+        **gc,
+    }
 
 
 def purge_quarantine(
@@ -153,6 +304,7 @@ def purge_quarantine(
     all_runs: bool = False,
     older_than_days: int | None = None,
     dry_run: bool = False,
+    verify: bool = False,
 ):
     """Permanently delete files in quarantine.
 
@@ -160,26 +312,21 @@ def purge_quarantine(
     - Else if `older_than_days` is set, purges runs older than N days.
     - Else if `run` is provided, purges that run directory or 'latest'.
     - Else, purges the latest run.
+    Sizes come from run manifests; `verify` re-walks the runs first.
+    Deduplicated runs only free their blobs once no other run links to them:
+    blobs left unreferenced are garbage-collected after the runs are deleted.
     Returns summary dict with counts and report path.
     """
     REPORTS_DIR.mkdir(exist_ok=True)
     QUARANTINE_DIR.mkdir(exist_ok=True)
     candidates: list[Path] = []
-    runs = [p for p in QUARANTINE_DIR.iterdir() if p.is_dir()]
+    runs = [p for p in QUARANTINE_DIR.iterdir() if quarantine.is_run_dir(p)]
     runs.sort()
     now = datetime.datetime.now()
     if all_runs:
         candidates = runs
     elif older_than_days is not None and older_than_days > 0:
-        cutoff = now - datetime.timedelta(days=older_than_days)
-        for r in runs:
-            try:
-                # parse timestamp folder name if follows YYYYMMDD-HHMMSS, else fallback to mtime
-                dt = datetime.datetime.strptime(r.name, "%Y%m%d-%H%M%S")
-            except Exception:
-                dt = datetime.datetime.fromtimestamp(r.stat().st_mtime)
-            if dt < cutoff:
-                candidates.append(r)
+        candidates = _runs_older_than(runs, older_than_days, now)
     else:
         if run:
             if run.lower() == "latest":
@@ -195,20 +342,10 @@ def purge_quarantine(
             if runs:
                 candidates = [runs[-1]]
 
-    deleted_runs = 0
-    freed_bytes = 0
-    errors: list[dict] = []
-    for r in candidates:
-        size = _dir_size(r)
-        if dry_run:
-            freed_bytes += size
-            continue
-        try:
-            shutil.rmtree(r, ignore_errors=False)
-            deleted_runs += 1
-            freed_bytes += size
-        except Exception as ex:
-            errors.append({"run": str(r), "error": str(ex)})
+    res = _delete_runs(candidates, dry_run=dry_run, verify=verify)
+    deleted_runs = res.pop("deleted_runs")
+    freed_bytes = res.pop("freed_bytes")
+    errors = res.pop("errors")
 
     ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
     report_path = REPORTS_DIR / f"purge_{ts}.json"
@@ -218,6 +355,7 @@ def purge_quarantine(
                 "target_runs": [str(p) for p in candidates],
                 "deleted_runs": deleted_runs if not dry_run else 0,
                 "freed_bytes": freed_bytes,
+                **res,
                 "errors": errors,
                 "dry_run": dry_run,
             },
@@ -228,10 +366,149 @@ def purge_quarantine(
         "target_runs": [str(p) for p in candidates],
         "deleted_runs": deleted_runs,
         "freed_bytes": freed_bytes,
+        **res,
         "purge_report": str(report_path),
         "dry_run": dry_run,
     }
 
+
+RETENTION_KEYS = ("max_total_bytes", "max_runs", "min_free_percent")
+
+
+def load_retention_policy() -> dict:
+    """Retention limits from retention.yml; unset or invalid limits are dropped."""
+    try:
+        data = _load_yaml(RETENTION_PATH)
+    except Exception:
+        data = {}
+    policy = {}
+    for k in RETENTION_KEYS:
+        v = data.get(k) if isinstance(data, dict) else None
+        if isinstance(v, (int, float)) and not isinstance(v, bool) and v >= 0:
+            policy[k] = v
+    return policy
+
+
+def apply_retention(policy: dict | None = None, dry_run: bool = False, keep: Iterable[str] = ()) -> dict:
+    """Purge the oldest quarantine runs until the retention policy holds.
+
+    `policy` has any of `max_total_bytes`, `max_runs` and `min_free_percent`
+    (free space on the quarantine volume, where only the part of a run stored
+    on that volume counts as freed); None loads retention.yml. Runs are
+    sized from their manifests, so the check reads one small file per run and
+    never walks run contents. Runs named in `keep` and interrupted runs that
+    still have a journal are never evicted. Writes `retention_<ts>.json` when
+    anything is (or, with `dry_run`, would be) evicted.
+    """
+    if policy is None:
+        policy = load_retention_policy()
+    policy = {k: v for k, v in policy.items() if k in RETENTION_KEYS and v is not None}
+    out = {"policy": policy, "evicted_runs": [], "freed_bytes": 0, "retention_report": None, "dry_run": dry_run}
+    if not policy or not QUARANTINE_DIR.is_dir():
+        return out
+    kept = {Path(k).name for k in keep}
+    infos: dict[Path, dict] = {}
+    for r in sorted(p for p in QUARANTINE_DIR.iterdir() if quarantine.is_run_dir(p)):
+        infos[r] = quarantine.run_info(r)
+    sizes = {r: _disk_bytes(info) for r, info in infos.items()}
+    runs = len(infos)
+    total = sum(sizes.values())
+    free = disk = None
+    if "min_free_percent" in policy:
+        try:
+            usage = shutil.disk_usage(QUARANTINE_DIR)
+            free, disk = usage.free, usage.total
+        except OSError:
+            pass
+
+    def over() -> bool:
+        if "max_runs" in policy and runs > policy["max_runs"]:
+            return True
+        if "max_total_bytes" in policy and total > policy["max_total_bytes"]:
+            return True
+        return bool(disk) and free * 100 < policy["min_free_percent"] * disk  # type: ignore[operator]
+
+    evict: list[Path] = []
+    # Oldest first (run names are timestamps)
+    for r in infos:
+        if not over():
+            break
+        if r.name in kept or (REPORTS_DIR / f"journal_{r.name}.jsonl").exists():
+            continue
+        evict.append(r)
+        runs -= 1
+        total -= sizes[r]
+        if free is not None:
+            free += _home_volume_bytes(r, infos[r])
+    if not evict:
+        return out
+    res = _delete_runs(evict, dry_run=dry_run, infos=infos)
+    ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    report_path = REPORTS_DIR / f"retention_{ts}.json"
+    summary = {
+        "policy": policy,
+        "evicted_runs": [str(p) for p in evict],
+        "deleted_runs": res["deleted_runs"],
+        "freed_bytes": res["freed_bytes"],
+        "remaining_runs": runs,
+        "remaining_bytes": total,
+        "gc_blobs": res["gc_blobs"],
+        "errors": res["errors"],
+        "dry_run": dry_run,
+    }
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return {**summary, "retention_report": str(report_path)}
+
+
+def compact_quarantine(older_than_days: int, dry_run: bool = False, preset: int = 6) -> dict:
+    """Compress quarantine runs older than N days into per-run archives.
+
+    Each run is streamed into `archive.tar.xz` in its home directory (see
+    `quarantine.compact_run`); rollback restores straight out of it. Runs
+    already compacted, and interrupted runs that still have a journal, are
+    skipped. Returns summary dict with byte counts and report path.
+    """
+    REPORTS_DIR.mkdir(exist_ok=True)
+    QUARANTINE_DIR.mkdir(exist_ok=True)
+    runs = sorted(p for p in QUARANTINE_DIR.iterdir() if quarantine.is_run_dir(p))
+    candidates = [
+        r for r in _runs_older_than(runs, older_than_days)
+        if quarantine.archive_path(r) is None and not (REPORTS_DIR / f"journal_{r.name}.jsonl").exists()
+    ]
+    compacted = 0
+    total_bytes = archive_bytes = reclaimed_bytes = 0
+    errors: list[dict] = []
+    for r in candidates:
+        if dry_run:
+            total_bytes += quarantine.run_info(r)["bytes"]
+            continue
+        try:
+            res = quarantine.compact_run(r, preset=preset)
+        except Exception as ex:
+            errors.append({"run": str(r), "error": str(ex)})
+            continue
+        compacted += 1
+        total_bytes += res["bytes"]
+        archive_bytes += res["archive_bytes"]
+        reclaimed_bytes += res["reclaimed_bytes"]
+
+    ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    report_path = REPORTS_DIR / f"compact_{ts}.json"
+    summary = {
+        "target_runs": [str(p) for p in candidates],
+        "compacted_runs": compacted,
+        "bytes": total_bytes,
+        "archive_bytes": archive_bytes,
+        "reclaimed_bytes": reclaimed_bytes,
+        "errors": errors,
+        "dry_run": dry_run,
+    }
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return {**summary, "compact_report": str(report_path)}
+
+
 def _send_to_recycle(path: str) -> bool:
     try:
         # Lazy import to keep dependency optional at import time
@@ -243,8 +520,29 @@ def _send_to_recycle(path: str) -> bool:
         return False
 
 
+# Paths handed to the trash backend per call in recycle mode
+RECYCLE_BATCH = 256
+
+
+def _send_many_to_recycle(paths: list[str]) -> bool:
+    """Recycle `paths` in one backend call (a single shell operation on Windows).
+
+    Returns False if the call failed; some paths may have been recycled anyway.
+    """
+    try:
+        from send2trash import send2trash  # type: ignore
+
+        send2trash(list(paths))
+        return True
+    except Exception:
+        return False
+
+
 def _delete_on_reboot(path: str) -> bool:
     try:
+        import ctypes
+        from ctypes import wintypes
+
         # BOOL MoveFileExW(LPCWSTR lpExistingFileName, LPCWSTR lpNewFileName, DWORD dwFlags)
         # Passing None for new filename and MOVEFILE_DELAY_UNTIL_REBOOT schedules delete.
         MoveFileExW = ctypes.windll.kernel32.MoveFileExW
@@ -263,58 +561,79 @@ def execute_cleanup(
     scope: str = "auto",
     delete_mode: str = "quarantine",  # quarantine|recycle|delete
     on_reboot_fallback: bool = False,
+    targets: Iterable[Target] | None = None,
+    workers: int = 1,
+    use_index: bool = False,
+    io_workers: int = 1,
+    use_journal: bool = True,
+    resume: str | None = None,
+    dedupe: bool = False,
+    retention: dict | None = None,
 ):
-    # Move files to a timestamped quarantine directory and record rollback metadata
-    sigs = _load_yaml(SIGNATURES_PATH)
-    excls = _load_yaml(EXCLUSIONS_PATH)
-    exclusions = excls.get("paths", []) if isinstance(excls, dict) else []
+    # Move files to a timestamped quarantine directory and record rollback metadata.
+    # `targets` may be a pre-computed list or a stream from iter_targets().
+    # `workers` threads scan signature roots; `io_workers` threads move/delete files.
+    # The scan index stays off unless `use_index` is set: its cached sizes can be
+    # stale, and the plan, reports and rollback records should use real ones.
+    # Quarantine moves are journaled (journal_<ts>.jsonl) until the run finishes;
+    # `resume` takes an interrupted run's journal and continues that run.
+    # `dedupe` stores identical quarantined files once (see quarantine.QuarantineRun).
+    # Afterwards the retention policy (`retention`, default retention.yml; {} to
+    # skip) evicts the oldest runs, never the one just written.
     REPORTS_DIR.mkdir(exist_ok=True)
     if not dry_run:
         QUARANTINE_DIR.mkdir(exist_ok=True)
-    # Enumerate (respect scope)
-    targets = enumerate_targets(categories, scope=scope)
-    if not targets:
-        return {
-            "moved": 0,
-            "failed": 0,
-            "cleanup_report": None,
-            "rollback_file": None,
-            "dry_run": dry_run,
-        }
-    # Timestamped run dir (only for quarantine)
+    # Enumerate (respect scope); files are processed as the scan finds them
+    if targets is None:
+        targets = iter_targets(categories, scope=scope, workers=workers, use_index=use_index)
+    # Timestamped run (only for quarantine); directories are created with the first file
     ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    state = None
+    if resume and not dry_run:
+        state = journal.replay(resume)
+        ts = state.meta.get("ts") or Path(resume).stem.split("_", 1)[-1]
+        delete_mode = "quarantine"
+        dedupe = bool(state.meta.get("dedupe", dedupe))
     run_dir = QUARANTINE_DIR / ts
-    if delete_mode == "quarantine" and not dry_run:
-        run_dir.mkdir(parents=True, exist_ok=True)
+    qrun = quarantine.QuarantineRun(run_dir, dedupe=dedupe and delete_mode == "quarantine")
 
-    results = []
-    rollback_entries = []
-    idx = 0
-    for t in targets:
+    def qname(idx: int, src: str) -> str:
+        return f"{idx:06d}_{os.path.basename(src)}"
+
+    def clean_one(item: tuple[int, Target]) -> dict:
+        # Runs on pool threads: every failure stays in this file's result
+        idx, t = item
+        t0 = time.perf_counter()
         src = t.path
         # Ensure path is a file and still exists
         if not os.path.isfile(src):
-            results.append({"src": src, "dst": None, "size": t.size, "ok": False, "error": "not a file"})
-            continue
-        # Destination in quarantine
-        idx += 1
-        dst = str(run_dir / f"{idx:06d}_{os.path.basename(src)}") if delete_mode == "quarantine" else None
+            return {"src": src, "dst": None, "size": t.size, "ok": False, "error": "not a file"}
+        # Destination in quarantine, numbered by position in the target stream
+        name = qname(idx, src)
+        dst = str(run_dir / name) if delete_mode == "quarantine" else None
+        method = None
+        blob = None
+        meta = None
         ok = False
         err = None
         if dry_run:
             ok = True
         else:
             try:
+                if qrun.dedupe and delete_mode == "quarantine":
+                    # Linking to a shared blob loses the file's own times and mode
+                    meta = _file_meta(src)
                 # Make file writable in case of read-only attribute
                 try:
                     os.chmod(src, stat.S_IWRITE)
                 except Exception:
                     pass
                 if delete_mode == "quarantine":
-                    # Move into quarantine
-                    assert dst is not None
-                    shutil.move(src, dst)
+                    # Rename into the run directory on the file's own volume
+                    dst, method = qrun.move_in(src, name, t.size)
                     ok = True
+                    if qrun.dedupe:
+                        blob = qrun.deduplicate(dst, t.size)
                 elif delete_mode == "recycle":
                     ok = _send_to_recycle(src)
                     if not ok and on_reboot_fallback:
@@ -332,46 +651,198 @@ def execute_cleanup(
                     err = f"invalid delete_mode: {delete_mode}"
             except Exception as e:
                 err = str(e)
-        results.append({
-            "src": src,
-            "dst": dst if (ok and dst) else None,
+        r = entry(t, dst if (ok and dst) else None, ok, err, method, (time.perf_counter() - t0) * 1000)
+        if qrun.dedupe:
+            r["blob"] = blob
+            if blob and meta:
+                r.update(meta)
+        return r
+
+    def entry(t: Target, dst: str | None, ok: bool, err: str | None, method: str | None, elapsed_ms: float) -> dict:
+        return {
+            "src": t.path,
+            "dst": dst,
             "size": t.size,
             "ok": ok,
             "error": err,
             "mode": delete_mode,
-        })
-        if ok and not dry_run and delete_mode == "quarantine":
-            rollback_entries.append({"src": src, "dst": dst, "size": t.size})
+            "method": method,
+            "elapsed_ms": round(elapsed_ms, 3),
+        }
+
+    def recycle_batch(items: list[tuple[int, Target]]) -> list[dict]:
+        # One trash operation for the whole batch; files still present afterwards
+        # are retried one by one. Entries look exactly like clean_one's.
+        t0 = time.perf_counter()
+        out: list[dict | None] = []
+        live: list[int] = []
+        for _, t in items:
+            if not os.path.isfile(t.path):
+                out.append({"src": t.path, "dst": None, "size": t.size, "ok": False, "error": "not a file"})
+                continue
+            try:
+                os.chmod(t.path, stat.S_IWRITE)
+            except Exception:
+                pass
+            live.append(len(out))
+            out.append(None)
+        batch_ok = _send_many_to_recycle([items[i][1].path for i in live]) if live else True
+        share = (time.perf_counter() - t0) * 1000 / max(1, len(live))
+        for i in live:
+            t = items[i][1]
+            t1 = time.perf_counter()
+            ok = batch_ok or not os.path.lexists(t.path)
+            if not ok:
+                ok = _send_to_recycle(t.path)
+            if not ok and on_reboot_fallback:
+                ok = _delete_on_reboot(t.path)
+            out[i] = entry(t, None, ok, None, None, share + (time.perf_counter() - t1) * 1000)
+        return out  # type: ignore[return-value]
+
+    want_rollback = not dry_run and delete_mode == "quarantine"
+    journal_path = REPORTS_DIR / f"journal_{ts}.jsonl"
+    jrnl: journal.CleanupJournal | None = None
+    if want_rollback and (use_journal or resume):
+        jrnl = journal.CleanupJournal(journal_path, append=bool(resume))
+        if not resume:
+            jrnl.begin(ts=ts, categories=list(categories), scope=scope, dedupe=qrun.dedupe)
 
-    # Write cleanup audit and rollback files
-    # Preserve legacy naming for quarantine to keep tests stable
+    def quarantine_batch(items: list[tuple[int, Target]]) -> list[dict]:
+        # Write-ahead: the whole batch's planned moves are logged before any happens
+        assert jrnl is not None
+        jrnl.intents([(idx, t.path, qrun.plan(t.path, qname(idx, t.path)), t.size) for idx, t in items])
+        out = [clean_one(item) for item in items]
+        jrnl.dones([
+            (idx, r["ok"], r["dst"], _dedup_fields(r)) if r.get("blob") else (idx, r["ok"], r["dst"])
+            for (idx, _), r in zip(items, out)
+        ])
+        return out
+
+    # Results come back in input order whatever the pool size, so reports are stable
+    numbered = enumerate(targets, state.last_index + 1 if state else 1)
+    if delete_mode == "recycle" and not dry_run:
+        stream = executor.map_batches(recycle_batch, numbered, workers=io_workers, batch=RECYCLE_BATCH)
+    elif jrnl is not None:
+        stream = executor.map_batches(quarantine_batch, numbered, workers=io_workers)
+    else:
+        stream = executor.map_ordered(clean_one, numbered, workers=io_workers)
+    # Reports are appended as files are processed; nothing is written for an empty run
     if delete_mode == "quarantine":
+        # Preserve legacy naming for quarantine to keep tests stable
         action = "cleanup_dryrun" if dry_run else "cleanup"
     else:
         action = (f"cleanup_{delete_mode}_dryrun" if dry_run else f"cleanup_{delete_mode}")
-    cleanup_report = REPORTS_DIR / f"{action}_{ts}.json"
-    with open(cleanup_report, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2)
-    rollback_file = None
-    if not dry_run and delete_mode == "quarantine":
-        rollback_file = REPORTS_DIR / f"rollback_{ts}.json"
-        with open(rollback_file, "w", encoding="utf-8") as f:
-            json.dump(rollback_entries, f, indent=2)
+    cleanup_report = REPORTS_DIR / f"{action}_{ts}.jsonl"
+    rollback_file = REPORTS_DIR / f"rollback_{ts}.jsonl" if want_rollback else None
+    report: audit.JsonlWriter | None = None
+    rollback: audit.JsonlWriter | None = None
+    if state is not None:
+        # The journal is authoritative: settle moves the crash left without a done
+        # record and rebuild the rollback file, which may have lost its last records
+        assert jrnl is not None and rollback_file is not None
+        moved_before = state.moved()
+        settled = {id(e) for e in moved_before}
+        jrnl.dones([(i, id(e) in settled, e["dst"]) for i, e in state.entries.items() if "ok" not in e])
+        report = audit.JsonlWriter(cleanup_report, append=True)
+        rollback = audit.JsonlWriter(rollback_file)
+        for e in moved_before:
+            rollback.write({"src": e["src"], "dst": e["dst"], "size": e.get("size", 0), **_dedup_fields(e)})
+    moved = failed = 0
+    try:
+        for r in stream:
+            if report is None:
+                report = audit.JsonlWriter(cleanup_report)
+                if rollback_file is not None:
+                    rollback = audit.JsonlWriter(rollback_file)
+            report.write(r)
+            if r["ok"]:
+                moved += 1
+            else:
+                failed += 1
+            if rollback is not None and r["ok"]:
+                rollback.write({"src": r["src"], "dst": r["dst"], "size": r["size"], **_dedup_fields(r)})
+    finally:
+        if report is not None:
+            report.close()
+        if rollback is not None:
+            rollback.close()
+        if jrnl is not None:
+            jrnl.close()
+
+    def retain() -> dict | None:
+        # A failing policy check must not fail the cleanup that already happened
+        if dry_run:
+            return None
+        try:
+            return apply_retention(retention, keep=[ts])
+        except Exception as ex:
+            return {"error": str(ex)}
+
+    # Finished: the rollback file now holds every move, so the journal can go
+    if jrnl is not None:
+        try:
+            journal_path.unlink()
+        except Exception:
+            pass
+    if report is None:
+        return {
+            "moved": 0,
+            "failed": 0,
+            "cleanup_report": None,
+            "rollback_file": None,
+            "dry_run": dry_run,
+            "retention": retain(),
+        }
+    if want_rollback:
+        if state is not None:
+            qrun.finish(
+                prior_files=len(moved_before),
+                prior_bytes=sum(e.get("size", 0) for e in moved_before),
+                prior_home_bytes=sum(
+                    e.get("size", 0) for e in moved_before if os.path.dirname(e["dst"]) == str(run_dir)
+                ),
+            )
+        else:
+            qrun.finish()
+    retained = retain()
 
     return {
-        "moved": sum(1 for r in results if r.get("ok")),
-        "failed": sum(1 for r in results if not r.get("ok")),
+        "moved": moved,
+        "failed": failed,
         "cleanup_report": str(cleanup_report),
         "rollback_file": str(rollback_file) if rollback_file else None,
         "dry_run": dry_run,
         "mode": delete_mode,
+        "renamed_bytes": qrun.renamed_bytes,
+        "copied_bytes": qrun.copied_bytes,
+        "resumed": bool(resume),
+        **_dedup_stats(qrun),
+        "retention": retained,
     }
 
 
-def quarantine_paths(paths: list[str], dry_run: bool = False) -> dict:
+def _dedup_stats(qrun: quarantine.QuarantineRun) -> dict:
+    # Ratio of bytes quarantined to bytes this session actually added to disk
+    logical = qrun.renamed_bytes + qrun.copied_bytes
+    physical = logical - qrun.dedup_saved_bytes
+    return {
+        "deduped": qrun.deduped,
+        "dedup_saved_bytes": qrun.dedup_saved_bytes,
+        "dedup_ratio": round(logical / physical, 3) if physical > 0 else 1.0,
+    }
+
+
+def find_unfinished_journal() -> str:
+    """Journal of the latest interrupted quarantine run, or "" if none."""
+    REPORTS_DIR.mkdir(exist_ok=True)
+    return audit.latest_report(REPORTS_DIR, "journal")
+
+
+def quarantine_paths(paths: list[str], dry_run: bool = False, dedupe: bool = False) -> dict:
     """Quarantine specific file paths (outside of category signatures).
 
     Moves files to a timestamped quarantine directory and writes a rollback mapping.
+    With `dedupe`, identical files are stored once (see `execute_cleanup`).
     """
     REPORTS_DIR.mkdir(exist_ok=True)
     if dry_run:
@@ -387,93 +858,328 @@ def quarantine_paths(paths: list[str], dry_run: bool = False) -> dict:
     ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
     run_dir = QUARANTINE_DIR / ts
     run_dir.mkdir(parents=True, exist_ok=True)
-    results = []
-    rollback_entries = []
+    qrun = quarantine.QuarantineRun(run_dir, dedupe=dedupe)
+    cleanup_report = REPORTS_DIR / f"cleanup_{ts}.jsonl"
+    rollback_file = REPORTS_DIR / f"rollback_{ts}.jsonl"
+    report = audit.JsonlWriter(cleanup_report)
+    rollback = audit.JsonlWriter(rollback_file)
+    moved = failed = 0
     idx = 0
     for src in paths:
         idx += 1
-        dst = str(run_dir / f"{idx:06d}_{os.path.basename(src)}")
+        dst = None
+        method = None
+        blob = None
+        meta = None
         ok = False
         err = None
         try:
+            if dedupe:
+                meta = _file_meta(src)
             try:
                 os.chmod(src, stat.S_IWRITE)
             except Exception:
                 pass
-            shutil.move(src, dst)
+            try:
+                size = os.path.getsize(src)
+            except Exception:
+                size = 0
+            dst, method = qrun.move_in(src, f"{idx:06d}_{os.path.basename(src)}", size)
             ok = True
+            if dedupe:
+                blob = qrun.deduplicate(dst, size)
         except Exception as e:
             err = str(e)
-        results.append({"src": src, "dst": dst if ok else None, "ok": ok, "error": err})
+        rec = {"src": src, "dst": dst if ok else None, "ok": ok, "error": err, "method": method}
+        if dedupe:
+            rec["blob"] = blob
+            if blob and meta:
+                rec.update(meta)
+        report.write(rec)
         if ok:
-            rollback_entries.append({"src": src, "dst": dst})
-    cleanup_report = REPORTS_DIR / f"cleanup_{ts}.json"
-    with open(cleanup_report, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2)
-    rollback_file = REPORTS_DIR / f"rollback_{ts}.json"
-    with open(rollback_file, "w", encoding="utf-8") as f:
-        json.dump(rollback_entries, f, indent=2)
+            moved += 1
+            rollback.write({"src": src, "dst": dst, **_dedup_fields(rec)})
+        else:
+            failed += 1
+    report.close()
+    rollback.close()
+    qrun.finish()
     return {
-        "moved": sum(1 for r in results if r.get("ok")),
-        "failed": sum(1 for r in results if not r.get("ok")),
+        "moved": moved,
+        "failed": failed,
         "cleanup_report": str(cleanup_report),
         "rollback_file": str(rollback_file),
         "dry_run": False,
         "mode": "quarantine",
+        "renamed_bytes": qrun.renamed_bytes,
+        "copied_bytes": qrun.copied_bytes,
+        **_dedup_stats(qrun),
     }
 
+def _read_report(path: str) -> Iterator[dict]:
+    # Unreadable or missing reports read as empty
+    try:
+        yield from audit.read_records(path)
+    except Exception:
+        return
+
+
 def find_latest_rollback():
     REPORTS_DIR.mkdir(exist_ok=True)
-    files = sorted(REPORTS_DIR.glob("rollback_*.json"))
-    return str(files[-1]) if files else ""
+    latest = audit.latest_report(REPORTS_DIR, "rollback")
+    # An interrupted run may have a journal but no rollback file yet
+    pending = audit.latest_report(REPORTS_DIR, "journal")
+    if pending and (not latest or Path(pending).stem.split("_", 1)[1] > Path(latest).stem.split("_", 1)[1]):
+        return pending
+    return latest
+
+# Plan actions that lead to a restore
+_RESTORE_ACTIONS = ("restore", "replace")
+
+
+def _side_name(src: str) -> str:
+    # Free name for the file currently occupying `src`
+    side = src + ".pcsuite.bak"
+    n = 1
+    while os.path.lexists(side):
+        side = f"{src}.pcsuite.bak{n}"
+        n += 1
+    return side
+
+
+def plan_rollback(entries: Iterable[dict], workers: int = 1) -> list[dict]:
+    """Decide up front what restoring each rollback entry will do.
+
+    Each step gets an `action`: `restore` (plain rename back), `replace` (a file
+    now occupies the original path and is first moved aside to `side`),
+    `missing` (the quarantined file is gone), `duplicate` (an earlier entry
+    already restores to the same path) or `invalid`. `bytes` is the size of the
+    quarantined file. Deduplicated entries carry their `blob`, `mtime` and
+    `mode` into the step (only those are unshared and get their metadata
+    back); one whose run file is gone but whose blob survives is restored
+    from the blob (`via: "blob"`), and an entry of
+    a compacted run from its archive (`via: "archive"`). Existence checks run
+    on `workers` threads.
+    """
+
+    def probe(e: dict) -> dict:
+        src = e.get("src")
+        dst = e.get("dst")
+        step = {"src": src, "from": dst, "action": "invalid", "bytes": 0, "side": None}
+        if not src or not dst:
+            return step
+        try:
+            st = os.stat(dst)
+        except OSError:
+            st = None
+        blob = e.get("blob")
+        if blob:
+            # Deduplicated entry: the restored file gets its own inode and metadata back
+            step.update(_dedup_fields(e))
+        if (st is None or not stat.S_ISREG(st.st_mode)) and blob:
+            try:
+                st = os.stat(blob)
+                step["via"] = "blob"
+            except OSError:
+                st = None
+        if st is None:
+            archive = quarantine.archive_path(QUARANTINE_DIR / Path(dst).parent.name)
+            if archive is not None:
+                # Membership is checked when the archive is read, in one pass
+                step["via"] = "archive"
+                step["archive"] = str(archive)
+                step["bytes"] = e.get("size") or 0
+                step["action"] = "replace" if os.path.lexists(src) else "restore"
+                if step["action"] == "replace":
+                    step["side"] = _side_name(src)
+                return step
+        if st is None or not stat.S_ISREG(st.st_mode):
+            step["action"] = "missing"
+            step["bytes"] = e.get("size") or 0
+            return step
+        step["bytes"] = st.st_size
+        if os.path.lexists(src):
+            step["action"] = "replace"
+            step["side"] = _side_name(src)
+        else:
+            step["action"] = "restore"
+        return step
+
+    plan = list(executor.map_ordered(probe, entries, workers=workers))
+    claimed: set[str] = set()
+    for step in plan:
+        if step["action"] in _RESTORE_ACTIONS:
+            key = os.path.normcase(os.path.abspath(step["src"]))
+            if key in claimed:
+                step["action"] = "duplicate"
+                step["side"] = None
+            claimed.add(key)
+    return plan
+
+
+def _move_file(src: str, dst: str) -> None:
+    try:
+        os.replace(src, dst)
+    except OSError:
+        # Cross-volume (e.g. quarantined before per-volume run directories)
+        shutil.move(src, dst)
+
+
+def _file_meta(path: str) -> dict | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"mtime": st.st_mtime, "mode": stat.S_IMODE(st.st_mode)}
+
+
+def _dedup_fields(rec: dict) -> dict:
+    # What a deduplicated entry needs for rollback (nothing for plain entries)
+    return {k: rec[k] for k in ("blob", "mtime", "mode") if rec.get(k) is not None}
+
 
-def execute_rollback(rollback_path: str | None = None, dry_run: bool = False):
-    # Restore files from quarantine using a rollback mapping file
+def _restore_meta(path: str, step: dict) -> None:
+    # Reapply the times and mode recorded before the file was linked to a blob
+    if step.get("mtime") is not None:
+        os.utime(path, (os.stat(path).st_atime, step["mtime"]))
+    if step.get("mode") is not None:
+        os.chmod(path, step["mode"])
+
+
+def _unshare(path: str) -> None:
+    # A file restored from a deduplicated run is still a hardlink to its blob
+    # (and to other runs' copies); give it its own inode so edits stay local
+    try:
+        if os.stat(path).st_nlink <= 1:
+            return
+    except OSError:
+        return
+    tmp = path + ".pcsuite-unshare"
+    shutil.copy2(path, tmp)
+    os.replace(tmp, path)
+
+
+def execute_rollback(rollback_path: str | None = None, dry_run: bool = False, io_workers: int = 1):
+    # Restore files from quarantine using a rollback mapping file.
+    # The whole mapping is planned first (conflicts, missing files, parent
+    # directories), then the renames run on `io_workers` threads.
     if not rollback_path:
         rollback_path = find_latest_rollback()
     if not rollback_path:
         return {"restored": 0, "failed": 0, "restore_report": None, "dry_run": dry_run}
-    try:
-        with open(rollback_path, "r", encoding="utf-8") as f:
-            entries = json.load(f)
-    except Exception:
-        entries = []
-    results = []
-    for e in entries:
-        src = e.get("src")  # original location
-        dst = e.get("dst")  # quarantine file
-        ok = False
-        err = None
-        if dry_run:
-            # Assume would restore if mapping exists
-            ok = True
-        else:
+    # Accepts rollback_*.jsonl, legacy rollback_*.json and journals of interrupted runs
+    p = Path(rollback_path)
+    if p.name.startswith("rollback_"):
+        # Interrupted run: its journal is complete where the rollback file may not be
+        sibling = p.with_name("journal_" + p.stem.split("_", 1)[1] + ".jsonl")
+        if sibling.exists():
+            p = sibling
+    from_journal = p.name.startswith("journal_")
+    if from_journal:
+        try:
+            entries = iter(journal.rollback_entries(p))
+        except Exception:
+            entries = iter([])
+    else:
+        entries = _read_report(str(p))
+    plan = plan_rollback(entries, workers=io_workers)
+
+    if not dry_run:
+        # All parent directories in one pass, before any worker starts
+        for d in sorted({os.path.dirname(s["src"]) for s in plan if s["action"] in _RESTORE_ACTIONS}):
             try:
-                if not dst or not os.path.isfile(dst):
-                    raise FileNotFoundError("quarantined file not found")
-                Path(src).parent.mkdir(parents=True, exist_ok=True)
-                # If destination exists already, replace it
-                if os.path.exists(src):
-                    # Move existing to a side name to prevent overwrite loss
-                    side = src + ".pcsuite.bak"
+                os.makedirs(d, exist_ok=True)
+            except Exception:
+                pass  # that entry's rename reports the error
+
+    # Archived files are extracted up front, one sequential pass per archive
+    extracted: dict[tuple[str, str], str | None] = {}
+    if not dry_run:
+        by_archive: dict[str, dict[str, str]] = {}
+        for step in plan:
+            if step.get("via") == "archive" and step["action"] in _RESTORE_ACTIONS:
+                if step["action"] == "replace":
                     try:
-                        shutil.move(src, side)
-                    except Exception:
-                        pass
-                shutil.move(dst, src)
-                ok = True
+                        _move_file(step["src"], step["side"])
+                    except Exception as ex:
+                        extracted[(step["archive"], os.path.basename(step["from"]))] = str(ex)
+                        continue
+                by_archive.setdefault(step["archive"], {})[os.path.basename(step["from"])] = step["src"]
+        for archive, targets in by_archive.items():
+            for member, err in quarantine.extract_members(archive, targets).items():
+                extracted[(archive, member)] = err
+
+    def restore_one(step: dict) -> dict:
+        action = step["action"]
+        ok = action in _RESTORE_ACTIONS
+        err = None
+        if action == "missing":
+            err = "quarantined file not found"
+        elif action == "duplicate":
+            err = "another entry restores to this path"
+        elif action == "invalid":
+            err = "invalid rollback entry"
+        elif step.get("via") == "archive":
+            if not dry_run:
+                err = extracted.get((step["archive"], os.path.basename(step["from"])), "not extracted")
+                ok = err is None
+                if ok and step.get("blob"):
+                    try:
+                        _restore_meta(step["src"], step)
+                    except OSError:
+                        pass  # the content is back; metadata is best-effort
+        elif not dry_run:
+            try:
+                if action == "replace":
+                    # Keep the file now at the original path instead of overwriting it
+                    _move_file(step["src"], step["side"])
+                if step.get("via") == "blob":
+                    shutil.copy2(step["blob"], step["src"])
+                else:
+                    _move_file(step["from"], step["src"])
+                    if step.get("blob"):
+                        _unshare(step["src"])
+                if step.get("blob"):
+                    _restore_meta(step["src"], step)
             except Exception as ex:
+                ok = False
                 err = str(ex)
-        results.append({"src": src, "from": dst, "ok": ok, "error": err})
+        return {"src": step["src"], "from": step["from"], "ok": ok, "error": err, "action": action, "bytes": step["bytes"], "side": step["side"]}
 
     ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
     action = "restore_dryrun" if dry_run else "restore"
-    restore_report = REPORTS_DIR / f"{action}_{ts}.json"
-    with open(restore_report, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2)
+    restore_report = REPORTS_DIR / f"{action}_{ts}.jsonl"
+    restored = failed = 0
+    restored_bytes = 0
+    actions: dict[str, int] = {}
+    # Files taken out of each run (keyed by run name), to keep manifests current
+    taken: dict[str, list[int]] = {}
+    with audit.JsonlWriter(restore_report) as report:
+        for r in executor.map_ordered(restore_one, plan, workers=io_workers):
+            report.write(r)
+            actions[r["action"]] = actions.get(r["action"], 0) + 1
+            if r["ok"]:
+                restored += 1
+                restored_bytes += r["bytes"]
+                if not dry_run:
+                    t = taken.setdefault(Path(r["from"]).parent.name, [0, 0])
+                    t[0] += 1
+                    t[1] += r["bytes"]
+            else:
+                failed += 1
+    for name, (n, b) in taken.items():
+        quarantine.adjust_manifest(QUARANTINE_DIR / name, -n, -b)
+    if from_journal and not dry_run and not failed:
+        # The interrupted run is fully undone; it is no longer resumable
+        try:
+            p.unlink()
+        except Exception:
+            pass
     return {
-        "restored": sum(1 for r in results if r.get("ok")),
-        "failed": sum(1 for r in results if not r.get("ok")),
+        "restored": restored,
+        "failed": failed,
         "restore_report": str(restore_report),
         "dry_run": dry_run,
+        "bytes": restored_bytes,
+        "actions": actions,
     }
@@ -0,0 +1,139 @@
+"""Write-ahead journal for quarantine cleanup runs.
+
+`execute_cleanup` logs one `intent` line per batch of files (index, source,
+planned destination, size) before moving any of them, and one `done` line with
+the outcomes afterwards. Lines are flushed to the OS as they are written and
+fsynced every `sync_every` files or `sync_seconds`, so the journal costs a few
+syscalls and one JSON encode per batch rather than per file. A finished run
+removes its journal; a journal left behind means the run was interrupted.
+
+`replay` rebuilds the state of such a run: which files were moved (a `done`
+record, or an `intent` whose destination exists and source does not) and
+which were not. That is enough to roll the run back exactly or to resume it
+into the same quarantine directory.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import json
+import os
+from pathlib import Path
+import threading
+import time
+
+
+# One shared encoder: json.dumps with custom separators builds a new one per call
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class CleanupJournal:
+    """Append-only journal shared by the cleanup worker threads."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        sync_every: int = 512,
+        sync_seconds: float = 1.0,
+        append: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.syncs = 0
+        self._sync_every = max(1, sync_every)
+        self._sync_seconds = sync_seconds
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._f = open(self.path, "a" if append else "w", encoding="utf-8")
+
+    def _write(self, record: dict, files: int = 0, force_sync: bool = False) -> None:
+        line = _encode(record) + "\n"
+        with self._lock:
+            self._f.write(line)
+            # Flush to the OS on every batch: a killed process loses nothing
+            self._f.flush()
+            self._unsynced += files
+            if force_sync or self._unsynced >= self._sync_every or time.monotonic() - self._last_sync >= self._sync_seconds:
+                # fsync at intervals: bounds what a power loss can take
+                os.fsync(self._f.fileno())
+                self.syncs += 1
+                self._unsynced = 0
+                self._last_sync = time.monotonic()
+
+    def begin(self, **meta) -> None:
+        self._write({"op": "begin", **meta}, force_sync=True)
+
+    def intents(self, entries: list[tuple[int, str, str, int]]) -> None:
+        """Log planned moves (i, src, dst, size) before performing them."""
+        if entries:
+            self._write({"op": "intent", "batch": entries}, files=len(entries))
+
+    def dones(self, entries: list[tuple]) -> None:
+        """Log outcomes (i, ok, dst[, extra]) after the moves.
+
+        `extra` is a dict merged into the replayed entry (e.g. a deduplicated
+        file's blob, mtime and mode).
+        """
+        if entries:
+            self._write({"op": "done", "batch": entries}, files=len(entries))
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._f.closed:
+                self._f.close()
+
+
+@dataclass
+class JournalState:
+    meta: dict = field(default_factory=dict)
+    entries: dict[int, dict] = field(default_factory=dict)
+
+    @property
+    def last_index(self) -> int:
+        return max(self.entries, default=0)
+
+    def moved(self) -> list[dict]:
+        """Entries whose file is in quarantine, in journal order."""
+        out = []
+        for e in self.entries.values():
+            if e.get("ok"):
+                out.append(e)
+            elif "ok" not in e and e.get("dst") and os.path.isfile(e["dst"]) and not os.path.exists(e["src"]):
+                # Crashed between the move and its done record
+                out.append(e)
+        return out
+
+
+def replay(path: str | os.PathLike) -> JournalState:
+    """Rebuild a run's state from its journal; a torn last line is ignored."""
+    state = JournalState()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            op = rec.pop("op", None) if isinstance(rec, dict) else None
+            if op == "begin":
+                state.meta = rec
+            elif op == "intent":
+                for i, src, dst, size in rec.get("batch", []):
+                    state.entries[i] = {"src": src, "dst": dst, "size": size}
+            elif op == "done":
+                for i, ok, dst, *extra in rec.get("batch", []):
+                    e = state.entries.get(i)
+                    if e is not None:
+                        e["ok"] = bool(ok)
+                        if dst:
+                            e["dst"] = dst
+                        if extra and isinstance(extra[0], dict):
+                            e.update(extra[0])
+    return state
+
+
+def rollback_entries(path: str | os.PathLike) -> list[dict]:
+    """Rollback mapping ({src, dst, size} plus any dedupe fields) for every file the run moved."""
+    keep = ("blob", "mtime", "mode")
+    return [
+        {"src": e["src"], "dst": e["dst"], "size": e.get("size", 0), **{k: e[k] for k in keep if k in e}}
+        for e in replay(path).moved()
+    ]
@@ -0,0 +1,230 @@
+"""Long-lived PowerShell sessions that run commands sent over stdin.
+
+Starting `powershell.exe` costs 300-800 ms, far more than most of the queries
+PCSuite sends it. A `PowerShellHost` starts one interpreter running a small
+loop (`BOOTSTRAP`): it reads one JSON request per line (`{"id", "cmd"}`),
+runs the command in a child scope (so variables do not leak between calls),
+and answers with one framed JSON line `FRAME {"id", "code", "out", "err"}`.
+Lines without the frame prefix (stray console writes) are ignored.
+
+A command that does not answer within its timeout gets the host killed (a
+running pipeline cannot be interrupted from outside); a host that exits is
+restarted on the next call. `HostPool` hands out up to `size` hosts so
+concurrent callers do not queue behind each other.
+
+Any interpreter speaking the same protocol can stand in for PowerShell (the
+tests use a small Python script), see `PowerShellHost(argv=...)`.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+
+FRAME = "##pcsuite-frame## "
+
+BOOTSTRAP = r"""
+$ProgressPreference = 'SilentlyContinue'
+[Console]::OutputEncoding = New-Object System.Text.UTF8Encoding $false
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($null -eq $line) { break }
+    if (-not $line) { continue }
+    $req = $line | ConvertFrom-Json
+    $global:LASTEXITCODE = 0
+    $failed = $false
+    $errs = New-Object System.Collections.Generic.List[string]
+    $out = ''
+    try {
+        $res = & ([scriptblock]::Create($req.cmd)) 2>&1
+        $items = @(foreach ($r in @($res)) {
+            if ($r -is [System.Management.Automation.ErrorRecord]) { [void]$errs.Add($r.ToString()) } else { $r }
+        })
+        if ($items.Count) { $out = $items | Out-String -Width 4096 }
+    } catch {
+        $failed = $true
+        [void]$errs.Add($_.Exception.Message)
+    }
+    $code = if ($LASTEXITCODE) { $LASTEXITCODE } elseif ($failed -or ($errs.Count -and -not $out)) { 1 } else { 0 }
+    $resp = @{ id = $req.id; code = [int]$code; out = [string]$out; err = ($errs -join "`n") } | ConvertTo-Json -Compress
+    [Console]::Out.WriteLine('##pcsuite-frame## ' + $resp)
+    [Console]::Out.Flush()
+}
+"""
+
+
+class HostError(Exception):
+    """The host could not be started or died while running a command."""
+
+
+class HostStartError(HostError):
+    """The interpreter could not be launched at all (e.g. not installed)."""
+
+
+def default_argv() -> list[str]:
+    encoded = base64.b64encode(BOOTSTRAP.encode("utf-16-le")).decode("ascii")
+    return ["powershell", "-NoProfile", "-NoLogo", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-EncodedCommand", encoded]
+
+
+class PowerShellHost:
+    """One interpreter process; runs one command at a time."""
+
+    def __init__(self, argv: list[str] | None = None) -> None:
+        self.argv = argv or default_argv()
+        self.starts = 0
+        self.calls = 0
+        self._proc: subprocess.Popen | None = None
+        self._responses: queue.Queue = queue.Queue()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _start(self) -> None:
+        flags = getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
+        try:
+            proc = subprocess.Popen(
+                self.argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                bufsize=1,
+                creationflags=flags,
+            )
+        except OSError as ex:
+            raise HostStartError(f"cannot start PowerShell host: {ex}") from ex
+        self._proc = proc
+        self._responses = queue.Queue()
+        self.starts += 1
+        threading.Thread(target=self._read, args=(proc, self._responses), daemon=True, name="pcsuite-pwsh").start()
+
+    @staticmethod
+    def _read(proc: subprocess.Popen, responses: queue.Queue) -> None:
+        assert proc.stdout is not None
+        try:
+            for line in proc.stdout:
+                if not line.startswith(FRAME):
+                    continue
+                try:
+                    msg = json.loads(line[len(FRAME):])
+                except ValueError:
+                    continue
+                if isinstance(msg, dict):
+                    responses.put(msg)
+        except (OSError, ValueError):
+            pass
+        finally:
+            proc.stdout.close()
+        responses.put(None)  # EOF: the host exited
+
+    def run(self, command: str, timeout: float | None = None) -> tuple[int, str, str]:
+        """Run `command`; returns (code, out, err).
+
+        Raises `subprocess.TimeoutExpired` after `timeout` seconds (the host is
+        killed) and `HostError` if the host cannot start or dies meanwhile.
+        """
+        with self._lock:
+            if not self.alive():
+                self._start()
+            assert self._proc is not None and self._proc.stdin is not None
+            self._next_id += 1
+            rid = self._next_id
+            self.calls += 1
+            try:
+                self._proc.stdin.write(json.dumps({"id": rid, "cmd": command}) + "\n")
+                self._proc.stdin.flush()
+            except OSError as ex:
+                self._kill()
+                raise HostError(f"PowerShell host is gone: {ex}") from ex
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    msg = self._responses.get(timeout=remaining)
+                except queue.Empty:
+                    self._kill()
+                    raise subprocess.TimeoutExpired(command, timeout) from None
+                if msg is None:
+                    self._kill()
+                    raise HostError("PowerShell host exited while running a command")
+                if msg.get("id") == rid:
+                    return int(msg.get("code") or 0), str(msg.get("out") or ""), str(msg.get("err") or "")
+
+    def _kill(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=5)
+        except Exception:
+            pass
+        try:
+            if proc.stdin is not None:
+                proc.stdin.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """Ask the host to exit (end of input), killing it if it does not."""
+        with self._lock:
+            proc = self._proc
+            if proc is None:
+                return
+            try:
+                if proc.stdin is not None:
+                    proc.stdin.close()
+                proc.wait(timeout=2)
+            except Exception:
+                pass
+            self._kill()
+
+
+class HostPool:
+    """Up to `size` hosts, started on demand and shared by calling threads."""
+
+    def __init__(self, size: int = 2, argv: list[str] | None = None) -> None:
+        self.size = max(1, size)
+        self.argv = argv
+        self.hosts: list[PowerShellHost] = []
+        self._idle: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> PowerShellHost:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self.hosts) < self.size:
+                host = PowerShellHost(self.argv)
+                self.hosts.append(host)
+                return host
+        return self._idle.get()
+
+    def run(self, command: str, timeout: float | None = None) -> tuple[int, str, str]:
+        host = self._acquire()
+        try:
+            return host.run(command, timeout=timeout)
+        finally:
+            self._idle.put(host)
+
+    def stats(self) -> dict:
+        return {
+            "hosts": len(self.hosts),
+            "starts": sum(h.starts for h in self.hosts),
+            "calls": sum(h.calls for h in self.hosts),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            for host in self.hosts:
+                host.close()
@@ -0,0 +1,530 @@
+"""Quarantine storage for cleanup runs.
+
+A run lives in `reports/quarantine/<ts>/` (the *home* run directory). Files on
+other volumes are not copied there: each volume gets its own run directory at
+`<mount point>/.pcsuite-quarantine/<ts>/`, so every move is an atomic
+`os.replace` rename. The home run directory lists those extra directories in
+`volumes.json` so purge and size accounting can find them. If a volume has no
+writable mount point the file falls back to a copy into the home directory.
+
+Each finished run also writes `manifest.json` (file count, total bytes,
+created timestamp) so listing and purging runs never has to walk them;
+`verify_run` re-walks a run and repairs its manifest.
+
+With `dedupe=True` a run is content-addressed: after a file is moved in, its
+SHA-256 names a blob in `_store/` next to the run directories on that volume,
+and the run entry becomes a hardlink to that blob. Identical files (in this
+run or any earlier one) then share one copy on disk; the blob's link count is
+its reference count, and `collect_garbage` drops blobs no run links to any
+more. Volumes without hardlink support simply keep plain files, as do files
+still hardlinked to a name outside the run (the blob would alias the live
+file) and files whose stored blob fails its hash check.
+
+`compact_run` moves an old run (all volumes) into `archive.tar.xz` in its home
+directory, streaming one file at a time; the manifest keeps the original file
+count and bytes and records the archive. `extract_members` restores files
+from that archive in one sequential pass.
+"""
+from __future__ import annotations
+
+import datetime
+import errno
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import stat
+import tarfile
+import threading
+
+VOLUME_DIR_NAME = ".pcsuite-quarantine"
+VOLUMES_FILE = "volumes.json"
+MANIFEST_FILE = "manifest.json"
+# Content-addressed blobs, a sibling of the run directories
+STORE_DIR_NAME = "_store"
+# Compacted run content (tar + LZMA)
+ARCHIVE_FILE = "archive.tar.xz"
+# Bookkeeping files inside a run directory, not quarantined content
+_META_FILES = {VOLUMES_FILE, MANIFEST_FILE, ARCHIVE_FILE}
+
+# ERROR_NOT_SAME_DEVICE
+_WIN_NOT_SAME_DEVICE = 17
+
+
+def _mount_point(path: str) -> str:
+    p = os.path.abspath(path)
+    while not os.path.ismount(p):
+        parent = os.path.dirname(p)
+        if parent == p:
+            break
+        p = parent
+    return p
+
+
+def _is_cross_device(ex: OSError) -> bool:
+    return ex.errno == errno.EXDEV or getattr(ex, "winerror", None) == _WIN_NOT_SAME_DEVICE
+
+
+class QuarantineRun:
+    """Moves files into one quarantine run, renaming within each volume.
+
+    Safe to share between cleanup worker threads.
+    """
+
+    def __init__(self, run_dir: str | os.PathLike, dedupe: bool = False) -> None:
+        self.run_dir = Path(run_dir)
+        self.dedupe = dedupe
+        self.deduped = 0
+        self.dedup_saved_bytes = 0
+        self.renamed = 0
+        self.renamed_bytes = 0
+        self.copied = 0
+        self.copied_bytes = 0
+        # Bytes that landed in the home run directory (the rest sit on other volumes)
+        self.home_bytes = 0
+        self._home_dev: int | None = None
+        self._dirs: dict[int, Path] = {}
+        # Source parent directory -> run directory, so siblings cost no stat
+        self._by_parent: dict[str, str] = {}
+        # Blobs whose content was checked against their name in this run
+        self._verified: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _home(self) -> int:
+        if self._home_dev is None:
+            self.run_dir.mkdir(parents=True, exist_ok=True)
+            self._home_dev = os.stat(self.run_dir).st_dev
+        return self._home_dev
+
+    def dir_for(self, src: str) -> Path:
+        """Return the run directory on the same volume as `src`."""
+        with self._lock:
+            home = self._home()
+        try:
+            dev = os.stat(os.path.dirname(os.path.abspath(src))).st_dev
+        except OSError:
+            return self.run_dir
+        if dev == home:
+            return self.run_dir
+        with self._lock:
+            d = self._dirs.get(dev)
+            if d is None:
+                d = self.run_dir
+                cand = Path(_mount_point(src)) / VOLUME_DIR_NAME / self.run_dir.name
+                try:
+                    cand.mkdir(parents=True, exist_ok=True)
+                    if os.stat(cand).st_dev == dev:
+                        d = cand
+                except OSError:
+                    pass
+                self._dirs[dev] = d
+        return d
+
+    def _dir_str(self, src: str) -> str:
+        parent = os.path.dirname(src)
+        d = self._by_parent.get(parent)
+        if d is None:
+            d = self._by_parent[parent] = str(self.dir_for(src))
+        return d
+
+    def plan(self, src: str, name: str) -> str:
+        """Destination `move_in` will use for `src` (creates the volume directory)."""
+        return os.path.join(self._dir_str(src), name)
+
+    def move_in(self, src: str, name: str, size: int = 0) -> tuple[str, str]:
+        """Move `src` into the run as `name`; returns (dst, "rename"|"copy")."""
+        d = self._dir_str(src)
+        dst = os.path.join(d, name)
+        home = size if d == str(self.run_dir) else 0
+        try:
+            os.replace(src, dst)
+            with self._lock:
+                self.renamed += 1
+                self.renamed_bytes += size
+                self.home_bytes += home
+            return dst, "rename"
+        except OSError as ex:
+            if not _is_cross_device(ex):
+                raise
+        shutil.move(src, dst)
+        with self._lock:
+            self.copied += 1
+            self.copied_bytes += size
+            self.home_bytes += home
+        return dst, "copy"
+
+    def deduplicate(self, path: str, size: int = 0) -> str | None:
+        """Turn a file already in the run into a link to its content blob.
+
+        Returns the blob path, or None if the file is left as it is: the
+        volume cannot hardlink, the file is still hardlinked to a name outside
+        the run (storing it would make the blob an alias of that live file),
+        or the stored blob no longer matches its hash. The hash is taken after
+        the move, so the source cannot change underneath it.
+        """
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_nlink > 1:
+                    return None
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
+        except OSError:
+            return None
+        store = Path(path).parent.parent / STORE_DIR_NAME
+        blob = store / digest[:2] / digest
+        try:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.link(path, blob)
+            with self._lock:
+                self._verified.add(str(blob))
+            return str(blob)
+        except FileExistsError:
+            pass
+        except OSError:
+            return None
+        # Same content is already stored: drop this copy in favour of a link
+        if not self._blob_intact(blob, digest):
+            return None
+        tmp = path + ".pcsuite-link"
+        try:
+            os.link(blob, tmp)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return None
+        with self._lock:
+            self.deduped += 1
+            self.dedup_saved_bytes += size
+            if os.path.dirname(path) == str(self.run_dir):
+                self.home_bytes -= size
+        return str(blob)
+
+    def _blob_intact(self, blob: Path, digest: str) -> bool:
+        key = str(blob)
+        with self._lock:
+            if key in self._verified:
+                return True
+        try:
+            with open(blob, "rb") as f:
+                ok = hashlib.file_digest(f, "sha256").hexdigest() == digest
+        except OSError:
+            return False
+        if ok:
+            with self._lock:
+                self._verified.add(key)
+        return ok
+
+    def extra_dirs(self) -> list[str]:
+        return sorted({str(d) for d in self._dirs.values() if d != self.run_dir})
+
+    def finish(self, prior_files: int = 0, prior_bytes: int = 0, prior_home_bytes: int = 0) -> None:
+        """Record per-volume run directories and the run manifest.
+
+        Directories already listed (e.g. by the run this one resumes) are kept;
+        `prior_files`/`prior_bytes`/`prior_home_bytes` count files an
+        interrupted session moved, so a resume writes the manifest even if it
+        had nothing left to move. Runs spanning volumes also record
+        `home_bytes`, the part stored on the home volume.
+        """
+        if prior_files:
+            self._home()
+        volumes = sorted(set(self.extra_dirs()) | {str(d) for d in run_dirs(self.run_dir)[1:]})
+        if volumes:
+            with open(self.run_dir / VOLUMES_FILE, "w", encoding="utf-8") as f:
+                json.dump(volumes, f, indent=2)
+        if self._home_dev is not None:
+            extra = {"dedupe": True, "dedup_saved_bytes": self.dedup_saved_bytes} if self.dedupe else {}
+            if volumes:
+                extra["home_bytes"] = max(0, prior_home_bytes + self.home_bytes)
+            write_manifest(
+                self.run_dir,
+                files=prior_files + self.renamed + self.copied,
+                nbytes=prior_bytes + self.renamed_bytes + self.copied_bytes,
+                **extra,
+            )
+
+    def summary(self) -> dict:
+        return {
+            "renamed": self.renamed,
+            "renamed_bytes": self.renamed_bytes,
+            "copied": self.copied,
+            "copied_bytes": self.copied_bytes,
+            "deduped": self.deduped,
+            "dedup_saved_bytes": self.dedup_saved_bytes,
+            "volume_dirs": self.extra_dirs(),
+        }
+
+
+def run_dirs(run_dir: str | os.PathLike) -> list[Path]:
+    """Return the home run directory plus any per-volume directories of the run."""
+    home = Path(run_dir)
+    dirs = [home]
+    try:
+        with open(home / VOLUMES_FILE, "r", encoding="utf-8") as f:
+            extra = json.load(f)
+    except Exception:
+        extra = []
+    for d in extra if isinstance(extra, list) else []:
+        p = Path(d)
+        if p.is_dir():
+            dirs.append(p)
+    return dirs
+
+
+def _created_from_name(run_dir: Path) -> str:
+    try:
+        dt = datetime.datetime.strptime(run_dir.name, "%Y%m%d-%H%M%S")
+    except ValueError:
+        try:
+            dt = datetime.datetime.fromtimestamp(run_dir.stat().st_mtime)
+        except OSError:
+            dt = datetime.datetime.now()
+    return dt.isoformat(timespec="seconds")
+
+
+def write_manifest(run_dir: str | os.PathLike, files: int, nbytes: int, created: str | None = None, **extra) -> dict:
+    home = Path(run_dir)
+    manifest = {"files": files, "bytes": nbytes, "created": created or _created_from_name(home), **extra}
+    tmp = home / (MANIFEST_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, home / MANIFEST_FILE)
+    return manifest
+
+
+def read_manifest(run_dir: str | os.PathLike) -> dict | None:
+    try:
+        with open(Path(run_dir) / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get("files"), int) and isinstance(data.get("bytes"), int):
+            return data
+    except Exception:
+        pass
+    return None
+
+
+def _walk_run(run_dir: Path) -> tuple[int, int, int | None]:
+    # (files, bytes, bytes in the home directory or None for single-volume runs)
+    files = total = 0
+    home = None
+    for i, d in enumerate(run_dirs(run_dir)):
+        if i == 1:
+            home = total
+        for dirpath, _, names in os.walk(d):
+            top = dirpath == str(d)
+            for name in names:
+                if top and (name in _META_FILES or name.endswith(".tmp") and name[:-4] in _META_FILES):
+                    continue
+                try:
+                    total += os.stat(os.path.join(dirpath, name)).st_size
+                    files += 1
+                except OSError:
+                    continue
+    return files, total, home
+
+
+def _archive_totals(archive: Path) -> tuple[int, int]:
+    files = total = 0
+    try:
+        with tarfile.open(archive, "r|xz") as tar:
+            for m in tar:
+                if m.isfile():
+                    files += 1
+                    total += m.size
+    except (OSError, tarfile.TarError, EOFError):
+        pass
+    return files, total
+
+
+def verify_run(run_dir: str | os.PathLike) -> dict:
+    """Re-walk a run (all volumes, and its archive if compacted) and rewrite its manifest.
+
+    Returns the fresh manifest plus `repaired` (whether the old one was missing
+    or wrong).
+    """
+    home = Path(run_dir)
+    old = read_manifest(home)
+    files, total, home_bytes = _walk_run(home)
+    if (home / ARCHIVE_FILE).is_file():
+        af, ab = _archive_totals(home / ARCHIVE_FILE)
+        files += af
+        total += ab
+    created = old.get("created") if old else None
+    extra = {k: v for k, v in (old or {}).items() if k not in ("files", "bytes", "created", "home_bytes")}
+    if home_bytes is not None:
+        extra["home_bytes"] = home_bytes
+    manifest = write_manifest(home, files=files, nbytes=total, created=created, **extra)
+    repaired = old is None or (old["files"], old["bytes"]) != (files, total)
+    return {**manifest, "repaired": repaired}
+
+
+def run_info(run_dir: str | os.PathLike, verify: bool = False) -> dict:
+    """Manifest of a run; runs without one (older versions) are walked once and get one."""
+    home = Path(run_dir)
+    if not verify:
+        m = read_manifest(home)
+        if m is not None:
+            return {**m, "repaired": False}
+    return verify_run(home)
+
+
+def adjust_manifest(run_dir: str | os.PathLike, files: int, nbytes: int) -> None:
+    """Apply a delta (e.g. files restored out of the run) to an existing manifest."""
+    home = Path(run_dir)
+    m = read_manifest(home)
+    if m is None or not home.is_dir():
+        return
+    extra = {k: v for k, v in m.items() if k not in ("files", "bytes", "created")}
+    write_manifest(home, files=max(0, m["files"] + files), nbytes=max(0, m["bytes"] + nbytes), created=m.get("created"), **extra)
+
+
+def is_run_dir(p: Path) -> bool:
+    """True for quarantine run directories (not the blob store)."""
+    return p.name != STORE_DIR_NAME and p.is_dir()
+
+
+def store_dirs(run_dir: str | os.PathLike) -> list[Path]:
+    """Blob stores a run may link into (one per volume it used)."""
+    return [d.parent / STORE_DIR_NAME for d in run_dirs(run_dir) if (d.parent / STORE_DIR_NAME).is_dir()]
+
+
+def collect_garbage(stores: list[Path]) -> dict:
+    """Remove blobs that no run links to any more (link count 1)."""
+    blobs = freed = 0
+    for store in stores:
+        for dirpath, _, names in os.walk(store):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                    if st.st_nlink > 1:
+                        continue
+                    os.remove(path)
+                    blobs += 1
+                    freed += st.st_size
+                except OSError:
+                    continue
+    return {"gc_blobs": blobs, "gc_bytes": freed}
+
+
+def archive_path(run_dir: str | os.PathLike) -> Path | None:
+    """The run's archive if it has been compacted, else None."""
+    p = Path(run_dir) / ARCHIVE_FILE
+    return p if p.is_file() else None
+
+
+def compact_run(run_dir: str | os.PathLike, preset: int = 6) -> dict:
+    """Move every quarantined file of a run into its `archive.tar.xz`.
+
+    Files are streamed into the archive one at a time, so memory is bounded by
+    the LZMA preset, not by file size. Members are named by file name (unique
+    within a run: names are numbered). Originals are removed only once the
+    archive is complete; per-volume directories go with them, and blobs of a
+    deduplicated run that nothing links to any more are collected.
+
+    Returns `{files, bytes, archive_bytes, freed_bytes, reclaimed_bytes}`;
+    `reclaimed_bytes` is the space actually freed minus the archive size.
+    """
+    home = Path(run_dir)
+    if archive_path(home) is not None:
+        raise FileExistsError(f"run already compacted: {home}")
+    dirs = run_dirs(home)
+    stores = store_dirs(home)
+    paths = []
+    for d in dirs:
+        for dirpath, _, names in os.walk(d):
+            top = dirpath == str(d)
+            for name in names:
+                if top and (name in _META_FILES or name.endswith(".tmp") and name[:-4] in _META_FILES):
+                    continue
+                paths.append(os.path.join(dirpath, name))
+    tmp = home / (ARCHIVE_FILE + ".tmp")
+    total = 0
+    try:
+        with tarfile.open(tmp, "w:xz", preset=preset) as tar:
+            for path in paths:
+                # Plain members even for hardlinks: each must extract on its own
+                with open(path, "rb") as f:
+                    st = os.fstat(f.fileno())
+                    info = tarfile.TarInfo(os.path.basename(path))
+                    info.size = st.st_size
+                    info.mtime = int(st.st_mtime)
+                    info.mode = stat.S_IMODE(st.st_mode)
+                    tar.addfile(info, f)
+                total += info.size
+    except BaseException:
+        # All or nothing: the run stays as it was
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    os.replace(tmp, home / ARCHIVE_FILE)
+    freed = 0
+    for path in paths:
+        try:
+            st = os.stat(path)
+            os.remove(path)
+            # A hardlink shared with a blob frees nothing until the blob goes
+            if st.st_nlink == 1:
+                freed += st.st_size
+        except OSError:
+            continue
+    for d in dirs[1:]:
+        shutil.rmtree(d, ignore_errors=True)
+    try:
+        os.remove(home / VOLUMES_FILE)
+    except OSError:
+        pass
+    freed += collect_garbage(stores)["gc_bytes"] if stores else 0
+    archive_bytes = os.path.getsize(home / ARCHIVE_FILE)
+    old = read_manifest(home) or {}
+    extra = {k: v for k, v in old.items() if k not in ("files", "bytes", "created", "home_bytes")}
+    extra["archive"] = ARCHIVE_FILE
+    extra["archive_bytes"] = archive_bytes
+    write_manifest(home, files=len(paths), nbytes=total, created=old.get("created"), **extra)
+    return {
+        "files": len(paths),
+        "bytes": total,
+        "archive_bytes": archive_bytes,
+        "freed_bytes": freed,
+        "reclaimed_bytes": freed - archive_bytes,
+    }
+
+
+def extract_members(archive: str | os.PathLike, targets: dict[str, str]) -> dict[str, str | None]:
+    """Extract archive members to paths in one streaming pass.
+
+    `targets` maps member name -> destination path. Returns member name -> error
+    (None on success); members not found in the archive get an error.
+    """
+    results: dict[str, str | None] = {}
+    try:
+        with tarfile.open(archive, "r|xz") as tar:
+            for m in tar:
+                dst = targets.get(m.name)
+                if dst is None or m.name in results or not m.isfile():
+                    continue
+                tmp = dst + ".pcsuite-extract"
+                try:
+                    src = tar.extractfile(m)
+                    with src, open(tmp, "wb") as out:
+                        shutil.copyfileobj(src, out)
+                    os.utime(tmp, (m.mtime, m.mtime))
+                    os.replace(tmp, dst)
+                    results[m.name] = None
+                except OSError as ex:
+                    try:
+                        os.remove(tmp)
+                    except OSError:
+                        pass
+                    results[m.name] = str(ex)
+                if len(results) == len(targets):
+                    break
+    except (OSError, tarfile.TarError, EOFError) as ex:
+        err = f"archive unreadable: {ex}"
+        return {name: results.get(name, err) for name in targets}
+    return {name: results.get(name, "not in archive") for name in targets}
@@ -0,0 +1,155 @@
+"""Persistent directory-listing cache for the scan engine.
+
+Each scanned directory is stored with its mtime and a compact listing (entry
+name, kind and file size). On the next scan a directory whose mtime is
+unchanged is served from the index instead of being listed again; only its
+subdirectories still need a stat to check their own mtimes.
+
+Limits: a file rewritten in place does not bump its directory's mtime, so its
+cached size can be stale until something is added to or removed from that
+directory. Directories modified within the last couple of seconds are never
+cached, so same-tick changes cannot hide behind an equal mtime.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+# Directories changed this recently are listed but not cached
+_RACY_SECONDS = 2.0
+
+
+class CachedEntry:
+    """Stand-in for `os.DirEntry` rebuilt from the index."""
+
+    __slots__ = ("name", "kind", "size")
+
+    def __init__(self, name: str, kind: str, size: int) -> None:
+        self.name = name
+        self.kind = kind  # "f" regular file, "d" directory, "o" other
+        self.size = size
+
+    def is_file(self) -> bool:
+        return self.kind == "f"
+
+    def is_dir(self) -> bool:
+        return self.kind == "d"
+
+
+def _describe(entry: os.DirEntry) -> list:
+    try:
+        if entry.is_dir():
+            return [entry.name, "d", 0]
+        if entry.is_file():
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                size = 0
+            return [entry.name, "f", size]
+    except OSError:
+        pass
+    return [entry.name, "o", 0]
+
+
+class ScanIndex:
+    """SQLite-backed listing cache; safe to share between scan threads."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._updates: dict[str, tuple[int, str]] = {}
+        self._conn: sqlite3.Connection | None = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime_ns INTEGER, entries TEXT)"
+            )
+        except sqlite3.Error:
+            # Unusable index (locked, corrupt): scan without it
+            self._conn = None
+
+    def list_dir(self, dirpath: str) -> list:
+        """Return the entries of `dirpath`, from the index when still current."""
+        try:
+            mtime = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            return []
+        key = os.path.normcase(dirpath)
+        row = None
+        if self._conn is not None:
+            with self._lock:
+                try:
+                    row = self._conn.execute(
+                        "SELECT mtime_ns, entries FROM dirs WHERE path = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+        if row is not None and row[0] == mtime:
+            with self._lock:
+                self.hits += 1
+            return [CachedEntry(*e) for e in json.loads(row[1])]
+        try:
+            with os.scandir(dirpath) as it:
+                listing = [_describe(e) for e in it]
+        except OSError:
+            return []
+        with self._lock:
+            self.misses += 1
+            if time.time() - mtime / 1e9 >= _RACY_SECONDS:
+                self._updates[key] = (mtime, json.dumps(listing, separators=(",", ":")))
+        return [CachedEntry(*e) for e in listing]
+
+    def close(self) -> None:
+        """Write back new listings and release the database."""
+        if self._conn is None:
+            return
+        with self._lock:
+            try:
+                if self._updates:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO dirs (path, mtime_ns, entries) VALUES (?, ?, ?)",
+                        [(k, m, e) for k, (m, e) in self._updates.items()],
+                    )
+                    self._conn.commit()
+            except sqlite3.Error:
+                pass
+            finally:
+                self._updates.clear()
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict:
+        return {"index_hits": self.hits, "index_misses": self.misses}
+
+
+def index_info(path: str | os.PathLike) -> dict:
+    """Return basic facts about an index file (directories stored, bytes on disk)."""
+    p = Path(path)
+    if not p.exists():
+        return {"path": str(p), "exists": False, "directories": 0, "bytes": 0}
+    dirs = 0
+    try:
+        conn = sqlite3.connect(str(p))
+        try:
+            dirs = conn.execute("SELECT COUNT(*) FROM dirs").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+    return {"path": str(p), "exists": True, "directories": dirs, "bytes": p.stat().st_size}
+
+
+def clear_index(path: str | os.PathLike) -> bool:
+    """Delete the index file; the next scan rebuilds it from scratch."""
+    try:
+        Path(path).unlink()
+        return True
+    except FileNotFoundError:
+        return False
@@ -1,5 +1,33 @@
+import atexit
+from dataclasses import dataclass
+import os
+import re
 import subprocess
-from typing import Tuple
+import threading
+import time
+from typing import Iterator, Sequence, Tuple
+
+from . import executor, pwsh_host
+
+# Run pwsh() commands in pooled long-lived PowerShell sessions (see pwsh_host);
+# PCSUITE_PWSH_HOST=0 restores one powershell.exe per call
+PWSH_HOST = os.environ.get("PCSUITE_PWSH_HOST", "1") != "0"
+PWSH_POOL_SIZE = 2
+# Interpreter command line for the pooled hosts; None means PowerShell itself
+PWSH_HOST_ARGV: list[str] | None = None
+
+# `exit` would end the shared session, so such commands get their own process
+_EXITS = re.compile(r"\bexit\b", re.IGNORECASE)
+
+# Seconds a read-only query result is reused (see `cached`); PCSUITE_QUERY_TTL=0 disables
+try:
+    QUERY_TTL = float(os.environ.get("PCSUITE_QUERY_TTL", "5"))
+except ValueError:
+    QUERY_TTL = 5.0
+
+_pool: pwsh_host.HostPool | None = None
+_pool_broken = False
+_pool_lock = threading.Lock()
 
 
 def run(cmd: list[str], shell: bool = False, timeout: int | None = None) -> Tuple[int, str, str]:
@@ -18,10 +46,156 @@ def run(cmd: list[str], shell: bool = False, timeout: int | None = None) -> Tupl
         return 1, "", str(e)
 
 
+def _pwsh_pool() -> pwsh_host.HostPool | None:
+    global _pool
+    if not PWSH_HOST or _pool_broken:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = pwsh_host.HostPool(size=PWSH_POOL_SIZE, argv=PWSH_HOST_ARGV)
+        return _pool
+
+
+def pwsh_host_stats() -> dict:
+    """Counters of the pooled PowerShell hosts (empty if none was used)."""
+    return _pool.stats() if _pool is not None else {}
+
+
+def close_pwsh_host() -> None:
+    """Stop the pooled PowerShell hosts; the next pwsh() call starts fresh ones."""
+    global _pool, _pool_broken
+    with _pool_lock:
+        pool, _pool = _pool, None
+        _pool_broken = False
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(close_pwsh_host)
+
+
 def pwsh(command: str, timeout: int | None = None) -> Tuple[int, str, str]:
     """Run a PowerShell command and return (code, out, err)."""
+    global _pool_broken
+    pool = _pwsh_pool() if not _EXITS.search(command) else None
+    if pool is not None:
+        try:
+            return pool.run(command, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            return 1, "", str(e)
+        except pwsh_host.HostStartError:
+            # No usable interpreter (e.g. PowerShell missing): stop trying in this process
+            _pool_broken = True
+        except pwsh_host.HostError:
+            pass  # the host died mid-command; it restarts on the next call
     return run(["powershell", "-NoProfile", "-Command", command], timeout=timeout)
 
 
 def cmdline(command: str, timeout: int | None = None) -> Tuple[int, str, str]:
     return run(["cmd", "/c", command], timeout=timeout)
+
+
+# (kind, command) -> (expiry on the monotonic clock, result)
+_cache: dict[tuple[str, str], tuple[float, Tuple[int, str, str]]] = {}
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def cached(kind: str, command: str, ttl: float | None = None, timeout: int | None = None) -> Tuple[int, str, str]:
+    """Run a read-only "cmd" or "pwsh" query, reusing a result younger than `ttl` seconds.
+
+    Only successful results are kept. Code that changes what a query reports
+    must call `invalidate` with a prefix of that query afterwards.
+    """
+    ttl = QUERY_TTL if ttl is None else ttl
+    key = (kind, command)
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None and hit[0] > now:
+            _cache_stats["hits"] += 1
+            return hit[1]
+        _cache_stats["misses"] += 1
+    fn = pwsh if kind == "pwsh" else cmdline
+    result = fn(command, timeout=timeout)
+    if ttl > 0 and result[0] == 0:
+        with _cache_lock:
+            _cache[key] = (time.monotonic() + ttl, tuple(result))
+    return result
+
+
+def invalidate(*prefixes: str) -> int:
+    """Drop cached queries starting with any of `prefixes` (all if none); returns the count."""
+    with _cache_lock:
+        keys = [k for k in _cache if not prefixes or k[1].lower().startswith(tuple(p.lower() for p in prefixes))]
+        for k in keys:
+            del _cache[k]
+    return len(keys)
+
+
+def query_cache_stats() -> dict:
+    """Hit/miss counters of `cached` and the number of live entries."""
+    now = time.monotonic()
+    with _cache_lock:
+        return {**_cache_stats, "entries": sum(1 for exp, _ in _cache.values() if exp > now)}
+
+
+@dataclass
+class Command:
+    """One entry for `run_many`: `kind` is "pwsh", "cmd" or "run" (argv list).
+
+    `cache=True` routes a read-only "pwsh"/"cmd" query through `cached`.
+    """
+
+    kind: str
+    command: str | list[str]
+    timeout: int | float | None = None
+    cache: bool = False
+
+
+@dataclass
+class Result:
+    """Outcome of one `run_many` command; unpacks like `(code, out, err)`."""
+
+    code: int
+    out: str
+    err: str
+    seconds: float = 0.0
+
+    def __iter__(self) -> Iterator:
+        return iter((self.code, self.out, self.err))
+
+
+def _run_one(command: Command, timeout: int | float | None) -> Result:
+    # Looked up at call time so the module-level functions stay patchable
+    runners = {"pwsh": pwsh, "cmd": cmdline, "run": run}
+    fn = runners.get(command.kind)
+    started = time.perf_counter()
+    if fn is None:
+        return Result(1, "", f"unknown command kind: {command.kind}")
+    limit = command.timeout if command.timeout is not None else timeout
+    try:
+        if command.cache and command.kind in ("pwsh", "cmd"):
+            code, out, err = cached(command.kind, command.command, timeout=limit)
+        else:
+            code, out, err = fn(command.command, timeout=limit)
+    except Exception as e:
+        code, out, err = 1, "", str(e)
+    return Result(code, out, err, time.perf_counter() - started)
+
+
+def run_many(
+    commands: Sequence[Command | tuple],
+    max_parallel: int = 4,
+    timeout: int | float | None = None,
+) -> list[Result]:
+    """Run independent commands concurrently; results come back in input order.
+
+    Each entry is a `Command` or a `(kind, command[, timeout])` tuple. `timeout`
+    applies to entries without their own. A failure or timeout only affects its
+    own entry (`code` 1, message in `err`). PowerShell commands share the host
+    pool, so at most `PWSH_POOL_SIZE` of them run at the same time.
+    """
+    items = [c if isinstance(c, Command) else Command(*c) for c in commands]
+    workers = min(max(1, max_parallel), len(items))
+    return list(executor.map_ordered(lambda c: _run_one(c, timeout), items, workers=workers, batch=1))
@@ -0,0 +1,174 @@
+"""Compiled, cached form of `signatures.yml` and `exclusions.yml`.
+
+Parsing YAML dominates the start of every scan once signature sets grow. `load`
+keeps the parsed result at two levels:
+
+- in-process: a loaded database is reused until either file's mtime or size
+  changes, so long-lived processes (GUI, agent) parse once and pick up edits
+  on their next scan without a restart;
+- on disk: `signatures.cache` in the reports directory holds the flattened
+  category globs and exclusion patterns (marshal, so loading it cannot run
+  code), keyed by each file's mtime, size and SHA-256. A changed mtime with
+  unchanged content only costs a hash.
+
+Files modified within the last couple of seconds are always re-hashed, so a
+same-tick rewrite cannot hide behind an equal mtime (as in `scan_index`).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import hashlib
+import marshal
+import os
+from pathlib import Path
+import threading
+import time
+
+from . import scan
+
+CACHE_NAME = "signatures.cache"
+# Bump when the cached layout changes
+CACHE_VERSION = 1
+# Files changed this recently are re-hashed even if their stat matches
+_RACY_SECONDS = 2.0
+
+
+@dataclass
+class SignatureDB:
+    """Signature categories and the compiled exclusion matcher."""
+
+    categories: dict[str, list[str]] = field(default_factory=dict)
+    exclusions: list[str] = field(default_factory=list)
+    _matcher: scan.ExclusionMatcher | None = field(default=None, repr=False)
+
+    @property
+    def matcher(self) -> scan.ExclusionMatcher:
+        if self._matcher is None:
+            self._matcher = scan.ExclusionMatcher(self.exclusions)
+        return self._matcher
+
+    def patterns(self, categories) -> tuple[list[str], list[str]]:
+        """Env-expanded globs of the given categories, with each glob's category."""
+        patterns: list[str] = []
+        cats: list[str] = []
+        for cat in categories:
+            cat = cat.strip()
+            for pattern in self.categories.get(cat, ()):
+                patterns.append(os.path.expandvars(pattern))
+                cats.append(cat)
+        return patterns, cats
+
+
+def _stat_key(path: Path) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _racy(key: tuple[int, int] | None) -> bool:
+    return key is not None and time.time() - key[0] / 1e9 < _RACY_SECONDS
+
+
+def _read(path: Path) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _compile(sig_text: bytes | None, excl_text: bytes | None) -> SignatureDB:
+    # Lazy import: a cache hit never needs the YAML parser
+    import yaml
+
+    sigs = yaml.safe_load(sig_text) if sig_text else None
+    excls = yaml.safe_load(excl_text) if excl_text else None
+    categories: dict[str, list[str]] = {}
+    cat_defs = sigs.get("categories") if isinstance(sigs, dict) else None
+    for name, catdef in (cat_defs or {}).items():
+        globs = catdef.get("globs", []) if isinstance(catdef, dict) else []
+        categories[str(name)] = [g for g in globs or [] if isinstance(g, str)]
+    paths = excls.get("paths", []) if isinstance(excls, dict) else []
+    return SignatureDB(categories=categories, exclusions=[p for p in paths or [] if isinstance(p, str)])
+
+
+def _read_cache(path: Path) -> dict | None:
+    try:
+        with open(path, "rb") as f:
+            data = marshal.load(f)
+        if isinstance(data, dict) and data.get("version") == CACHE_VERSION:
+            return data
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    return None
+
+
+def _write_cache(path: Path, data: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump(data, f)
+        os.replace(tmp, path)
+    except OSError:
+        # A read-only reports directory just means no disk cache
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+_lock = threading.Lock()
+# (signatures path, exclusions path) -> (stat keys, database)
+_loaded: dict[tuple[str, str], tuple[tuple, SignatureDB]] = {}
+stats = {"memory": 0, "disk": 0, "parsed": 0}
+
+
+def load(sig_path: str | os.PathLike, excl_path: str | os.PathLike, cache_dir: str | os.PathLike | None = None) -> SignatureDB:
+    """Return the signature database for these files, parsing YAML only when needed."""
+    sig_path, excl_path = Path(sig_path), Path(excl_path)
+    keys = (_stat_key(sig_path), _stat_key(excl_path))
+    mem_key = (str(sig_path), str(excl_path))
+    with _lock:
+        hit = _loaded.get(mem_key)
+    if hit is not None and hit[0] == keys and not any(_racy(k) for k in keys):
+        stats["memory"] += 1
+        return hit[1]
+
+    paths = (sig_path, excl_path)
+    cache_path = Path(cache_dir) / CACHE_NAME if cache_dir is not None else None
+    cached = _read_cache(cache_path) if cache_path is not None else None
+    cached_sources = cached.get("sources", []) if cached is not None else []
+    stamps = [[str(p), k[0] if k else None, k[1] if k else None] for p, k in zip(paths, keys)]
+    db = None
+    if cached is not None and [s[:3] for s in cached_sources] == stamps and not any(_racy(k) for k in keys):
+        db = SignatureDB(categories=cached["categories"], exclusions=cached["exclusions"])
+    else:
+        texts = [_read(p) for p in paths]
+        sources = [st + [hashlib.sha256(t).hexdigest() if t is not None else None] for st, t in zip(stamps, texts)]
+        if cached is not None and [s[0::3] for s in cached_sources] == [s[0::3] for s in sources]:
+            # Same content under a new mtime (e.g. a fresh copy): refresh the key
+            db = SignatureDB(categories=cached["categories"], exclusions=cached["exclusions"])
+            if cached_sources != sources:
+                _write_cache(cache_path, {**cached, "sources": sources})  # type: ignore[arg-type]
+    if db is not None:
+        stats["disk"] += 1
+    else:
+        db = _compile(*texts)
+        stats["parsed"] += 1
+        if cache_path is not None:
+            _write_cache(
+                cache_path,
+                {"version": CACHE_VERSION, "sources": sources, "categories": db.categories, "exclusions": db.exclusions},
+            )
+    with _lock:
+        _loaded[mem_key] = (keys, db)
+    return db
+
+
+def clear() -> None:
+    """Forget databases loaded by this process (the disk cache is kept)."""
+    with _lock:
+        _loaded.clear()
@@ -4,7 +4,7 @@ from pcsuite.core import shell
 
 
 def current_settings() -> Dict[str, str]:
-    code, out, err = shell.cmdline("netsh int tcp show global")
+    code, out, err = shell.cached("cmd", "netsh int tcp show global")
     if code != 0:
         return {}
     settings: Dict[str, str] = {}
@@ -49,4 +49,5 @@ def apply(recs: List[Dict[str, str]], dry_run: bool = True) -> Dict[str, Any]:
         code, out, err = shell.cmdline(cmd)
         if code != 0:
             any_err = True
+    shell.invalidate("netsh int tcp show")
     return {"ok": not any_err, "dry_run": False}
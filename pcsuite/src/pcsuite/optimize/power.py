@@ -5,7 +5,7 @@ from pcsuite.core import shell
 
 
 def current_scheme() -> Tuple[str | None, str | None]:
-    code, out, err = shell.cmdline("powercfg /GETACTIVESCHEME")
+    code, out, err = shell.cached("cmd", "powercfg /GETACTIVESCHEME")
     if code != 0:
         return None, None
     # Output: Power Scheme GUID: xxxxxxxx-...  (Balanced)
@@ -16,7 +16,7 @@ def current_scheme() -> Tuple[str | None, str | None]:
 
 
 def list_schemes() -> List[Tuple[str, str]]:
-    code, out, err = shell.cmdline("powercfg -l")
+    code, out, err = shell.cached("cmd", "powercfg -l")
     if code != 0:
         return []
     results: List[Tuple[str, str]] = []
@@ -68,4 +68,5 @@ def set_scheme_by_name(name: str, dry_run: bool = True) -> Dict[str, Any]:
     if dry_run:
         return {"ok": True, "dry_run": True, "cmd": cmd}
     code, out, err = shell.cmdline(cmd)
+    shell.invalidate("powercfg")
     return {"ok": code == 0, "dry_run": False, "error": (err or out or "").strip() if code != 0 else ""}
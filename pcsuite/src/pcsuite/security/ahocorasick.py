@@ -0,0 +1,72 @@
+"""Aho-Corasick automaton: find which of many literals occur in a text in one pass.
+
+Used by the rule prefilter (`rules.Prefilter`) to scan an event field once for
+every `contains` literal of a rule set instead of testing each literal on its
+own. Transitions are resolved through the failure links the first time a
+(state, character) pair is seen and memoised, so scanning costs one dict
+lookup per character after warm-up.
+"""
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable
+
+
+class Automaton:
+    """Matches a fixed set of non-empty literals; `find` returns their indexes."""
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self.words: list[str] = list(words)
+        goto: list[dict[str, int]] = [{}]
+        out: list[frozenset[int]] = [frozenset()]
+        for i, word in enumerate(self.words):
+            if not word:
+                raise ValueError("empty literal")
+            state = 0
+            for ch in word:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(frozenset())
+                state = nxt
+            out[state] = out[state] | {i}
+
+        # Breadth-first failure links; each state's output includes its suffixes'
+        fail = [0] * len(goto)
+        todo = deque(goto[0].values())
+        while todo:
+            state = todo.popleft()
+            for ch, nxt in goto[state].items():
+                todo.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f][ch] if ch in goto[f] and goto[f][ch] != nxt else 0
+                out[nxt] = out[nxt] | out[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        # Memoised transitions, filled in by `_step`
+        self._delta: list[dict[str, int]] = [dict(g) for g in goto]
+
+    def _step(self, state: int, ch: str) -> int:
+        s = state
+        while s and ch not in self._goto[s]:
+            s = self._fail[s]
+        nxt = self._goto[s].get(ch, 0)
+        self._delta[state][ch] = nxt
+        return nxt
+
+    def find(self, text: str) -> set[int]:
+        """Indexes of the literals that occur anywhere in `text`."""
+        delta, out, step = self._delta, self._out, self._step
+        found: set[int] = set()
+        state = 0
+        for ch in text:
+            nxt = delta[state].get(ch)
+            state = step(state, ch) if nxt is None else nxt
+            if out[state]:
+                found |= out[state]
+        return found
@@ -254,7 +254,13 @@ def detect(rules_path: str, limit: int = 200) -> Dict[str, Any]:
     events = seclogs.get_security_events(limit=limit)
     rules = secrules.load_rules(rules_path)
     matches = secrules.evaluate_events(events, rules)
-    return {"events": len(events), "rules": len(rules), "matches": matches}
+    return {
+        "events": len(events),
+        "rules": len(rules),
+        "matches": matches,
+        "rule_errors": rules.errors,
+        "index": rules.prefilter.stats(),
+    }
 
 
 def quarantine_file(path: str, dry_run: bool = True) -> Dict[str, Any]:
@@ -26,7 +26,7 @@ def _parse_allprofiles(output: str) -> Dict[str, str]:
 
 def get_profile_states() -> Dict[str, str]:
     """Return firewall states for Domain/Private/Public via netsh (ON/OFF/unknown)."""
-    code, out, err = shell.cmdline("netsh advfirewall show allprofiles")
+    code, out, err = shell.cached("cmd", "netsh advfirewall show allprofiles")
     if code != 0:
         return {"Domain": "unknown", "Private": "unknown", "Public": "unknown"}
     return _parse_allprofiles(out)
@@ -38,6 +38,7 @@ def set_all_profiles(enable: bool, dry_run: bool = True) -> Dict[str, Any]:
     if dry_run:
         return {"ok": True, "dry_run": True, "cmd": cmd}
     code, out, err = shell.cmdline(cmd)
+    shell.invalidate("netsh advfirewall show")
     return {"ok": code == 0, "dry_run": False, "error": (err or out or "").strip() if code != 0 else ""}
 
 
@@ -52,6 +53,7 @@ def set_firewall_policy(block_outbound: bool, dry_run: bool = True) -> Dict[str,
     if dry_run:
         return {"ok": True, "dry_run": True, "cmd": cmd}
     code, out, err = shell.cmdline(cmd)
+    shell.invalidate("netsh advfirewall show")
     return {"ok": code == 0, "dry_run": False, "error": (err or out or "").strip() if code != 0 else ""}
 
 
@@ -1,11 +1,19 @@
 from __future__ import annotations
 from typing import List, Dict, Any
+from itertools import chain
 import re
 from pathlib import Path
 import yaml
 
+from .ahocorasick import Automaton
 
-def load_rules(path: str | Path) -> List[Dict[str, Any]]:
+
+def load_rules(path: str | Path) -> "RuleSet":
+    """Load rule files and compile them (see `compile_rules`).
+
+    The result is still a list of the rule dicts; rules that cannot be
+    compiled (e.g. an invalid regex) are left out and listed in `.errors`.
+    """
     p = Path(path)
     files: List[Path] = []
     if p.is_file():
@@ -21,7 +29,7 @@ def load_rules(path: str | Path) -> List[Dict[str, Any]]:
                 rules.append(data)
         except Exception:
             continue
-    return rules
+    return compile_rules(rules)
 
 
 def _field_get(event: Dict[str, Any], field: str) -> str:
@@ -35,7 +43,7 @@ def _field_get(event: Dict[str, Any], field: str) -> str:
 
 
 def match_block(event: Dict[str, Any], det: Dict[str, Any]) -> bool:
-    """Very small Sigma-like matcher.
+    """Very small Sigma-like matcher (reference for the compiled form below).
 
     Supports detection:
       contains: { field: [substr, ...] }
@@ -109,20 +117,340 @@ def match_event(event: Dict[str, Any], rule: Dict[str, Any]) -> bool:
     return match_block(event, det)
 
 
-def evaluate_events(events: List[Dict[str, Any]], rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    matches: List[Dict[str, Any]] = []
+class RuleError(ValueError):
+    """A rule that cannot be compiled (e.g. an invalid regex)."""
+
+
+_OPS = ("contains", "equals", "startswith", "endswith", "regex")
+
+
+class EventView:
+    """An event whose field strings (and lower-cased forms) are computed once.
+
+    Compiled rules read fields through a view, so evaluating many rules
+    against one event converts each field with `str()` and `lower()` at most
+    once.
+    """
+
+    __slots__ = ("event", "_str", "_lower")
+
+    def __init__(self, event: Dict[str, Any]) -> None:
+        self.event = event
+        self._str: Dict[str, str] = {}
+        self._lower: Dict[str, str] = {}
+
+    def get(self, field: str) -> str:
+        v = self._str.get(field)
+        if v is None:
+            v = self._str[field] = _field_get(self.event, field)
+        return v
+
+    def lower(self, field: str) -> str:
+        v = self._lower.get(field)
+        if v is None:
+            v = self._lower[field] = self.get(field).lower()
+        return v
+
+
+def _predicate(op: str, values, strict: bool):
+    """One `field: [values]` check as a function of the field's string value.
+
+    `contains` checks receive the lower-cased value (see `EventView.lower`).
+    """
+    if op == "contains":
+        lits = tuple(str(v).lower() for v in values)
+        if len(lits) == 1:
+            lit = lits[0]
+            return lambda fv: lit in fv
+        return lambda fv: any(lit in fv for lit in lits)
+    if op == "equals":
+        lits = frozenset(str(v) for v in values)
+        return lambda fv: fv in lits
+    if op == "startswith":
+        lits = tuple(str(v) for v in values)
+        return lambda fv: fv.startswith(lits)
+    if op == "endswith":
+        lits = tuple(str(v) for v in values)
+        return lambda fv: fv.endswith(lits)
+    pats = []
+    for v in values:
+        try:
+            pats.append(re.compile(str(v)))
+        except re.error as ex:
+            if strict:
+                raise RuleError(f"invalid regex {str(v)!r}: {ex}") from None
+    searches = tuple(p.search for p in pats)
+    return lambda fv: any(search(fv) for search in searches)
+
+
+def _never(view: EventView) -> bool:
+    return False
+
+
+def _always(view: EventView) -> bool:
+    return True
+
+
+# A guard is a necessary condition for a match: the rule can only match an
+# event if one of its (kind, field, value) terms holds, where kind "eq" means
+# the field's string value equals `value` and "in" means the lower-cased field
+# value contains it. None means no such condition is known; an empty set
+# means the rule never matches.
+_NEVER_GUARD: frozenset = frozenset()
+
+
+def _guard_score(guard: frozenset) -> tuple[int, int]:
+    # Exact values are a hash lookup and usually selective; among literals
+    # longer ones are rarer. Then prefer fewer alternatives.
+    return min((1 << 30 if kind == "eq" else len(v) for kind, _, v in guard), default=1 << 30), -len(guard)
+
+
+def _best_guard(guards) -> frozenset | None:
+    guards = [g for g in guards if g is not None]
+    return max(guards, key=_guard_score) if guards else None
+
+
+def _compile_block(det: Dict[str, Any], strict: bool):
+    """Compile one detection block into `(test(view) -> bool, guard)`.
+
+    `test` gives the same result as `match_block` on the viewed event.
+    """
+    checks = []
+    guards = []
+    active = False
+    for op in _OPS:
+        spec = det.get(op) or {}
+        if spec:
+            active = True
+        if not isinstance(spec, dict):
+            continue
+        for field, values in spec.items():
+            values = list(values or [])
+            if not values:
+                return _never, _NEVER_GUARD  # `any` over no values never holds
+            checks.append((field, _predicate(op, values, strict), op == "contains"))
+            if op == "equals":
+                guards.append(frozenset(("eq", field, str(v)) for v in values))
+            elif op == "contains":
+                lits = frozenset(("in", field, str(v).lower()) for v in values)
+                if all(lit for _, _, lit in lits):
+                    guards.append(lits)
+    if not active:
+        return _never, _NEVER_GUARD
+    if not checks:
+        return _always, None
+    checks = tuple(checks)
+
+    def test(view: EventView) -> bool:
+        for field, check, lower in checks:
+            if not check(view.lower(field) if lower else view.get(field)):
+                return False
+        return True
+
+    return test, _best_guard(guards)
+
+
+class CompiledRule:
+    """A rule dict with its detection compiled into `test(view) -> bool`.
+
+    `guard` is the set of ("eq" | "in", field, value) terms of which at least
+    one must hold for the rule to match (see `_guard_score`), or None if unknown.
+    """
+
+    __slots__ = ("rule", "title", "test", "guard")
+
+    def __init__(self, rule: Dict[str, Any], strict: bool = True) -> None:
+        self.rule = rule
+        self.title = str(rule.get("title") or rule.get("id") or Path(rule.get("__path", "rule.yml")).name)
+        self.test, self.guard = self._compile(rule.get("detection") or {}, strict)
+
+    def match(self, event: Dict[str, Any]) -> bool:
+        return self.test(EventView(event))
+
+    @staticmethod
+    def _compile(det, strict: bool):
+        if not isinstance(det, dict):
+            return _never, _NEVER_GUARD
+        if "all" in det and isinstance(det["all"], list):
+            if not all(isinstance(b, dict) for b in det["all"]):
+                return _never, _NEVER_GUARD
+            blocks = [_compile_block(b, strict) for b in det["all"]]
+            if any(g == _NEVER_GUARD for _, g in blocks):
+                return _never, _NEVER_GUARD
+            tests = tuple(t for t, _ in blocks)
+            return (lambda v: all(t(v) for t in tests)), _best_guard(g for _, g in blocks)
+        if "any" in det and isinstance(det["any"], list):
+            blocks = [_compile_block(b, strict) for b in det["any"] if isinstance(b, dict)]
+            tests = tuple(t for t, _ in blocks)
+            guards = [g for _, g in blocks]
+            guard = None if any(g is None for g in guards) else frozenset().union(*guards)
+            return (lambda v: any(t(v) for t in tests)), guard
+        return _compile_block(det, strict)
+
+
+class Prefilter:
+    """Candidate-rule lookup for a rule set, built from the rule guards.
+
+    "eq" terms go into one hash index per field (value -> rules) and "in"
+    terms into one Aho-Corasick automaton per field. `candidates(event)`
+    looks up / scans each indexed field of the event once and returns the
+    guarded rules that may match it; rules without a guard are in
+    `unguarded` (the fallback bucket) and must always be evaluated.
+    """
+
+    def __init__(self, compiled: List[CompiledRule]) -> None:
+        equals: Dict[str, Dict[str, set]] = {}
+        literals: Dict[str, Dict[str, set]] = {}
+        self.unguarded: List[int] = []
+        for i, c in enumerate(compiled):
+            if c.guard is None:
+                self.unguarded.append(i)
+                continue
+            for kind, field, value in c.guard:
+                index = equals if kind == "eq" else literals
+                index.setdefault(field, {}).setdefault(value, set()).add(i)
+        self.equals = [(field, {v: frozenset(r) for v, r in values.items()}) for field, values in equals.items()]
+        self.fields = []
+        for field, lits in literals.items():
+            words = list(lits)
+            self.fields.append((field, Automaton(words), [frozenset(lits[w]) for w in words]))
+        self.rules = len(compiled)
+        self.literals = sum(len(lits) for lits in literals.values())
+        self.events = 0
+        self.evaluated = 0
+
+    def candidates(self, event: Dict[str, Any] | EventView) -> set:
+        view = event if isinstance(event, EventView) else EventView(event)
+        found: set = set()
+        for field, index in self.equals:
+            hit = index.get(view.get(field))
+            if hit:
+                found |= hit
+        for field, automaton, rules_of in self.fields:
+            text = view.lower(field)
+            if not text:
+                continue
+            for w in automaton.find(text):
+                found |= rules_of[w]
+        self.events += 1
+        self.evaluated += len(found) + len(self.unguarded)
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        """Index shape and the average number of rules evaluated per event so far."""
+        return {
+            "rules": self.rules,
+            "indexed_rules": self.rules - len(self.unguarded),
+            "equals_fields": {field: len(index) for field, index in self.equals},
+            "equals_buckets": sum(len(index) for _, index in self.equals),
+            "literal_fields": {field: len(words) for field, _, words in self.fields},
+            "literals": self.literals,
+            "fallback_rules": len(self.unguarded),
+            "events": self.events,
+            "avg_candidates": round(self.evaluated / self.events, 2) if self.events else 0.0,
+        }
+
+
+class RuleSet(list):
+    """Rule dicts plus their compiled form, built once by `compile_rules`."""
+
+    def __init__(self, rules=(), compiled=(), errors=()) -> None:
+        super().__init__(rules)
+        self.compiled: List[CompiledRule] = list(compiled)
+        self.errors: List[Dict[str, str]] = list(errors)
+        self._prefilter: Prefilter | None = None
+
+    @property
+    def prefilter(self) -> Prefilter:
+        if self._prefilter is None:
+            self._prefilter = Prefilter(self.compiled)
+        return self._prefilter
+
+
+def compile_rules(rules: List[Dict[str, Any]], strict: bool = True) -> RuleSet:
+    """Compile rule dicts once: lower-cased `contains` literals, pre-built regexes.
+
+    With `strict`, a rule whose values cannot be compiled is rejected and
+    reported in `.errors`; otherwise bad regexes are skipped like `match_block`
+    does.
+    """
+    kept: List[Dict[str, Any]] = []
+    compiled: List[CompiledRule] = []
+    errors: List[Dict[str, str]] = []
     for r in rules:
-        title = r.get("title") or r.get("id") or Path(r.get("__path","rule.yml")).name
-        count = 0
-        first = None
+        try:
+            c = CompiledRule(r, strict=strict)
+        except (RuleError, TypeError) as ex:
+            errors.append({"path": str(r.get("__path", "")), "rule": str(r.get("title") or r.get("id") or ""), "error": str(ex)})
+            continue
+        kept.append(r)
+        compiled.append(c)
+    return RuleSet(kept, compiled, errors)
+
+
+def evaluate_events(
+    events: List[Dict[str, Any]],
+    rules: List[Dict[str, Any]],
+    prefilter: bool = True,
+    order: str = "event",
+) -> List[Dict[str, Any]]:
+    """Per-rule match counts over `events`, in rule order.
+
+    `rules` is normally a `RuleSet` from `load_rules`; a plain list of rule
+    dicts is compiled on the fly. With `prefilter`, candidate rules are
+    looked up per event first (exact `equals` values through hash indexes,
+    `contains` literals through one scan per field) and a guarded rule is
+    only evaluated on its candidate events.
+
+    `order="event"` walks the events once, wrapping each in an `EventView`
+    and testing all its candidate rules; `order="rule"` walks the events once
+    per rule. Both give the same result.
+    """
+    if order not in ("event", "rule"):
+        raise ValueError(f"unknown evaluation order: {order!r}")
+    if not isinstance(rules, RuleSet):
+        rules = compile_rules(rules, strict=False)
+    compiled = rules.compiled
+    counts = [0] * len(compiled)
+    firsts: List[Dict[str, Any] | None] = [None] * len(compiled)
+    if compiled and order == "event":
+        tests = [c.test for c in compiled]
+        pf = rules.prefilter if prefilter else None
+        everything = range(len(compiled))
         for e in events:
-            if match_event(e, r):
-                count += 1
-                if first is None:
-                    first = e
+            view = EventView(e)
+            # Candidates and the fallback bucket are disjoint
+            todo = everything if pf is None else chain(pf.candidates(view), pf.unguarded)
+            for i in todo:
+                if tests[i](view):
+                    if not counts[i]:
+                        firsts[i] = e
+                    counts[i] += 1
+    elif compiled:
+        views = [EventView(e) for e in events]
+        # Event indexes each guarded rule has to look at; None means all events
+        todo_of: List[List[int] | None] = [None] * len(compiled)
+        if prefilter:
+            pf = rules.prefilter
+            todo_of = [[] for _ in compiled]
+            for i in pf.unguarded:
+                todo_of[i] = None
+            for n, view in enumerate(views):
+                for i in pf.candidates(view):
+                    todo_of[i].append(n)  # type: ignore[union-attr]
+        for i, (c, idx) in enumerate(zip(compiled, todo_of)):
+            test = c.test
+            for n in (range(len(views)) if idx is None else idx):
+                if test(views[n]):
+                    if not counts[i]:
+                        firsts[i] = events[n]
+                    counts[i] += 1
+    matches: List[Dict[str, Any]] = []
+    for c, count, first in zip(compiled, counts, firsts):
         if count:
+            r = c.rule
             matches.append({
-                "rule": str(title),
+                "rule": c.title,
                 "count": count,
                 "sample": first or {},
                 "severity": r.get("severity"),
@@ -175,10 +175,19 @@ class PCSuiteGUI(tk.Tk):
 
         def task():
             try:
-                targets = fs.enumerate_targets(cats, scope=scope)
-                total = sum(t.size for t in targets)
-                report = fs.write_audit_report(targets, action="preview")
-                self._append(f"Targets: {len(targets)}, Total bytes: {total:,}")
+                totals = fs.TargetTotals()
+
+                def stream():
+                    # Report progress while the scan runs instead of after it
+                    for t in totals.track(fs.iter_targets(cats, scope=scope)):
+                        if totals.count % 5000 == 0:
+                            self._append(f"... {totals.count:,} files, {totals.bytes:,} bytes so far")
+                        yield t
+
+                report = fs.write_audit_report(stream(), action="preview")
+                for cat, agg in totals.by_category.items():
+                    self._append(f"  {cat}: {agg['count']:,} files, {agg['bytes']:,} bytes")
+                self._append(f"Targets: {totals.count}, Total bytes: {totals.bytes:,}")
                 self._append(f"Audit report: {report}")
             except Exception as e:
                 messagebox.showerror("Preview failed", str(e))
@@ -579,6 +588,8 @@ class PCSuiteGUI(tk.Tk):
         except Exception:
             interval = 2.0
         rules = _rules.load_rules(path)
+        for e in rules.errors:
+            self._append_edr(f"Skipped rule {e.get('path') or e.get('rule')}: {e.get('error')}")
         self._append_edr(f"Loaded {len(rules)} rule(s) from {path}")
         self._watch_stop = _t.Event()
         self._watch_last = {"security": 0, "powershell": 0}
@@ -858,7 +869,16 @@ class PCSuiteGUI(tk.Tk):
 
     def on_purge(self, dry: bool) -> None:
         if not dry:
-            if not messagebox.askyesno("Confirm Purge", "Permanently delete quarantined files from latest run? This cannot be undone."):
+            # Run size from its manifest; no directory walk on the UI thread
+            detail = ""
+            try:
+                catalog = fs.quarantine_catalog()
+                if catalog:
+                    latest = catalog[-1]
+                    detail = f" ({latest['files']:,} files, {latest['bytes']:,} bytes)"
+            except Exception:
+                pass
+            if not messagebox.askyesno("Confirm Purge", f"Permanently delete quarantined files from latest run{detail}? This cannot be undone."):
                 return
         self._append(f"Purging quarantine (dry_run={dry}) ...")
 
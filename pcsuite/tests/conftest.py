@@ -0,0 +1,25 @@
+import sys
+
+import pytest
+
+from pcsuite.core import fs, shell
+
+
+@pytest.fixture(autouse=True)
+def _fresh_query_cache():
+    # Tests patch shell.cmdline/pwsh with different outputs; never reuse another test's result
+    shell.invalidate()
+    yield
+    shell.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def _sandbox_reports(monkeypatch, tmp_path):
+    # REPORTS_DIR is bound to the CWD at import; keep reports, journals, the
+    # scan index and the signature cache out of the checkout
+    reports = tmp_path / "reports"
+    monkeypatch.setattr(fs, "REPORTS_DIR", reports)
+    monkeypatch.setattr(fs, "QUARANTINE_DIR", reports / "quarantine")
+    registry = sys.modules.get("pcsuite.core.registry")  # imports winreg; only patch once loaded
+    if registry is not None:
+        monkeypatch.setattr(registry, "REPORTS_DIR", reports)
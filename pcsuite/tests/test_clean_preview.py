@@ -1 +1,121 @@
-# Test: clean preview (stub)
+import json
+import os
+from pathlib import Path
+
+import yaml
+from typer.testing import CliRunner
+
+
+def _records(path):
+    return [json.loads(line) for line in Path(path).read_text(encoding="utf-8").splitlines()]
+
+
+def _sandbox_signatures(monkeypatch, tmp_path):
+    """Point fs at a signatures file with absolute globs under tmp_path."""
+    from pcsuite.core import fs
+
+    temp = tmp_path / "Temp"
+    dumps = tmp_path / "CrashDumps"
+    temp.mkdir()
+    dumps.mkdir()
+    for i in range(5):
+        (temp / f"t{i}.tmp").write_bytes(b"x" * (i + 1))
+    (dumps / "a.dmp").write_bytes(b"d" * 10)
+    sigs = {
+        "categories": {
+            "temp": {"globs": [str(temp) + "/*"]},
+            "dumps": {"globs": [str(dumps) + "/*.dmp"]},
+        }
+    }
+    sig_path = tmp_path / "signatures.yml"
+    sig_path.write_text(yaml.safe_dump(sigs), encoding="utf-8")
+    monkeypatch.setattr(fs, "SIGNATURES_PATH", sig_path)
+    monkeypatch.setattr(fs, "REPORTS_DIR", tmp_path / "reports")
+    monkeypatch.setattr(fs, "QUARANTINE_DIR", tmp_path / "reports" / "quarantine")
+    return fs
+
+
+def test_iter_targets_streams_with_totals(monkeypatch, tmp_path):
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+
+    stream = fs.iter_targets(["temp", "dumps"], scope="all")
+    first = next(stream)
+    assert first.category == "temp"
+    totals = fs.TargetTotals()
+    rest = list(totals.track(stream))
+    totals.add(first)
+    assert totals.count == 6 == len(rest) + 1
+    assert totals.by_category["temp"] == {"count": 5, "bytes": 15}
+    assert totals.by_category["dumps"] == {"count": 1, "bytes": 10}
+    assert fs.enumerate_targets(["temp", "dumps"], scope="all") == [first] + rest
+
+
+def test_scan_index_is_opt_in_and_cleanup_sizes_are_fresh(monkeypatch, tmp_path):
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    index_db = fs.REPORTS_DIR / fs.SCAN_INDEX_NAME
+
+    dump = next(tmp_path.rglob("*.dmp"))
+    old = os.stat(dump.parent).st_mtime - 60  # outside the index's racy window
+    os.utime(dump.parent, (old, old))
+    fs.enumerate_targets(["temp", "dumps"], scope="all")
+    assert not index_db.exists()
+    fs.enumerate_targets(["dumps"], scope="all", use_index=True)
+    assert index_db.exists()
+
+    # Rewritten in place: the directory mtime does not move, so the index keeps the old size
+    dump.write_bytes(b"d" * 99)
+    os.utime(dump.parent, (old, old))
+    assert [t.size for t in fs.enumerate_targets(["dumps"], scope="all", use_index=True)] == [10]
+    res = fs.execute_cleanup(["dumps"], scope="all")
+    assert [r["size"] for r in _records(res["rollback_file"])] == [99]
+
+
+def test_write_audit_report_writes_one_line_per_target(monkeypatch, tmp_path):
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+
+    targets = fs.enumerate_targets(["temp", "dumps"], scope="all")
+    report = fs.write_audit_report(iter(targets), action="preview")
+    assert report.endswith(".jsonl")
+    lines = Path(report).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [t.__dict__ for t in targets]
+    empty = fs.write_audit_report(iter([]), action="preview_empty")
+    assert Path(empty).read_text(encoding="utf-8") == ""
+
+
+def test_cli_preview_prints_category_totals(monkeypatch, tmp_path):
+    _sandbox_signatures(monkeypatch, tmp_path)
+    from pcsuite.cli.clean import app
+
+    res = CliRunner().invoke(app, ["preview", "--category", "temp,dumps", "--scope", "all"])
+    assert res.exit_code == 0
+    assert "Totals by Category" in res.output
+    assert "Audit report written" in res.output
+
+
+def test_execute_cleanup_consumes_stream(monkeypatch, tmp_path):
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+
+    res = fs.execute_cleanup(["temp"], scope="all", targets=fs.iter_targets(["temp"], scope="all"))
+    assert res["moved"] == 5
+    assert not list((tmp_path / "Temp").iterdir())
+    # Nothing left to clean: no run directory or reports are created
+    again = fs.execute_cleanup(["temp"], scope="all")
+    assert again["cleanup_report"] is None
+    assert len(list((tmp_path / "reports" / "quarantine").iterdir())) == 1
+
+
+def test_execute_cleanup_parallel_keeps_input_order(monkeypatch, tmp_path):
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+
+    targets = fs.enumerate_targets(["temp", "dumps"], scope="all")
+    # A vanished file fails on its own without stopping the others
+    missing = fs.Target(path=str(tmp_path / "Temp" / "gone.tmp"), size=1, category="temp")
+    stream = iter(targets[:2] + [missing] + targets[2:])
+    res = fs.execute_cleanup(["temp", "dumps"], scope="all", targets=stream, io_workers=4)
+    assert (res["moved"], res["failed"]) == (6, 1)
+    report = _records(res["cleanup_report"])
+    assert [r["src"] for r in report] == [t.path for t in targets[:2]] + [missing.path] + [t.path for t in targets[2:]]
+    assert all(r["elapsed_ms"] >= 0 for r in report if r["ok"])
+    rollback = _records(res["rollback_file"])
+    assert [e["src"] for e in rollback] == [t.path for t in targets]
+    assert all(Path(e["dst"]).is_file() for e in rollback)
@@ -0,0 +1,38 @@
+"""CLI startup budget, measured with `python -X importtime` in a fresh interpreter."""
+import os
+import subprocess
+import sys
+
+# Heavy or platform-specific modules that `pcsuite clean ...` must not load
+FORBIDDEN = ("psutil", "winreg", "ctypes", "yaml", "urllib.request", "pcsuite.security", "pcsuite.optimize")
+# Self time of pcsuite's own modules, in ms (override for slow runners)
+BUDGET_MS = float(os.environ.get("PCSUITE_IMPORT_BUDGET_MS", "150"))
+
+
+def _importtime(code: str) -> dict[str, tuple[int, int]]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env, timeout=60
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    mods = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        mods[name.strip()] = (int(self_us), int(cum_us))
+    return mods
+
+
+def test_main_imports_no_subapps():
+    mods = _importtime("import pcsuite.cli.main")
+    assert [m for m in mods if m.startswith("pcsuite.cli.")] == ["pcsuite.cli.main"]
+    assert not [m for m in mods if m.split(".")[0] in ("psutil", "winreg", "ctypes", "yaml")]
+
+
+def test_clean_command_import_budget():
+    mods = _importtime("import pcsuite.cli.main, pcsuite.cli.clean")
+    loaded = [m for m in mods if any(m == f or m.startswith(f + ".") for f in FORBIDDEN)]
+    assert loaded == []
+    own_ms = sum(s for name, (s, _) in mods.items() if name.startswith("pcsuite")) / 1000
+    assert own_ms < BUDGET_MS, f"pcsuite modules took {own_ms:.1f} ms to import (budget {BUDGET_MS} ms)"
@@ -36,6 +36,10 @@ def test_edr_detect_cli_with_mocked_events(monkeypatch, tmp_path):
     assert "Suspicious Keyword" in res.output
     assert "Regex Test" in res.output
 
+    res = runner.invoke(app, ["edr", "detect", "--rules", str(rules_dir), "--stats"])
+    assert res.exit_code == 0
+    assert "Rule Index" in res.output and "Avg candidates / event" in res.output
+
 
 @pytest.mark.skipif(os.name != "nt", reason="Windows-only file ops variability")
 def test_edr_quarantine_file_dry_run(monkeypatch, tmp_path):
@@ -48,3 +52,18 @@ def test_edr_quarantine_file_dry_run(monkeypatch, tmp_path):
     res = runner.invoke(app, ["edr", "quarantine-file", str(f), "--dry-run"])
     assert res.exit_code == 0
     assert "Dry-run" in res.output
+
+
+def test_agent_logs_skipped_rules(monkeypatch, tmp_path):
+    rules_dir = tmp_path / "rules"
+    rules_dir.mkdir()
+    (rules_dir / "ok.yml").write_text(yaml.safe_dump({"title": "ok", "detection": {"contains": {"Message": ["x"]}}}), encoding="utf-8")
+    (rules_dir / "bad.yml").write_text(yaml.safe_dump({"title": "bad", "detection": {"regex": {"Message": ["(x"]}}}), encoding="utf-8")
+    monkeypatch.setenv("ProgramData", str(tmp_path / "pd"))
+
+    from pcsuite.agent.runner import Agent
+
+    agent = Agent(rules_path=str(rules_dir))
+    assert len(agent._rules) == 1
+    log = (tmp_path / "pd" / "PCSuite" / "agent" / "agent.log").read_text(encoding="utf-8")
+    assert "skipped rule" in log and "bad.yml" in log and "invalid regex" in log
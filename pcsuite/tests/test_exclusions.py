@@ -0,0 +1,68 @@
+import os
+import random
+from pathlib import Path
+
+from pcsuite.core import fs, scan
+
+
+PATTERNS = [
+    "**/Windows/WinSxS/**",
+    "**/Windows/System32/**",
+    "**/Mozilla/Firefox/Profiles/**/places.sqlite*",
+    "**/User Data/**/History*",
+    "*.[dD][mM]?",
+    "cache2/entries/*",
+    "/opt/keep/*",
+    "C:/Windows/*",
+    "**",
+]
+
+SEGMENTS = [
+    "Windows", "windows", "WinSxS", "System32", "system32", "drivers", "Temp",
+    "Mozilla", "Firefox", "Profiles", "abc.default", "places.sqlite", "places.sqlite-wal",
+    "User Data", "Default", "History", "History-journal", "Cache", "cache2", "entries",
+    "app.dmp", "x.DMP", "data.bin", ".", "..", "opt", "keep",
+]
+
+
+def _synthetic_paths(n, seed=1234):
+    rnd = random.Random(seed)
+    anchors = ["/", "/home/u/", "//srv/", "rel/", "C:/", "C:\\Users\\u\\", "", "/opt/"]
+    out = []
+    for _ in range(n):
+        depth = rnd.randint(1, 7)
+        parts = [rnd.choice(SEGMENTS) for _ in range(depth)]
+        sep = "/" if rnd.random() < 0.8 else "\\"
+        path = rnd.choice(anchors) + sep.join(parts)
+        if rnd.random() < 0.05:
+            path += "/"
+        if rnd.random() < 0.05:
+            path = path.replace("/", "//", 1)
+        out.append(path)
+    return out
+
+
+def test_exclusion_matcher_parity_on_100k_paths():
+    # Same check as fs._is_excluded, with one Path per candidate to keep it quick
+    matcher = scan.ExclusionMatcher(PATTERNS[:-1])
+    for path in _synthetic_paths(100_000):
+        p = Path(path)
+        expected = any(p.match(ex) for ex in PATTERNS[:-1])
+        assert matcher.matches(path) == expected, path
+
+
+def test_exclusion_matcher_parity_per_pattern():
+    paths = _synthetic_paths(5_000, seed=99)
+    for pat in PATTERNS:
+        matcher = scan.ExclusionMatcher([pat])
+        for path in paths:
+            assert matcher.matches(path) == fs._is_excluded(path, [pat]), (pat, path)
+
+
+def test_exclusion_matcher_shipped_patterns():
+    data = fs._load_yaml(fs.EXCLUSIONS_PATH)
+    matcher = scan.ExclusionMatcher(data.get("paths", []))
+    root = "C:\\" if os.name == "nt" else "/"
+    assert matcher.matches(os.path.join(root, "Windows", "System32", "kernel32.dll"))
+    assert not matcher.matches(os.path.join(root, "Users", "u", "AppData", "Local", "Temp", "a.tmp"))
+    assert not scan.ExclusionMatcher([])
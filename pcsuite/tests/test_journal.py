@@ -0,0 +1,93 @@
+from pathlib import Path
+
+import pytest
+
+from pcsuite.core import journal, quarantine
+
+from .test_clean_preview import _records, _sandbox_signatures
+
+
+def _crash_on_move(monkeypatch, after):
+    """Make the (after+1)-th quarantine move kill the run like Ctrl+C would."""
+    real = quarantine.QuarantineRun.move_in
+    calls = {"n": 0}
+
+    def move_in(self, src, name, size=0):
+        calls["n"] += 1
+        if calls["n"] > after:
+            raise KeyboardInterrupt
+        return real(self, src, name, size)
+
+    monkeypatch.setattr(quarantine.QuarantineRun, "move_in", move_in)
+    return real
+
+
+def _interrupted_run(monkeypatch, tmp_path):
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    real = _crash_on_move(monkeypatch, after=2)
+    with pytest.raises(KeyboardInterrupt):
+        fs.execute_cleanup(["temp"], scope="all")
+    monkeypatch.setattr(quarantine.QuarantineRun, "move_in", real)
+    return fs
+
+
+def test_interrupted_run_leaves_journal_with_moves(monkeypatch, tmp_path):
+    fs = _interrupted_run(monkeypatch, tmp_path)
+
+    pending = fs.find_unfinished_journal()
+    assert pending
+    state = journal.replay(pending)
+    assert len(state.entries) == 5
+    moved = state.moved()
+    assert len(moved) == 2 and all(Path(e["dst"]).is_file() for e in moved)
+    assert len(list((tmp_path / "Temp").iterdir())) == 3
+
+
+def test_rollback_of_interrupted_run_uses_journal(monkeypatch, tmp_path):
+    fs = _interrupted_run(monkeypatch, tmp_path)
+
+    assert fs.find_latest_rollback() == fs.find_unfinished_journal()
+    res = fs.execute_rollback(None)
+    assert (res["restored"], res["failed"]) == (2, 0)
+    assert len(list((tmp_path / "Temp").iterdir())) == 5
+    assert fs.find_unfinished_journal() == ""
+
+
+def test_resume_finishes_run_in_same_quarantine_dir(monkeypatch, tmp_path):
+    fs = _interrupted_run(monkeypatch, tmp_path)
+    pending = fs.find_unfinished_journal()
+
+    res = fs.execute_cleanup(["temp"], scope="all", resume=pending)
+    assert res["resumed"] and res["moved"] == 3
+    assert not list((tmp_path / "Temp").iterdir())
+    assert len(list((tmp_path / "reports" / "quarantine").iterdir())) == 1
+    rollback = _records(res["rollback_file"])
+    assert len(rollback) == 5 and len({e["dst"] for e in rollback}) == 5
+    assert fs.find_unfinished_journal() == ""
+
+    back = fs.execute_rollback(res["rollback_file"])
+    assert back["restored"] == 5
+
+
+def test_resume_with_nothing_left_writes_manifest(monkeypatch, tmp_path):
+    fs = _interrupted_run(monkeypatch, tmp_path)
+    pending = fs.find_unfinished_journal()
+    for f in (tmp_path / "Temp").iterdir():
+        f.unlink()
+
+    res = fs.execute_cleanup(["temp"], scope="all", resume=pending)
+    assert res["resumed"] and res["moved"] == 0
+    rollback = _records(res["rollback_file"])
+    [run] = fs.list_quarantine_runs()
+    manifest = quarantine.read_manifest(run)
+    assert manifest["files"] == len(rollback) == 2
+    assert manifest["bytes"] == sum(e["size"] for e in rollback)
+
+
+def test_finished_run_removes_journal(monkeypatch, tmp_path):
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+
+    res = fs.execute_cleanup(["temp"], scope="all", io_workers=3)
+    assert res["moved"] == 5
+    assert fs.find_unfinished_journal() == ""
+    assert fs.find_latest_rollback() == res["rollback_file"]
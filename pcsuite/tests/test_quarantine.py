@@ -0,0 +1,405 @@
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from pcsuite.core import quarantine
+
+from .test_clean_preview import _records
+
+
+def _other_volume(tmp_path):
+    # A writable directory on a different device than tmp_path, if the host has one
+    for cand in ("/dev/shm", tempfile.gettempdir()):
+        try:
+            if os.path.isdir(cand) and os.stat(cand).st_dev != os.stat(tmp_path).st_dev:
+                return Path(tempfile.mkdtemp(dir=cand))
+        except OSError:
+            continue
+    pytest.skip("no second volume available")
+
+
+def test_same_volume_moves_are_renames(tmp_path):
+    src = tmp_path / "a.dmp"
+    src.write_bytes(b"x" * 8)
+    qrun = quarantine.QuarantineRun(tmp_path / "reports" / "quarantine" / "run1")
+    dst, method = qrun.move_in(str(src), "000001_a.dmp", 8)
+    assert method == "rename"
+    assert Path(dst).parent == qrun.run_dir
+    assert qrun.summary()["renamed_bytes"] == 8 and qrun.copied_bytes == 0
+    qrun.finish()
+    assert not (qrun.run_dir / quarantine.VOLUMES_FILE).exists()
+
+
+def test_other_volume_gets_its_own_run_dir(monkeypatch, tmp_path):
+    other = _other_volume(tmp_path)
+    try:
+        monkeypatch.setattr(quarantine, "_mount_point", lambda p: str(other))
+        src = other / "big.dmp"
+        src.write_bytes(b"d" * 32)
+        run_dir = tmp_path / "quarantine" / "run1"
+        qrun = quarantine.QuarantineRun(run_dir)
+        dst, method = qrun.move_in(str(src), "000001_big.dmp", 32)
+        assert method == "rename"
+        assert Path(dst).parent == other / quarantine.VOLUME_DIR_NAME / "run1"
+        assert (qrun.renamed_bytes, qrun.copied_bytes) == (32, 0)
+        qrun.finish()
+        listed = json.loads((run_dir / quarantine.VOLUMES_FILE).read_text(encoding="utf-8"))
+        assert listed == [str(Path(dst).parent)]
+        assert quarantine.run_dirs(run_dir) == [run_dir, Path(dst).parent]
+    finally:
+        shutil.rmtree(other, ignore_errors=True)
+
+
+def test_unwritable_volume_falls_back_to_copy(monkeypatch, tmp_path):
+    other = _other_volume(tmp_path)
+    try:
+        blocker = other / "not_a_dir"
+        blocker.write_text("", encoding="utf-8")
+        monkeypatch.setattr(quarantine, "_mount_point", lambda p: str(blocker))
+        src = other / "big.dmp"
+        src.write_bytes(b"d" * 32)
+        qrun = quarantine.QuarantineRun(tmp_path / "run1")
+        dst, method = qrun.move_in(str(src), "000001_big.dmp", 32)
+        assert method == "copy"
+        assert Path(dst).parent == qrun.run_dir and Path(dst).read_bytes() == b"d" * 32
+        assert not src.exists()
+        assert (qrun.renamed_bytes, qrun.copied_bytes) == (0, 32)
+    finally:
+        shutil.rmtree(other, ignore_errors=True)
+
+
+def test_cleanup_and_purge_cover_volume_dirs(monkeypatch, tmp_path):
+    import yaml
+    from pcsuite.core import fs
+
+    other = _other_volume(tmp_path)
+    try:
+        monkeypatch.setattr(quarantine, "_mount_point", lambda p: str(other))
+        dumps = other / "CrashDumps"
+        dumps.mkdir()
+        (dumps / "a.dmp").write_bytes(b"a" * 10)
+        sig_path = tmp_path / "signatures.yml"
+        sig_path.write_text(yaml.safe_dump({"categories": {"dumps": {"globs": [str(dumps) + "/*.dmp"]}}}), encoding="utf-8")
+        monkeypatch.setattr(fs, "SIGNATURES_PATH", sig_path)
+        monkeypatch.setattr(fs, "REPORTS_DIR", tmp_path / "reports")
+        monkeypatch.setattr(fs, "QUARANTINE_DIR", tmp_path / "reports" / "quarantine")
+
+        res = fs.execute_cleanup(["dumps"], scope="all")
+        assert res["moved"] == 1
+        assert (res["renamed_bytes"], res["copied_bytes"]) == (10, 0)
+        report = _records(res["cleanup_report"])
+        assert report[0]["method"] == "rename"
+        rollback = _records(res["rollback_file"])
+        assert Path(rollback[0]["dst"]).is_relative_to(other / quarantine.VOLUME_DIR_NAME)
+
+        purged = fs.purge_quarantine(run="latest")
+        assert purged["deleted_runs"] == 1 and purged["freed_bytes"] == 10
+        assert not Path(rollback[0]["dst"]).exists()
+    finally:
+        shutil.rmtree(other, ignore_errors=True)
+
+
+def test_run_manifest_drives_catalog_and_purge(monkeypatch, tmp_path):
+    from .test_clean_preview import _sandbox_signatures
+
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    res = fs.execute_cleanup(["temp", "dumps"], scope="all")
+    run_dir = tmp_path / "reports" / "quarantine" / Path(res["rollback_file"]).stem.split("_", 1)[1]
+    manifest = quarantine.read_manifest(run_dir)
+    assert (manifest["files"], manifest["bytes"]) == (6, 25) and manifest["created"]
+
+    # Listing and purge sizing read the manifest, not the directory
+    with monkeypatch.context() as m:
+        m.setattr(quarantine, "_walk_run", lambda d: pytest.fail("walked a run with a manifest"))
+        [entry] = fs.quarantine_catalog()
+        assert (entry["files"], entry["bytes"]) == (6, 25)
+        assert fs.purge_quarantine(run="latest", dry_run=True)["freed_bytes"] == 25
+
+    # Restoring files keeps the manifest current
+    fs.execute_rollback(res["rollback_file"])
+    assert quarantine.read_manifest(run_dir)["files"] == 0
+
+
+def test_verify_repairs_stale_manifest(monkeypatch, tmp_path):
+    from .test_clean_preview import _sandbox_signatures
+
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    fs.execute_cleanup(["temp"], scope="all")
+    [entry] = fs.quarantine_catalog()
+    run_dir = Path(entry["run"])
+    next(p for p in run_dir.iterdir() if p.name.endswith(".tmp")).unlink()
+
+    assert fs.quarantine_catalog()[0]["files"] == 5  # stale until verified
+    [fixed] = fs.quarantine_catalog(verify=True)
+    assert fixed["repaired"] and fixed["files"] == 4
+    assert quarantine.read_manifest(run_dir)["files"] == 4
+    assert fs.quarantine_catalog(verify=True)[0]["repaired"] is False
+
+    # Runs from before manifests existed are walked once and get one
+    (run_dir / quarantine.MANIFEST_FILE).unlink()
+    assert fs.quarantine_catalog()[0]["files"] == 4
+    assert quarantine.read_manifest(run_dir) is not None
+
+
+def test_cli_runs_lists_catalog(monkeypatch, tmp_path):
+    from typer.testing import CliRunner
+
+    from pcsuite.cli.clean import app
+    from .test_clean_preview import _sandbox_signatures
+
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    fs.execute_cleanup(["dumps"], scope="all")
+    res = CliRunner().invoke(app, ["runs", "--verify"])
+    assert res.exit_code == 0
+    assert "Quarantine runs" in res.output and "Total bytes: 10" in res.output
+
+
+def test_dedupe_shares_blobs_and_rollback_unshares(monkeypatch, tmp_path):
+    from .test_clean_preview import _sandbox_signatures
+
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    for name in ("dup1.tmp", "dup2.tmp"):
+        (tmp_path / "Temp" / name).write_bytes(b"z" * 100)
+    res = fs.execute_cleanup(["temp"], scope="all", dedupe=True)
+    assert res["moved"] == 7
+    assert (res["deduped"], res["dedup_saved_bytes"]) == (1, 100)
+    assert res["dedup_ratio"] == round(215 / 115, 3)
+    rollback = {Path(r["src"]).name: r for r in _records(res["rollback_file"])}
+    assert rollback["dup1.tmp"]["blob"] == rollback["dup2.tmp"]["blob"]
+    assert os.stat(rollback["dup1.tmp"]["dst"]).st_ino == os.stat(rollback["dup2.tmp"]["dst"]).st_ino
+    run_dir = Path(rollback["dup1.tmp"]["dst"]).parent
+    assert quarantine.read_manifest(run_dir)["dedup_saved_bytes"] == 100
+    assert [Path(r).name for r in fs.list_quarantine_runs()] == [run_dir.name]
+
+    # Restored files are independent again, even when only the blob survived
+    os.remove(rollback["dup2.tmp"]["dst"])
+    out = fs.execute_rollback(res["rollback_file"])
+    assert out["restored"] == 7 and out["failed"] == 0
+    dup1, dup2 = tmp_path / "Temp" / "dup1.tmp", tmp_path / "Temp" / "dup2.tmp"
+    assert dup1.read_bytes() == dup2.read_bytes() == b"z" * 100
+    assert os.stat(dup1).st_nlink == 1 and os.stat(dup2).st_nlink == 1
+
+
+def test_dedupe_skips_files_hardlinked_outside_the_run(monkeypatch, tmp_path):
+    from .test_clean_preview import _sandbox_signatures
+
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    live = tmp_path / "live.bin"
+    live.write_bytes(b"k" * 32)
+    src = tmp_path / "linked.bin"
+    os.link(live, src)
+    qrun = quarantine.QuarantineRun(fs.QUARANTINE_DIR / "20240101-000000", dedupe=True)
+    dst, _ = qrun.move_in(str(src), "000001_linked.bin", 32)
+    assert qrun.deduplicate(dst, 32) is None
+    assert not (fs.QUARANTINE_DIR / quarantine.STORE_DIR_NAME).exists()
+
+    # An identical plain file still gets its own blob, which the live file cannot reach
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"k" * 32)
+    dst2, _ = qrun.move_in(str(other), "000002_other.bin", 32)
+    blob = qrun.deduplicate(dst2, 32)
+    assert blob and os.stat(blob).st_ino != os.stat(live).st_ino
+    live.write_bytes(b"edited")
+    assert Path(blob).read_bytes() == b"k" * 32
+
+    # A blob whose content no longer matches its name is never linked to
+    Path(blob).write_bytes(b"tampered")
+    third = tmp_path / "third.bin"
+    third.write_bytes(b"k" * 32)
+    later = quarantine.QuarantineRun(fs.QUARANTINE_DIR / "20240102-000000", dedupe=True)
+    dst3, _ = later.move_in(str(third), "000001_third.bin", 32)
+    assert later.deduplicate(dst3, 32) is None
+    assert Path(dst3).read_bytes() == b"k" * 32 and os.stat(dst3).st_nlink == 1
+
+
+def test_purge_collects_blobs_after_last_run(monkeypatch, tmp_path):
+    from .test_clean_preview import _sandbox_signatures
+
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    blobs = set()
+    for run in ("20240101-000000", "20240102-000000"):
+        src = tmp_path / f"{run}.bin"
+        src.write_bytes(b"q" * 64)
+        qrun = quarantine.QuarantineRun(fs.QUARANTINE_DIR / run, dedupe=True)
+        dst, _ = qrun.move_in(str(src), "000001_same.bin", 64)
+        blobs.add(qrun.deduplicate(dst, 64))
+        qrun.finish()
+    [blob] = blobs
+    assert os.stat(blob).st_nlink == 3
+
+    first = fs.purge_quarantine(run="20240101-000000")
+    assert first["deleted_runs"] == 1 and first["gc_blobs"] == 0 and first["freed_bytes"] == 0
+    assert first["dedup_saved_bytes"] == 0 and Path(blob).exists()
+    last = fs.purge_quarantine(run="latest")
+    assert last["deleted_runs"] == 1 and last["gc_blobs"] == 1
+    assert last["freed_bytes"] == last["gc_bytes"] == 64
+    assert not Path(blob).exists()
+    assert fs.list_quarantine_runs() == []
+
+
+def test_compact_archives_run_and_rollback_extracts(monkeypatch, tmp_path):
+    from .test_clean_preview import _sandbox_signatures
+
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    (tmp_path / "Temp" / "big.tmp").write_bytes(b"a" * 100_000)
+    res = fs.execute_cleanup(["temp", "dumps"], scope="all")
+    [run] = fs.list_quarantine_runs()
+    assert fs.compact_quarantine(1)["target_runs"] == []  # not old enough
+
+    monkeypatch.setattr(fs, "_runs_older_than", lambda runs, days, now=None: runs)
+    out = fs.compact_quarantine(1)
+    assert out["compacted_runs"] == 1 and out["bytes"] == 100_025
+    assert 0 < out["archive_bytes"] < 100_025
+    assert out["reclaimed_bytes"] == 100_025 - out["archive_bytes"]
+    assert sorted(p.name for p in Path(run).iterdir()) == [quarantine.ARCHIVE_FILE, quarantine.MANIFEST_FILE]
+    [entry] = fs.quarantine_catalog()
+    assert (entry["files"], entry["bytes"]) == (7, 100_025)
+    assert fs.quarantine_catalog(verify=True)[0]["repaired"] is False
+    assert fs.compact_quarantine(1)["target_runs"] == []  # already compacted
+
+    # Rollback reads the archive once, including for a path now taken
+    (tmp_path / "CrashDumps" / "a.dmp").write_bytes(b"new")
+    restored = fs.execute_rollback(res["rollback_file"])
+    assert restored["restored"] == 7 and restored["failed"] == 0
+    assert (tmp_path / "Temp" / "big.tmp").read_bytes() == b"a" * 100_000
+    assert (tmp_path / "CrashDumps" / "a.dmp").read_bytes() == b"d" * 10
+    assert (tmp_path / "CrashDumps" / "a.dmp.pcsuite.bak").read_bytes() == b"new"
+    purged = fs.purge_quarantine(run="latest", dry_run=True)
+    assert purged["freed_bytes"] == out["archive_bytes"]
+
+
+def _old_runs(fs, tmp_path, sizes):
+    for day, size in enumerate(sizes, 1):
+        src = tmp_path / f"old{day}.bin"
+        src.write_bytes(b"o" * size)
+        qrun = quarantine.QuarantineRun(fs.QUARANTINE_DIR / f"202401{day:02d}-000000")
+        qrun.move_in(str(src), f"000001_old{day}.bin", size)
+        qrun.finish()
+
+
+def test_retention_evicts_oldest_runs_from_manifests(monkeypatch, tmp_path):
+    from .test_clean_preview import _sandbox_signatures
+
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    _old_runs(fs, tmp_path, [100, 200, 300])
+    monkeypatch.setattr(quarantine, "_walk_run", lambda d: pytest.fail("walked a run with a manifest"))
+
+    assert fs.apply_retention({})["evicted_runs"] == []
+    plan = fs.apply_retention({"max_runs": 2, "max_total_bytes": 350}, dry_run=True)
+    assert [Path(r).name for r in plan["evicted_runs"]] == ["20240101-000000", "20240102-000000"]
+    assert plan["freed_bytes"] == 300 and len(fs.list_quarantine_runs()) == 3
+
+    res = fs.apply_retention({"max_total_bytes": 450}, keep=["20240101-000000"])
+    assert [Path(r).name for r in res["evicted_runs"]] == ["20240102-000000"]
+    assert (res["remaining_runs"], res["remaining_bytes"]) == (2, 400)
+    assert Path(res["retention_report"]).exists()
+
+    usage = shutil.disk_usage(tmp_path)
+    monkeypatch.setattr(fs.shutil, "disk_usage", lambda p: usage._replace(total=1000, free=50))
+    res = fs.apply_retention({"min_free_percent": 10})
+    assert [Path(r).name for r in res["evicted_runs"]] == ["20240101-000000"]
+    assert fs.apply_retention({"min_free_percent": 50})["remaining_runs"] == 0
+
+
+def test_retention_free_space_counts_only_the_home_volume(monkeypatch, tmp_path):
+    from .test_clean_preview import _sandbox_signatures
+
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    # Run 1 keeps 100 bytes at home and 900 on another volume; run 2 is all home
+    run1 = quarantine.QuarantineRun(fs.QUARANTINE_DIR / "20240101-000000")
+    other = tmp_path / "vol2" / quarantine.VOLUME_DIR_NAME / "20240101-000000"
+    other.mkdir(parents=True)
+    run1._dirs[-1] = other
+    run1._by_parent[str(tmp_path / "vol2")] = str(other)
+    for name, size, parent in (("home.bin", 100, tmp_path), ("away.bin", 900, tmp_path / "vol2")):
+        (parent / name).write_bytes(b"v" * size)
+        run1.move_in(str(parent / name), f"000001_{name}", size)
+    run1.finish()
+    run2 = quarantine.QuarantineRun(fs.QUARANTINE_DIR / "20240102-000000")
+    (tmp_path / "near.bin").write_bytes(b"n" * 300)
+    run2.move_in(str(tmp_path / "near.bin"), "000001_near.bin", 300)
+    run2.finish()
+    [info] = [i for i in fs.quarantine_catalog() if i["run"].endswith("20240101-000000")]
+    assert (info["bytes"], info["home_bytes"]) == (1000, 100)
+    assert quarantine.verify_run(fs.QUARANTINE_DIR / "20240101-000000")["home_bytes"] == 100
+
+    usage = shutil.disk_usage(tmp_path)
+    monkeypatch.setattr(fs.shutil, "disk_usage", lambda p: usage._replace(total=1000, free=50))
+    res = fs.apply_retention({"min_free_percent": 20}, dry_run=True)
+    # Evicting run 1 frees only 100 bytes here, not 1000, so run 2 has to go as well
+    assert [Path(r).name for r in res["evicted_runs"]] == ["20240101-000000", "20240102-000000"]
+
+
+def test_cleanup_applies_retention_policy(monkeypatch, tmp_path):
+    import yaml
+
+    from .test_clean_preview import _sandbox_signatures
+
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    _old_runs(fs, tmp_path, [100, 200])
+    policy = tmp_path / "retention.yml"
+    policy.write_text(yaml.safe_dump({"max_runs": 1, "max_total_bytes": None, "min_free_percent": "x"}), encoding="utf-8")
+    monkeypatch.setattr(fs, "RETENTION_PATH", policy)
+    assert fs.load_retention_policy() == {"max_runs": 1}
+
+    assert fs.execute_cleanup(["temp"], scope="all", retention={})["retention"]["evicted_runs"] == []
+    res = fs.execute_cleanup(["dumps"], scope="all")
+    # The old runs go (and the first cleanup's, unless both landed in the same
+    # second); the run just written is always kept
+    assert len(res["retention"]["evicted_runs"]) >= 2
+    [run] = fs.list_quarantine_runs()
+    assert Path(res["rollback_file"]).stem.endswith(Path(run).name)
+
+
+def test_rollback_without_dedupe_keeps_user_hardlinks(monkeypatch, tmp_path):
+    from .test_clean_preview import _sandbox_signatures
+
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_bytes(b"shared")
+    os.link(a, b)
+    res = fs.quarantine_paths([str(a)])
+    assert res["moved"] == 1 and not a.exists()
+    out = fs.execute_rollback(res["rollback_file"])
+    assert out["restored"] == 1
+    assert os.stat(a).st_ino == os.stat(b).st_ino and os.stat(a).st_nlink == 2
+
+
+def test_dedupe_rollback_restores_each_files_mtime_and_mode(monkeypatch, tmp_path):
+    from .test_clean_preview import _sandbox_signatures
+
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    first, second = tmp_path / "Temp" / "dup1.tmp", tmp_path / "Temp" / "dup2.tmp"
+    for f, mtime, mode in ((first, 1_000_000_000, 0o644), (second, 1_500_000_000, 0o600)):
+        f.write_bytes(b"z" * 100)
+        os.chmod(f, mode)
+        os.utime(f, (mtime, mtime))
+    res = fs.execute_cleanup(["temp"], scope="all", dedupe=True)
+    rollback = {Path(r["src"]).name: r for r in _records(res["rollback_file"])}
+    assert rollback["dup2.tmp"]["mtime"] == 1_500_000_000 and rollback["dup2.tmp"]["mode"] == 0o600
+
+    # One file comes back by rename + unshare, the other from the blob alone
+    os.remove(rollback["dup1.tmp"]["dst"])
+    out = fs.execute_rollback(res["rollback_file"])
+    assert out["failed"] == 0
+    for f, mtime, mode in ((first, 1_000_000_000, 0o644), (second, 1_500_000_000, 0o600)):
+        st = os.stat(f)
+        assert int(st.st_mtime) == mtime and (st.st_mode & 0o777) == mode and st.st_nlink == 1
+
+
+def test_journal_keeps_dedupe_fields_for_rollback(tmp_path):
+    from pcsuite.core import journal
+
+    j = journal.CleanupJournal(tmp_path / "journal_x.jsonl")
+    j.intents([(1, "/a", "/q/a", 3), (2, "/b", "/q/b", 3)])
+    j.dones([(1, True, "/q/a", {"blob": "/s/h", "mtime": 5.0, "mode": 0o600}), (2, True, "/q/b")])
+    j.close()
+    entries = journal.rollback_entries(tmp_path / "journal_x.jsonl")
+    assert entries == [
+        {"src": "/a", "dst": "/q/a", "size": 3, "blob": "/s/h", "mtime": 5.0, "mode": 0o600},
+        {"src": "/b", "dst": "/q/b", "size": 3},
+    ]
@@ -0,0 +1,62 @@
+import sys
+
+import pytest
+
+from .test_clean_preview import _records, _sandbox_signatures
+
+
+@pytest.fixture
+def xdg_trash(monkeypatch, tmp_path):
+    """Point the freedesktop trash backend at a trash dir under tmp_path."""
+    if sys.platform in ("win32", "darwin"):
+        pytest.skip("freedesktop trash backend only")
+    plat_other = pytest.importorskip("send2trash.plat_other")
+    data_home = tmp_path / "xdg"
+    data_home.mkdir()
+    monkeypatch.setattr(plat_other, "XDG_DATA_HOME", bytes(data_home))
+    monkeypatch.setattr(plat_other, "HOMETRASH_B", bytes(data_home / "Trash"))
+    monkeypatch.setattr(plat_other, "HOMETRASH", str(data_home / "Trash"))
+    return data_home / "Trash"
+
+
+def _count_calls(monkeypatch, fail_batches=False):
+    import send2trash
+
+    calls = []
+    real = send2trash.send2trash
+
+    def counting(paths):
+        calls.append(paths)
+        if fail_batches and isinstance(paths, list):
+            raise OSError("batch refused")
+        return real(paths)
+
+    monkeypatch.setattr(send2trash, "send2trash", counting)
+    return calls
+
+
+def test_recycle_sends_one_batch(monkeypatch, tmp_path, xdg_trash):
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    calls = _count_calls(monkeypatch)
+
+    res = fs.execute_cleanup(["temp", "dumps"], scope="all", delete_mode="recycle")
+    assert (res["moved"], res["failed"]) == (6, 0)
+    assert len(calls) == 1 and len(calls[0]) == 6
+    assert sorted(p.name for p in (xdg_trash / "files").iterdir()) == ["a.dmp"] + [f"t{i}.tmp" for i in range(5)]
+    report = _records(res["cleanup_report"])
+    assert set(report[0]) == {"src", "dst", "size", "ok", "error", "mode", "method", "elapsed_ms"}
+    assert all(r["ok"] and r["dst"] is None and r["mode"] == "recycle" for r in report)
+
+
+def test_recycle_falls_back_per_file_on_batch_failure(monkeypatch, tmp_path, xdg_trash):
+    fs = _sandbox_signatures(monkeypatch, tmp_path)
+    calls = _count_calls(monkeypatch, fail_batches=True)
+
+    targets = fs.enumerate_targets(["temp"], scope="all")
+    gone = fs.Target(path=str(tmp_path / "Temp" / "gone.tmp"), size=1, category="temp")
+    res = fs.execute_cleanup(["temp"], scope="all", delete_mode="recycle", targets=[gone] + targets)
+    assert (res["moved"], res["failed"]) == (5, 1)
+    assert len(calls) == 1 + 5  # one refused batch, then one call per remaining file
+    report = _records(res["cleanup_report"])
+    assert report[0] == {"src": gone.path, "dst": None, "size": 1, "ok": False, "error": "not a file"}
+    assert [r["src"] for r in report[1:]] == [t.path for t in targets]
@@ -1 +1,113 @@
-# Test: rollback (stub)
+import json
+from pathlib import Path
+
+from pcsuite.core import audit
+
+
+def _sandbox(monkeypatch, tmp_path):
+    from pcsuite.core import fs
+
+    monkeypatch.setattr(fs, "REPORTS_DIR", tmp_path / "reports")
+    monkeypatch.setattr(fs, "QUARANTINE_DIR", tmp_path / "reports" / "quarantine")
+    (tmp_path / "reports" / "quarantine").mkdir(parents=True)
+    return fs
+
+
+def _quarantined(tmp_path, name):
+    q = tmp_path / "reports" / "quarantine" / f"000001_{name}"
+    q.write_text(name, encoding="utf-8")
+    return {"src": str(tmp_path / "orig" / name), "dst": str(q)}
+
+
+def test_rollback_reads_legacy_json(monkeypatch, tmp_path):
+    fs = _sandbox(monkeypatch, tmp_path)
+    entry = _quarantined(tmp_path, "old.tmp")
+    legacy = tmp_path / "reports" / "rollback_20240101-000000.json"
+    legacy.write_text(json.dumps([entry], indent=2), encoding="utf-8")
+
+    res = fs.execute_rollback(str(legacy))
+    assert (res["restored"], res["failed"]) == (1, 0)
+    assert Path(entry["src"]).read_text(encoding="utf-8") == "old.tmp"
+    assert [r["ok"] for r in audit.read_records(res["restore_report"])] == [True]
+
+
+def test_rollback_reads_partial_jsonl_and_picks_latest(monkeypatch, tmp_path):
+    fs = _sandbox(monkeypatch, tmp_path)
+    entry = _quarantined(tmp_path, "new.tmp")
+    (tmp_path / "reports" / "rollback_20240101-000000.json").write_text("[]", encoding="utf-8")
+    jsonl = tmp_path / "reports" / "rollback_20240102-000000.jsonl"
+    # A run that crashed mid-write leaves a torn last line
+    jsonl.write_text(json.dumps(entry) + "\n" + '{"src": "C:/x', encoding="utf-8")
+
+    assert fs.find_latest_rollback() == str(jsonl)
+    res = fs.execute_rollback(None)
+    assert (res["restored"], res["failed"]) == (1, 0)
+    assert Path(entry["src"]).exists()
+
+
+def test_jsonl_writer_flushes_periodically(tmp_path):
+    path = tmp_path / "r.jsonl"
+    w = audit.JsonlWriter(path, flush_every=2, flush_seconds=3600)
+    w.write({"i": 1})
+    w.write({"i": 2})
+    w.write({"i": 3})
+    # Two records flushed, the third still buffered until close
+    assert [r["i"] for r in audit.read_records(path)] == [1, 2]
+    w.close()
+    assert [r["i"] for r in audit.read_records(path)] == [1, 2, 3]
+    assert w.count == 3
+
+
+def test_plan_rollback_flags_conflicts_up_front(monkeypatch, tmp_path):
+    fs = _sandbox(monkeypatch, tmp_path)
+    plain = _quarantined(tmp_path, "a.tmp")
+    clash = _quarantined(tmp_path, "b.tmp")
+    Path(clash["src"]).parent.mkdir(parents=True, exist_ok=True)
+    Path(clash["src"]).write_text("newer", encoding="utf-8")
+    gone = {"src": str(tmp_path / "orig" / "c.tmp"), "dst": str(tmp_path / "nowhere"), "size": 7}
+    dup = dict(plain)
+
+    plan = fs.plan_rollback([plain, clash, gone, dup, {"src": None}])
+    assert [s["action"] for s in plan] == ["restore", "replace", "missing", "duplicate", "invalid"]
+    assert plan[0]["bytes"] == len("a.tmp") and plan[2]["bytes"] == 7
+    assert plan[1]["side"] == clash["src"] + ".pcsuite.bak"
+
+
+def test_parallel_rollback_restores_in_order_and_keeps_conflicting_file(monkeypatch, tmp_path):
+    fs = _sandbox(monkeypatch, tmp_path)
+    entries = []
+    for i in range(40):
+        q = tmp_path / "reports" / "quarantine" / f"{i:06d}_f{i}.tmp"
+        q.write_text(str(i), encoding="utf-8")
+        entries.append({"src": str(tmp_path / "orig" / f"d{i % 4}" / f"f{i}.tmp"), "dst": str(q)})
+    clash = Path(entries[5]["src"])
+    clash.parent.mkdir(parents=True)
+    clash.write_text("newer", encoding="utf-8")
+    mapping = tmp_path / "reports" / "rollback_20240103-000000.jsonl"
+    mapping.write_text("".join(json.dumps(e) + "\n" for e in entries), encoding="utf-8")
+
+    dry = fs.execute_rollback(str(mapping), dry_run=True, io_workers=4)
+    assert dry["actions"] == {"restore": 39, "replace": 1}
+    assert not Path(entries[0]["src"]).exists()
+
+    res = fs.execute_rollback(str(mapping), io_workers=4)
+    assert (res["restored"], res["failed"]) == (40, 0)
+    assert [r["src"] for r in audit.read_records(res["restore_report"])] == [e["src"] for e in entries]
+    assert all(Path(e["src"]).read_text(encoding="utf-8") == str(i) for i, e in enumerate(entries))
+    assert Path(str(clash) + ".pcsuite.bak").read_text(encoding="utf-8") == "newer"
+
+
+def test_cli_rollback_dry_run_lists_plan(monkeypatch, tmp_path):
+    from typer.testing import CliRunner
+
+    fs = _sandbox(monkeypatch, tmp_path)
+    entry = _quarantined(tmp_path, "plan.tmp")
+    mapping = tmp_path / "reports" / "rollback_20240104-000000.jsonl"
+    mapping.write_text(json.dumps(entry) + "\n", encoding="utf-8")
+    from pcsuite.cli.clean import app
+
+    res = CliRunner().invoke(app, ["rollback", "--file", str(mapping), "--dry-run"])
+    assert res.exit_code == 0
+    assert "restore" in res.output and "plan.tmp" in res.output
+    assert "Estimated bytes: 8" in res.output
+    assert not Path(entry["src"]).exists() and fs.find_latest_rollback() == str(mapping)
@@ -0,0 +1,144 @@
+import random
+
+import yaml
+
+from pcsuite.security import rules as secrules
+
+
+def _legacy_evaluate(events, rules):
+    """The original rule-major loop over `match_event`, as the reference."""
+    out = []
+    for r in rules:
+        hits = [e for e in events if secrules.match_event(e, r)]
+        if hits:
+            title = r.get("title") or r.get("id") or "rule.yml"
+            out.append((str(title), len(hits), hits[0]))
+    return out
+
+
+def _sample_rules():
+    words = ["mimikatz", "Cobalt", "-enc", "rubeus", "psexec", "4688", "Security"]
+    rng = random.Random(7)
+    rules = []
+    for i in range(60):
+        op = rng.choice(["contains", "equals", "startswith", "endswith", "regex"])
+        field = rng.choice(["Message", "Id", "ProviderName", "Missing"])
+        values = rng.sample(words, rng.randint(1, 3))
+        if op == "equals" and field == "Id":
+            values = [4688, "4624"]
+        if op == "regex":
+            values = [rf"(?i){values[0]}\w*"]
+        block = {op: {field: values}}
+        shape = i % 4
+        det = block if shape == 0 else {"any": [block, {"contains": {"Message": ["Rubeus"]}}]} if shape == 1 else {"all": [block, {"startswith": {"ProviderName": ["Microsoft"]}}]} if shape == 2 else {**block, "contains": {"Message": [values[0] if op != "regex" else "x"]}}
+        rules.append({"title": f"r{i}", "detection": det})
+    # Edge cases the compiled form must reproduce
+    rules += [
+        {"title": "empty values", "detection": {"contains": {"Message": []}}},
+        {"title": "no predicates", "detection": {}},
+        {"title": "list spec", "detection": {"contains": ["x"]}},
+        {"title": "string values", "detection": {"contains": {"Message": "zq"}}},
+        {"title": "empty all", "detection": {"all": []}},
+        {"id": "id-only", "detection": {"equals": {"Id": [None]}}},
+        {"title": "bad block", "detection": {"all": [{"contains": {"Message": ["a"]}}, "junk"]}},
+        {"title": "bad regex skipped", "detection": {"regex": {"Message": ["(", "(?i)cobalt"]}}},
+    ]
+    return rules
+
+
+def _events():
+    rng = random.Random(11)
+    msgs = ["User ran MIMIKATZ", "powershell -enc AAAA", "Normal logon", "cobalt strike beacon", "Rubeus asktgt", "", "q z"]
+    provs = ["Microsoft-Windows-Security-Auditing", "PowerShell", None]
+    return [{"Id": rng.choice([4624, 4688, "4688", None]), "ProviderName": rng.choice(provs), "Message": rng.choice(msgs)} for _ in range(300)]
+
+
+def test_compiled_rules_match_reference():
+    rules, events = _sample_rules(), _events()
+    compiled = secrules.evaluate_events(events, rules)
+    expected = _legacy_evaluate(events, rules)
+    assert [(m["rule"], m["count"], m["sample"]) for m in compiled] == expected
+    assert any(m["rule"] == "empty all" for m in compiled)
+
+
+def test_load_rules_rejects_invalid_regex(tmp_path):
+    (tmp_path / "ok.yml").write_text(yaml.safe_dump({"title": "ok", "detection": {"regex": {"Message": ["Mimi"]}}}), encoding="utf-8")
+    (tmp_path / "bad.yml").write_text(yaml.safe_dump({"title": "bad", "detection": {"regex": {"Message": ["(unclosed"]}}}), encoding="utf-8")
+    ruleset = secrules.load_rules(tmp_path)
+    assert [r["title"] for r in ruleset] == ["ok"]
+    assert len(ruleset.errors) == 1 and ruleset.errors[0]["path"].endswith("bad.yml")
+    assert "invalid regex" in ruleset.errors[0]["error"]
+    assert secrules.evaluate_events([{"Message": "Mimikatz"}], ruleset)[0]["count"] == 1
+
+
+def test_automaton_finds_overlapping_literals():
+    from pcsuite.security.ahocorasick import Automaton
+
+    rng = random.Random(3)
+    words = sorted({"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(30)})
+    ac = Automaton(words)
+    for _ in range(200):
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 30)))
+        assert {words[i] for i in ac.find(text)} == {w for w in words if w in text}
+
+
+def test_prefilter_skips_rules_without_literal_hits():
+    rules = secrules.compile_rules([
+        {"title": "kw", "detection": {"contains": {"Message": ["mimikatz"]}, "equals": {"Id": ["4688"]}}},
+        {"title": "either", "detection": {"any": [{"contains": {"Message": ["rubeus"]}}, {"contains": {"CommandLine": ["-enc"]}}]}},
+        {"title": "regex only", "detection": {"regex": {"Message": ["^Normal"]}}},
+    ])
+    kw, either, regex_only = rules.compiled
+    assert kw.guard == {("eq", "Id", "4688")}
+    assert either.guard == {("in", "Message", "rubeus"), ("in", "CommandLine", "-enc")}
+    assert regex_only.guard is None and rules.prefilter.unguarded == [2]
+    assert rules.prefilter.candidates({"Id": 4688, "Message": "Ran MimiKatz", "CommandLine": "x -ENC y"}) == {0, 1}
+    assert rules.prefilter.candidates({"Id": "4624", "Message": "Ran MimiKatz"}) == set()
+    assert rules.prefilter.candidates({"Message": "Normal logon"}) == set()
+    events = _events()
+    assert secrules.evaluate_events(events, rules) == secrules.evaluate_events(events, rules, prefilter=False)
+
+
+def test_prefilter_matches_reference():
+    rules, events = _sample_rules(), _events()
+    ruleset = secrules.compile_rules(rules, strict=False)
+    expected = _legacy_evaluate(events, rules)
+    for prefilter in (True, False):
+        for order in ("event", "rule"):
+            got = secrules.evaluate_events(events, ruleset, prefilter=prefilter, order=order)
+            assert [(m["rule"], m["count"], m["sample"]) for m in got] == expected
+
+
+def test_equals_index_and_stats():
+    rules = secrules.compile_rules([
+        {"title": "by id", "detection": {"equals": {"Id": [4624, 4625]}}},
+        {"title": "by provider", "detection": {"any": [{"equals": {"ProviderName": ["Sysmon"]}}, {"contains": {"Message": ["psexec"]}}]}},
+        {"title": "id and keyword", "detection": {"equals": {"Id": ["4688"]}, "contains": {"Message": ["-enc"]}}},
+        {"title": "fallback", "detection": {"startswith": {"Message": ["Normal"]}}},
+    ])
+    pf = rules.prefilter
+    assert pf.candidates({"Id": 4625, "ProviderName": "Sysmon"}) == {0, 1}
+    assert pf.candidates({"Id": "4688", "Message": "PsExec -enc"}) == {1, 2}
+    st = pf.stats()
+    assert st["equals_buckets"] == 4 and st["equals_fields"] == {"Id": 3, "ProviderName": 1}
+    assert st["fallback_rules"] == 1 and st["indexed_rules"] == 3
+    assert st["events"] == 2 and st["avg_candidates"] == 3.0
+    events = _events()
+    assert secrules.evaluate_events(events, rules) == secrules.evaluate_events(events, rules, prefilter=False)
+
+
+def test_event_view_converts_fields_once():
+    class Loud:
+        calls = 0
+
+        def __str__(self):
+            Loud.calls += 1
+            return "Mimikatz.EXE"
+
+    rules = secrules.compile_rules([
+        {"title": f"r{i}", "detection": {"contains": {"Image": ["mimikatz"]}, "endswith": {"Image": [".EXE"]}}} for i in range(5)
+    ])
+    events = [{"Image": Loud()}, {"Image": "calc.exe"}]
+    matches = secrules.evaluate_events(events, rules, order="event")
+    assert [m["count"] for m in matches] == [1] * 5 and matches[0]["sample"] is events[0]
+    assert Loud.calls == 1
@@ -0,0 +1,173 @@
+import glob
+import os
+import threading
+import time
+
+from pcsuite.core import scan
+
+
+def _glob_reference(patterns):
+    out = []
+    for i, pat in enumerate(patterns):
+        for p in glob.glob(pat, recursive=True):
+            if os.path.isfile(p):
+                out.append((i, p, os.path.getsize(p)))
+    return out
+
+
+def _make_tree(root):
+    (root / "Temp" / "sub").mkdir(parents=True)
+    (root / "Temp" / "a.tmp").write_text("a", encoding="utf-8")
+    (root / "Temp" / "b.log").write_text("bb", encoding="utf-8")
+    (root / "Temp" / ".hidden").write_text("h", encoding="utf-8")
+    (root / "Temp" / "sub" / "c.tmp").write_text("ccc", encoding="utf-8")
+    for prof in ("p1.default", "p2.work", ".p3"):
+        entries = root / "Profiles" / prof / "cache2" / "entries"
+        entries.mkdir(parents=True)
+        (entries / f"{prof}.bin").write_bytes(b"x" * 10)
+    (root / "CrashDumps").mkdir()
+    (root / "CrashDumps" / "app.dmp").write_bytes(b"d" * 7)
+    (root / "CrashDumps" / "app.mdmp").write_bytes(b"m" * 5)
+    (root / "MEMORY.DMP").write_bytes(b"z" * 3)
+
+
+def test_iter_files_matches_glob(tmp_path):
+    _make_tree(tmp_path)
+    base = str(tmp_path)
+    patterns = [
+        base + "/Temp/*",
+        base + "/Profiles/*/cache2/entries/*",
+        base + "/CrashDumps/*.dmp",
+        base + "/MEMORY.DMP",
+        base + "/CrashDumps/*.mdmp",
+        base + "/Temp/*",  # duplicate root: reported twice, like glob
+        base + "/Temp/.*",
+        base + "/Missing/*",
+        base + "/*/sub/*.tmp",
+        base + "/Temp/**",  # recursive segments fall back to glob
+    ]
+    assert list(scan.iter_files(patterns)) == _glob_reference(patterns)
+
+
+def test_iter_files_reports_entry_sizes(tmp_path):
+    _make_tree(tmp_path)
+    hits = {os.path.basename(p): size for _, p, size in scan.iter_files([str(tmp_path) + "/CrashDumps/*"])}
+    assert hits == {"app.dmp": 7, "app.mdmp": 5}
+
+
+def test_scope_filter_matches_resolve_and_saves_calls(tmp_path):
+    from pcsuite.core import fs
+
+    user = tmp_path / "user"
+    outside = tmp_path / "outside"
+    (user / "cache" / "deep").mkdir(parents=True)
+    outside.mkdir()
+    (outside / "secret.bin").write_text("s", encoding="utf-8")
+    files = []
+    for i in range(20):
+        f = user / "cache" / "deep" / f"f{i}.tmp"
+        f.write_text("x", encoding="utf-8")
+        files.append(str(f))
+    files.append(str(outside / "secret.bin"))
+    try:
+        os.symlink(outside, user / "link_dir", target_is_directory=True)
+        os.symlink(outside / "secret.bin", user / "cache" / "link_file")
+        files += [str(user / "link_dir" / "secret.bin"), str(user / "cache" / "link_file")]
+    except (OSError, NotImplementedError):
+        pass  # symlinks need privileges on some Windows hosts
+
+    roots = [fs._norm(user)]
+    sf = scan.ScopeFilter(roots)
+    for f in files:
+        assert sf.contains(f) == fs._is_under_any(f, roots), f
+    st = sf.stats()
+    assert st["checks"] == len(files)
+    assert st["resolves_saved"] > 0
+    assert st["resolve_calls"] < len(files)
+
+
+def test_iter_files_parallel_matches_sequential_and_dedupes(tmp_path):
+    _make_tree(tmp_path)
+    base = str(tmp_path)
+    patterns = [
+        base + "/Temp/*",
+        base + "/Profiles/*/cache2/entries/*",
+        base + "/./Temp/*",  # same directory through another spelling
+        base + "/CrashDumps/*.dmp",
+        base + "/Temp/sub/*",
+    ]
+    seq = list(scan.iter_files(patterns, dedupe=True))
+    par = list(scan.iter_files(patterns, workers=4, dedupe=True))
+    assert par == seq
+    names = [os.path.basename(p) for _, p, _ in seq]
+    assert names.count("a.tmp") == 1 and names.count("b.log") == 1
+    assert [i for i, _, _ in seq if i == 2] == []  # all of pattern 2 was a duplicate
+    assert len(list(scan.iter_files(patterns))) == len(seq) + 2
+
+
+def test_iter_files_parallel_streams_with_bounded_buffers(tmp_path, monkeypatch):
+    monkeypatch.setattr(scan, "_CHUNK", 4)
+    monkeypatch.setattr(scan, "_QUEUE_CHUNKS", 2)
+    walked = []
+
+    def walk_group(group, index):
+        for n in range(10_000):
+            walked.append(n)
+            yield group.patterns[0].index, f"{group.root}/{n}", 1
+
+    monkeypatch.setattr(scan, "_walk_group", walk_group)
+    it = scan.iter_files([str(tmp_path / d / "*") for d in "abc"], workers=3)
+    try:
+        assert next(it) == (0, str(tmp_path / "a") + "/0", 1)
+        time.sleep(0.3)
+        # per worker: a full queue, the chunk it is blocked on and (for the
+        # first root) the chunk being consumed; nowhere near 3 x 10,000
+        assert len(walked) <= 3 * 4 * (2 + 2)
+    finally:
+        it.close()
+    deadline = time.monotonic() + 5
+    while any(t.name.startswith("pcsuite-scan") for t in threading.enumerate()):
+        assert time.monotonic() < deadline, "scan workers did not stop"
+        time.sleep(0.05)
+
+
+def _age_dirs(root, seconds=60):
+    # Push directory mtimes out of the index's "recently modified" window
+    old = os.stat(root).st_mtime - seconds
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (old, old))
+
+
+def test_scan_index_reuses_unchanged_directories(tmp_path):
+    from pcsuite.core import scan_index
+
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    _make_tree(tree)
+    _age_dirs(tree)
+    base = str(tree)
+    patterns = [base + "/Temp/*", base + "/Profiles/*/cache2/entries/*"]
+    db = tmp_path / "index.sqlite3"
+
+    idx = scan_index.ScanIndex(db)
+    first = list(scan.iter_files(patterns, index=idx))
+    idx.close()
+    assert first == list(scan.iter_files(patterns))
+    assert idx.stats()["index_hits"] == 0
+
+    idx = scan_index.ScanIndex(db)
+    assert list(scan.iter_files(patterns, index=idx)) == first
+    idx.close()
+    assert idx.stats()["index_misses"] == 0
+
+    # A new file bumps its directory's mtime, so only that directory is re-listed
+    (tree / "Temp" / "new.tmp").write_text("new", encoding="utf-8")
+    idx = scan_index.ScanIndex(db)
+    third = list(scan.iter_files(patterns, index=idx))
+    idx.close()
+    assert third == list(scan.iter_files(patterns))
+    assert idx.stats()["index_misses"] == 1
+
+    assert scan_index.index_info(db)["directories"] >= 4
+    assert scan_index.clear_index(db) is True
+    assert scan_index.index_info(db)["exists"] is False
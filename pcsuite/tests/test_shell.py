@@ -0,0 +1,172 @@
+import sys
+import time
+import textwrap
+
+import pytest
+
+from pcsuite.core import pwsh_host, shell
+
+# Speaks the pwsh_host protocol; stands in for powershell.exe
+FAKE_HOST = textwrap.dedent(
+    """
+    import json, os, sys, time
+    print("stray banner line", flush=True)
+    for line in sys.stdin:
+        req = json.loads(line)
+        cmd = req["cmd"]
+        resp = {"id": req["id"], "code": 0, "out": "", "err": ""}
+        if cmd.startswith("echo "):
+            resp["out"] = cmd[5:] + "\\n"
+        elif cmd == "pid":
+            resp["out"] = str(os.getpid())
+        elif cmd == "fail":
+            resp.update(code=1, err="boom")
+        elif cmd.startswith("sleep "):
+            time.sleep(float(cmd[6:]))
+        elif cmd == "crash":
+            sys.exit(3)
+        print("##pcsuite-frame## " + json.dumps(resp), flush=True)
+    """
+)
+
+
+@pytest.fixture
+def fake_host(monkeypatch, tmp_path):
+    script = tmp_path / "fake_pwsh.py"
+    script.write_text(FAKE_HOST, encoding="utf-8")
+    shell.close_pwsh_host()
+    monkeypatch.setattr(shell, "PWSH_HOST", True)
+    monkeypatch.setattr(shell, "PWSH_HOST_ARGV", [sys.executable, str(script)])
+    spawned = []
+    monkeypatch.setattr(shell, "run", lambda cmd, shell=False, timeout=None: spawned.append(cmd) or (0, "spawned", ""))
+    yield spawned
+    shell.close_pwsh_host()
+
+
+def test_pwsh_reuses_one_session(fake_host):
+    assert shell.pwsh("echo hello") == (0, "hello\n", "")
+    assert shell.pwsh("fail") == (1, "", "boom")
+    first = shell.pwsh("pid")[1]
+    assert shell.pwsh("pid")[1] == first
+    assert shell.pwsh_host_stats() == {"hosts": 1, "starts": 1, "calls": 4}
+    assert fake_host == []
+
+
+def test_pwsh_host_timeout_and_crash_restart(fake_host):
+    pid = shell.pwsh("pid")[1]
+    code, out, err = shell.pwsh("sleep 5", timeout=0.3)
+    assert code == 1 and "timed out" in err
+    assert shell.pwsh("pid")[1] != pid  # killed and restarted
+
+    # A crash mid-command falls back to a one-off process; the host restarts
+    assert shell.pwsh("crash") == (0, "spawned", "")
+    assert fake_host[-1][:3] == ["powershell", "-NoProfile", "-Command"]
+    assert shell.pwsh("echo back") == (0, "back\n", "")
+    assert shell.pwsh_host_stats()["starts"] == 3
+
+    # `exit` would end the shared session: such commands never reach it
+    shell.pwsh("if ($x) { exit 2 }")
+    assert fake_host[-1][-1] == "if ($x) { exit 2 }"
+
+
+def test_pwsh_falls_back_when_host_cannot_start(fake_host, monkeypatch):
+    monkeypatch.setattr(shell, "PWSH_HOST_ARGV", ["pcsuite-no-such-interpreter"])
+    assert shell.pwsh("echo hi") == (0, "spawned", "")
+    assert shell.pwsh("echo again") == (0, "spawned", "")
+    assert shell._pwsh_pool() is None  # not retried in this process
+
+
+def test_pool_runs_commands_concurrently(fake_host):
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = pwsh_host.HostPool(size=2, argv=shell.PWSH_HOST_ARGV)
+    try:
+        with ThreadPoolExecutor(4) as ex:
+            outs = list(ex.map(lambda i: pool.run(f"echo {i}")[1], range(20)))
+        assert outs == [f"{i}\n" for i in range(20)]
+        assert pool.stats()["hosts"] <= 2 and pool.stats()["calls"] == 20
+    finally:
+        pool.close()
+
+
+def test_run_many_is_concurrent_and_ordered(monkeypatch):
+    import time
+
+    def slow(command, timeout=None):
+        delay = float(command.split()[-1])
+        if timeout is not None and delay > timeout:
+            return 1, "", "timed out"
+        time.sleep(delay)
+        return 0, command, ""
+
+    monkeypatch.setattr(shell, "pwsh", slow)
+    monkeypatch.setattr(shell, "cmdline", slow)
+    started = time.perf_counter()
+    results = shell.run_many(
+        [("pwsh", "a 0.3"), ("cmd", "b 0.1"), shell.Command("pwsh", "c 0.2"), ("cmd", "d 5", 0.5), ("bogus", "e")],
+        max_parallel=4,
+    )
+    assert time.perf_counter() - started < 0.6
+    assert [r.out for r in results[:3]] == ["a 0.3", "b 0.1", "c 0.2"]
+    assert tuple(results[3]) == (1, "", "timed out")
+    assert results[4].code == 1 and "bogus" in results[4].err
+    assert results[0].seconds >= 0.3
+
+
+def test_security_audit_timings(monkeypatch):
+    from typer.testing import CliRunner
+    from pcsuite.cli.main import app
+
+    monkeypatch.setattr(shell, "cmdline", lambda c, timeout=None: (0, "Domain Profile Settings:\nState ON\n", ""))
+    monkeypatch.setattr(shell, "pwsh", lambda c, timeout=None: (0, "1\n", ""))
+    res = CliRunner().invoke(app, ["security", "audit", "--timings"])
+    assert res.exit_code == 0, res.output
+    assert "UAC (EnableLUA)" in res.output and "On" in res.output
+    assert "Timings" in res.output and "total (wall)" in res.output
+
+
+def test_cached_queries_ttl_and_invalidation(monkeypatch):
+    from pcsuite.optimize import power
+    from pcsuite.security import firewall as fw
+
+    calls = []
+    states = {"fw": "ON"}
+
+    def fake_cmd(command, timeout=None):
+        calls.append(command)
+        if command.startswith("netsh advfirewall show"):
+            return 0, f"Domain Profile Settings:\nState {states['fw']}\n", ""
+        if command == "powercfg -l":
+            return 0, "Power Scheme GUID: 22222222-2222-2222-2222-222222222222  (High performance)", ""
+        if command.startswith("netsh advfirewall set"):
+            states["fw"] = "OFF"
+            return 0, "Ok.", ""
+        return 1, "", "unsupported"
+
+    monkeypatch.setattr(shell, "cmdline", fake_cmd)
+    before = shell.query_cache_stats()
+    assert fw.get_profile_states()["Domain"] == "ON"
+    assert fw.get_profile_states()["Domain"] == "ON"
+    assert calls.count("netsh advfirewall show allprofiles") == 1
+
+    # A mutating call drops the stale answer
+    assert fw.set_all_profiles(enable=False, dry_run=False)["ok"]
+    assert fw.get_profile_states()["Domain"] == "OFF"
+    assert calls.count("netsh advfirewall show allprofiles") == 2
+
+    # Failures are not cached; an expired entry is re-run
+    assert shell.cached("cmd", "bogus")[0] == 1
+    assert shell.cached("cmd", "bogus")[0] == 1
+    assert calls.count("bogus") == 2
+    shell.cached("cmd", "powercfg -l", ttl=0.05)
+    time.sleep(0.1)
+    shell.cached("cmd", "powercfg -l", ttl=0.05)
+    assert calls.count("powercfg -l") == 2
+
+    # set_scheme_by_name reuses the fresh scheme list, then drops it
+    assert power.set_scheme_by_name("high", dry_run=False)["ok"] is False  # setactive unsupported by the fake
+    assert calls.count("powercfg -l") == 2
+    assert shell.invalidate("powercfg") == 0
+    stats = shell.query_cache_stats()
+    assert stats["hits"] - before["hits"] == 2
+    assert stats["misses"] - before["misses"] == 6
@@ -0,0 +1,68 @@
+import os
+import time
+
+import yaml
+
+from pcsuite.core import sigdb
+
+
+def _write(path, data, age=60):
+    path.write_text(yaml.safe_dump(data), encoding="utf-8")
+    # Old enough that stat keys are trusted without re-hashing
+    t = time.time() - age
+    os.utime(path, (t, t))
+
+
+def _counts(before):
+    return {k: sigdb.stats[k] - before[k] for k in before}
+
+
+def test_load_parses_once_and_reloads_on_change(tmp_path):
+    sig = tmp_path / "signatures.yml"
+    excl = tmp_path / "exclusions.yml"
+    _write(sig, {"categories": {"temp": {"globs": ["$PCS_TEST_ROOT/*.tmp", 3]}}})
+    _write(excl, {"paths": ["**/keep/**"]})
+    cache = tmp_path / "reports"
+    sigdb.clear()
+    before = dict(sigdb.stats)
+
+    db = sigdb.load(sig, excl, cache_dir=cache)
+    assert db.categories == {"temp": ["$PCS_TEST_ROOT/*.tmp"]}
+    assert db.matcher.matches(os.path.join(str(tmp_path), "keep", "a.tmp"))
+    assert sigdb.load(sig, excl, cache_dir=cache) is db
+    assert _counts(before) == {"memory": 1, "disk": 0, "parsed": 1}
+    assert (cache / sigdb.CACHE_NAME).exists()
+
+    # A new process (empty memory) reads the disk cache instead of YAML
+    sigdb.clear()
+    again = sigdb.load(sig, excl, cache_dir=cache)
+    assert again.categories == db.categories and again.exclusions == db.exclusions
+    # Touching a file without changing it costs a hash, not a parse
+    os.utime(sig, (time.time() - 30, time.time() - 30))
+    sigdb.load(sig, excl, cache_dir=cache)
+    assert _counts(before) == {"memory": 1, "disk": 2, "parsed": 1}
+
+    # Edits are picked up by the next load in the same process
+    _write(sig, {"categories": {"dumps": {"globs": ["/x/*.dmp"]}}}, age=10)
+    changed = sigdb.load(sig, excl, cache_dir=cache)
+    assert list(changed.categories) == ["dumps"]
+    assert _counts(before)["parsed"] == 2
+
+    os.environ["PCS_TEST_ROOT"] = "/data"
+    try:
+        assert db.patterns([" temp", "missing"]) == (["/data/*.tmp"], ["temp"])
+    finally:
+        del os.environ["PCS_TEST_ROOT"]
+
+
+def test_recent_edit_with_same_stat_is_not_missed(tmp_path):
+    sig = tmp_path / "signatures.yml"
+    excl = tmp_path / "missing.yml"
+    sig.write_text("categories: {a: {globs: [x]}}\n", encoding="utf-8")
+    st = os.stat(sig)
+    sigdb.clear()
+    assert list(sigdb.load(sig, excl).categories) == ["a"]
+    # Same size, same mtime: only the content tells them apart
+    sig.write_text("categories: {b: {globs: [x]}}\n", encoding="utf-8")
+    os.utime(sig, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert list(sigdb.load(sig, excl).categories) == ["b"]